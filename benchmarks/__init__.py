@@ -0,0 +1 @@
+"""Micro-benchmarks, run a module with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,119 @@
+"""Measures the per-call cost of the AES-GCM primitives.
+
+Compares the streaming :class:`Cipher` contexts used before with a new
+:class:`AESGCM` object per call, as done for the per-login keys, and an
+object of :func:`spresso.utils.crypto.aes_gcm` reused like the key of the
+session sealer, on payloads the size of a tag and an
+identity assertion. The one-shot RSA operations are listed for reference,
+the streaming `signer()` and `verifier()` contexts they replace are no
+longer provided by `cryptography`.
+"""
+
+import argparse
+import os
+import timeit
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from spresso.utils.base import get_file_content
+from spresso.utils.crypto import aes_gcm, create_signature, \
+    decrypt_aes_gcm, encrypt_aes_gcm, verify_signature
+
+
+def streaming_encrypt(key, iv, plaintext):
+    encryptor = Cipher(algorithms.AES(key), modes.GCM(iv)).encryptor()
+    encryptor.authenticate_additional_data(b"")
+    cipher_text = encryptor.update(plaintext) + encryptor.finalize()
+    return cipher_text, encryptor.tag
+
+
+def streaming_decrypt(key, iv, auth_tag, cipher_text):
+    decryptor = Cipher(algorithms.AES(key), modes.GCM(iv, auth_tag)).decryptor()
+    decryptor.authenticate_additional_data(b"")
+    return decryptor.update(cipher_text) + decryptor.finalize()
+
+
+def measure(function, number):
+    # Best of three runs, in microseconds per call
+    runs = timeit.repeat(function, number=number, repeat=3)
+    return min(runs) / number * 1e6
+
+
+def report(name, function, number, baseline=None):
+    duration = measure(function, number)
+    speedup = "" if baseline is None else "{:.2f}x".format(baseline / duration)
+    print("{:<32}{:>10.2f}{:>10}".format(name, duration, speedup))
+    return duration
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    args = parser.parse_args(args)
+    number = args.number
+
+    key = os.urandom(32)
+    iv = os.urandom(12)
+
+    print("{:<32}{:>10}{:>10}".format("operation", "[us]", "speedup"))
+    for size in [300, 600]:
+        plaintext = os.urandom(size)
+        cipher_text, auth_tag = streaming_encrypt(key, iv, plaintext)
+
+        baseline = report(
+            "encrypt {}B, streaming".format(size),
+            lambda: streaming_encrypt(key, iv, plaintext),
+            number
+        )
+        report(
+            "encrypt {}B, AESGCM per call".format(size),
+            lambda: AESGCM(key).encrypt(iv, plaintext, b""),
+            number,
+            baseline
+        )
+        report(
+            "encrypt {}B, encrypt_aes_gcm".format(size),
+            lambda: encrypt_aes_gcm(key, iv, plaintext),
+            number,
+            baseline
+        )
+        cipher = aes_gcm(key)
+        report(
+            "encrypt {}B, reused object".format(size),
+            lambda: encrypt_aes_gcm(cipher, iv, plaintext),
+            number,
+            baseline
+        )
+
+        baseline = report(
+            "decrypt {}B, streaming".format(size),
+            lambda: streaming_decrypt(key, iv, auth_tag, cipher_text),
+            number
+        )
+        report(
+            "decrypt {}B, decrypt_aes_gcm".format(size),
+            lambda: decrypt_aes_gcm(key, iv, auth_tag, cipher_text),
+            number,
+            baseline
+        )
+
+    private_key = get_file_content("test_priv_key.pem", "rb")
+    public_key = get_file_content("test_pub_key.pem", "rb")
+    data = os.urandom(300)
+    signature = create_signature(private_key, data)
+
+    report(
+        "RS256 sign, one-shot",
+        lambda: create_signature(private_key, data),
+        number // 100
+    )
+    report(
+        "RS256 verify, one-shot",
+        lambda: verify_signature(public_key, signature, data),
+        number // 10
+    )
+
+
+if __name__ == "__main__":
+    main()
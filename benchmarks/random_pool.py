@@ -0,0 +1,90 @@
+"""Compares nonces drawn from the random pool with reading os.urandom.
+
+Measures :func:`spresso.utils.base.create_nonce` against the
+`os.urandom` call it replaced, for a nonce the size of the service token
+and of an IV, and the construction of a :class:`Session`, which draws its
+secrets from the pool at once, against the former construction calling
+`os.urandom` once per secret. Reports the time per call on one thread and
+spread over several threads sharing the pool.
+"""
+
+import argparse
+import os
+import threading
+import time
+import timeit
+
+from spresso.model.authentication.session import Session
+from spresso.utils.base import create_nonce
+
+
+class UrandomSession(Session):
+    def __init__(self, user, idp_info, **kwargs):
+        super(Session, self).__init__(**kwargs)
+        self.user = user
+        self.idp_info = idp_info
+        self.rp_nonce = os.urandom(32)
+        self.token = os.urandom(32)
+        self.ia_key = os.urandom(32)
+        self.tag_key = os.urandom(32)
+        self.tag_iv = os.urandom(12)
+        self.tag_enc_json = None
+        self.token_id = None
+        self.expires = None
+        self.idp_key_digest = None
+
+
+def measure(function, number):
+    # Best of three runs, in nanoseconds per call
+    runs = timeit.repeat(function, number=number, repeat=3)
+    return min(runs) / number * 1e9
+
+
+def measure_threads(function, number, threads):
+    # Wall time of all calls divided by their number, in nanoseconds
+    def run():
+        for _ in range(number):
+            function()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (number * threads) * 1e9
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=200000)
+    parser.add_argument("-t", "--threads", type=int, default=4)
+    args = parser.parse_args(args)
+    number = args.number
+
+    print("{:<24}{:>12}{:>12}{:>10}".format(
+        "operation", "[ns]", "threads", "speedup"
+    ))
+    for name, baseline, pooled in [
+        ("nonce 32B", lambda: os.urandom(32), lambda: create_nonce(32)),
+        ("nonce 12B", lambda: os.urandom(12), lambda: create_nonce(12)),
+        ("Session()",
+         lambda: UrandomSession(None, None, settings=None),
+         lambda: Session(None, None, settings=None)),
+    ]:
+        reference = None
+        for variant, function in [("os.urandom", baseline),
+                                  ("pool", pooled)]:
+            duration = measure(function, number)
+            print("{:<24}{:>12.0f}{:>12.0f}{:>10}".format(
+                "{}, {}".format(name, variant),
+                duration,
+                measure_threads(function, number // 10, args.threads),
+                "" if reference is None else
+                "{:.2f}x".format(reference / duration)
+            ))
+            reference = reference or duration
+
+
+if __name__ == "__main__":
+    main()
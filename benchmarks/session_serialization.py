@@ -0,0 +1,92 @@
+"""Compares the serialisation of login sessions for external stores.
+
+Pickling a :class:`Session` fails as long as it references the
+:class:`RelyingParty` settings, which hold locks, so site adapters have to
+detach the settings first and still store the JSON schema, the parsed well
+known info and the endpoints. :meth:`Session.to_bytes` stores the per-login
+state only and :meth:`Session.from_bytes` rebinds the settings.
+"""
+
+import argparse
+import copy
+import json
+import pickle
+import timeit
+
+from spresso.controller.grant.authentication.config.relying_party import \
+    RelyingParty
+from spresso.model.authentication.session import Session
+from spresso.model.base import User
+from spresso.utils.base import get_file_content
+
+
+def measure(function, number):
+    # Best of three runs, in microseconds per call
+    runs = timeit.repeat(function, number=number, repeat=3)
+    return min(runs) / number * 1e6
+
+
+def detached(session):
+    session = copy.copy(session)
+    session.settings = None
+    return session
+
+
+def pickle_load(data, settings):
+    session = pickle.loads(data)
+    session.settings = settings
+    return session
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    args = parser.parse_args(args)
+    number = args.number
+
+    settings = RelyingParty("rp.example", "fwd.example")
+    public_key = get_file_content("test_pub_key.pem", "r")
+    idp_info = json.dumps(dict(public_key=public_key))
+
+    session = Session(User("user@idp.example"), idp_info, settings=settings)
+    session.validate()
+    session.get_login_url()
+
+    pickled = pickle.dumps(detached(session))
+    packed = session.to_bytes()
+
+    print("{:<28}{:>10}{:>10}{:>10}".format(
+        "format", "[bytes]", "dump [us]", "load [us]"
+    ))
+    for name, size, dump, load in [
+        (
+            "pickle, settings detached",
+            len(pickled),
+            lambda: pickle.dumps(detached(session)),
+            lambda: pickle_load(pickled, settings)
+        ),
+        (
+            "to_bytes",
+            len(packed),
+            session.to_bytes,
+            lambda: Session.from_bytes(packed, settings)
+        ),
+        (
+            "to_bytes, key digest",
+            len(session.to_bytes(key_digest=True)),
+            lambda: session.to_bytes(key_digest=True),
+            None
+        ),
+    ]:
+        load_duration = "-" if load is None else \
+            "{:.2f}".format(measure(load, number))
+        print("{:<28}{:>10}{:>10.2f}{:>10}".format(
+            name,
+            size,
+            measure(dump, number),
+            load_duration
+        ))
+
+
+if __name__ == "__main__":
+    main()
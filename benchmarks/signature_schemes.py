@@ -0,0 +1,78 @@
+"""Compares the identity assertion signature schemes.
+
+Signing happens once per login on the Identity Provider, verification once
+per login on the Relying Party. Keys are loaded through the key registry
+beforehand, so only the signature operations are measured.
+"""
+
+import argparse
+import timeit
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from spresso.utils.crypto import create_signature, verify_signature
+
+#: A typical serialised identity assertion
+DATA = (
+    '{"email": "user@example.com", "forwarder_domain": "fwd.example.com", '
+    '"tag": "{\\"ciphertext\\": \\"' + 'A' * 172 + '\\", '
+    '\\"iv\\": \\"AAAAAAAAAAAAAAAA\\"}"}'
+).encode('utf-8')
+
+
+def generate_keys():
+    return [
+        ("RS256", rsa.generate_private_key(65537, 2048)),
+        ("ES256", ec.generate_private_key(ec.SECP256R1())),
+        ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    ]
+
+
+def to_pem(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem
+
+
+def measure(function, number):
+    # Best of three runs, in microseconds per call
+    runs = timeit.repeat(function, number=number, repeat=3)
+    return min(runs) / number * 1e6
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=500)
+    args = parser.parse_args(args)
+
+    print("{:<8}{:>14}{:>14}{:>12}".format(
+        "scheme", "sign [us]", "verify [us]", "size [B]"
+    ))
+    for name, private_key in generate_keys():
+        private_pem, public_pem = to_pem(private_key)
+        signature = create_signature(private_pem, DATA)
+        verify_signature(public_pem, signature, DATA, scheme=name)
+
+        sign = measure(
+            lambda: create_signature(private_pem, DATA),
+            args.number
+        )
+        verify = measure(
+            lambda: verify_signature(public_pem, signature, DATA),
+            args.number
+        )
+        print("{:<8}{:>14.1f}{:>14.1f}{:>12}".format(
+            name, sign, verify, len(signature)
+        ))
+
+
+if __name__ == "__main__":
+    main()
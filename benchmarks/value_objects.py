@@ -0,0 +1,179 @@
+"""Compares the value objects of a login with the dict based Composition.
+
+Builds the objects one login allocates apart from the cryptography: the tag
+payload and the encrypted tag, the identity assertion signed by the IdP and
+the one verified by the RP, both extended by additional data, and the well
+known info. The `Composition` based classes they replace are reproduced
+below. Reports the memory blocks and bytes held per login while the objects
+are alive, the peak of the transient allocations and the time per login.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import timeit
+import tracemalloc
+
+from spresso.model.authentication.identity_assertion import IdentityAssertion
+from spresso.model.authentication.tag import EncryptedTag, TagPayload
+from spresso.model.authentication.well_known_info import WellKnownInfo
+from spresso.model.base import Composition
+from spresso.utils.base import to_b64, update_existing_keys
+
+RP_NONCE = b"n" * 32
+RP_ORIGIN = "https://rp.example=" + "P" * 236
+EMAIL = "user@idp.example"
+FORWARDER = "fwd.example"
+ADDITIONAL_DATA = dict(name="User")
+WELL_KNOWN_INFO = json.dumps(dict(public_key="-----BEGIN PUBLIC KEY-----"))
+
+
+class CompositionTag(Composition):
+    template = Composition(rp_nonce=None, rp_origin=None)
+
+    def __init__(self, rp_origin, rp_nonce, key, iv):
+        super(CompositionTag, self).__init__()
+        self.tag = Composition()
+        self.tag.update(self.template)
+        self.rp_origin = rp_origin
+        self.rp_nonce = rp_nonce
+        self.key = key
+        self.iv = iv
+
+
+class CompositionAssertion(Composition):
+    template = Composition(tag=None, email=None, forwarder_domain=None)
+
+    def __init__(self, settings=None):
+        super(CompositionAssertion, self).__init__()
+        self.settings = settings
+        self.expected_signature = Composition()
+        self.expected_signature.update(self.template)
+        self.signature = Composition()
+        self.signature.update(self.template)
+        self.tag = None
+        self.email = None
+        self.forwarder_domain = None
+        self.public_key = None
+        self.signature_scheme = None
+        self.iv = None
+        self.cipher_text = None
+        self.ia_key = None
+
+
+def composition_login():
+    tag = CompositionTag(RP_ORIGIN, RP_NONCE, b"k" * 32, b"i" * 12)
+    tag.rp_nonce = to_b64(tag.rp_nonce)
+    update_existing_keys(tag, tag.tag)
+    tag_json = tag.tag.to_json()
+    tag_enc = Composition(iv=to_b64(tag.iv), ciphertext=tag_json)
+    tag_enc_json = tag_enc.to_json()
+
+    assertions = []
+    for member in ["signature", "expected_signature"]:
+        ia = CompositionAssertion()
+        ia.tag = tag_enc_json
+        ia.email = EMAIL
+        ia.forwarder_domain = FORWARDER
+        ia[member].update(ADDITIONAL_DATA)
+        update_existing_keys(ia, ia[member])
+        ia[member].to_json()
+        assertions.append(ia)
+
+    request_json = Composition()
+    request_json.from_json(WELL_KNOWN_INFO)
+    idp_wk = Composition(
+        public_key=request_json["public_key"],
+        signature_scheme=request_json.get("signature_scheme")
+    )
+    return tag, tag_enc, assertions, idp_wk
+
+
+def record_login():
+    tag = TagPayload(rp_nonce=to_b64(RP_NONCE), rp_origin=RP_ORIGIN)
+    tag_json = tag.to_json()
+    tag_enc = EncryptedTag(iv=to_b64(b"i" * 12), ciphertext=tag_json)
+    tag_enc_json = tag_enc.to_json()
+
+    assertions = []
+    for member in ["signature", "expected_signature"]:
+        ia = IdentityAssertion(settings=None)
+        ia.tag = tag_enc_json
+        ia.email = EMAIL
+        ia.forwarder_domain = FORWARDER
+        payload = getattr(ia, member)
+        payload.update(ADDITIONAL_DATA)
+        ia.update_payload(payload)
+        payload.to_json()
+        assertions.append(ia)
+
+    request_json = json.loads(WELL_KNOWN_INFO)
+    idp_wk = WellKnownInfo(
+        public_key=request_json["public_key"],
+        signature_scheme=request_json.get("signature_scheme")
+    )
+    return tag, tag_enc, assertions, idp_wk
+
+
+def retained(login, number):
+    # Memory blocks and traced bytes held by the objects of a login. The
+    # blocks are counted without tracemalloc, which allocates blocks itself
+    login()
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    logins = [login() for _ in range(number)]
+    blocks = sys.getallocatedblocks() - blocks
+    del logins
+
+    gc.collect()
+    tracemalloc.start()
+    logins = [login() for _ in range(number)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del logins
+    return blocks / number, size / number
+
+
+def transient_peak(login):
+    tracemalloc.start()
+    login()
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    login()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - current
+
+
+def measure(function, number):
+    # Best of three runs, in microseconds per call
+    runs = timeit.repeat(function, number=number, repeat=3)
+    return min(runs) / number * 1e6
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    args = parser.parse_args(args)
+    number = args.number
+
+    print("{:<14}{:>10}{:>10}{:>12}{:>10}".format(
+        "objects", "[blocks]", "[bytes]", "peak [B]", "[us]"
+    ))
+    for name, login in [
+        ("Composition", composition_login),
+        ("Record", record_login),
+    ]:
+        blocks, size = retained(login, number // 10)
+        print("{:<14}{:>10.1f}{:>10.0f}{:>12}{:>10.2f}".format(
+            name,
+            blocks,
+            size,
+            transient_peak(login),
+            measure(login, number)
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ setup(
         'Jinja2',
         'jsonschema'
     ],
+    extras_require={
+        'async': ['httpx']
+    },
     include_package_data=True,
     classifiers=[
         "Development Status :: 4 - Beta",
@@ -1,53 +1,173 @@
+import asyncio
 import json
 
 from spresso.controller.grant.base import ValidatingGrantHandler
 from spresso.model.web.base import Response
 from spresso.utils.error import SpressoInvalidError, UnsupportedGrantError
+from spresso.utils.instrumentation import instrumentation
 from spresso.utils.log import app_log
 
 
+class Processing(object):
+    """
+        Processing of a request by a grant handler, shared by
+        :meth:`Application.process` and :meth:`Application.process_async`.
+        Measures the dispatch and the phases of the handler, labelled by
+        the qualified name of the handler class, and turns errors into the
+        error response of the handler.
+    """
+
+    def __init__(self, application, grant_type):
+        self.application = application
+        self.grant_type = grant_type
+        handler_class = grant_type.__class__
+        self.handler = "{}.{}".format(
+            handler_class.__module__,
+            handler_class.__qualname__
+        )
+        self.response = None
+        self.dispatch = None
+
+    def __enter__(self):
+        self.dispatch = instrumentation.measure(
+            "dispatch",
+            handler=self.handler
+        )
+        self.dispatch.__enter__()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        try:
+            if isinstance(error, Exception):
+                self.response = self.application._handle_error(
+                    self.grant_type,
+                    error
+                )
+        finally:
+            self.dispatch.__exit__(None, None, None)
+        return isinstance(error, Exception)
+
+    def phase(self, name):
+        return instrumentation.measure(
+            "handler.{}".format(name),
+            handler=self.handler
+        )
+
+    def prepare(self, request):
+        response = self.application.response_class()
+        if issubclass(self.grant_type.__class__, ValidatingGrantHandler):
+            with self.phase("validate"):
+                self.grant_type.read_validate_params(request)
+        return response
+
+
 class Application(object):
     def __init__(self, response_class=Response):
         self.response_class = response_class
         self.grant_types = []
 
-    def dispatch(self, request, environ):
+    def dispatch(self, request, environ, route=None):
+        try:
+            grant_type = self._grant_type(request, route)
+        except UnsupportedGrantError:
+            return self._unsupported_grant()
+
+        return self.process(grant_type, request, environ)
+
+    async def dispatch_async(self, request, environ, route=None,
+                             executor=None):
+        """
+            Dispatches a request from within an event loop.
+            Grant handlers providing a `process_async` coroutine are awaited
+            and run their blocking work in `executor`, blocking grant
+            handlers are run in `executor` entirely. It defaults to the
+            default executor of the loop.
+        """
         try:
-            grant_type = self._grant_type(request)
-            response = self.response_class()
-            if issubclass(grant_type.__class__, ValidatingGrantHandler):
-                grant_type.read_validate_params(request)
-            return grant_type.process(request, response, environ)
-        except SpressoInvalidError as err:
-            response = self.response_class()
-            return grant_type.handle_error(error=err, response=response)
+            grant_type = self._grant_type(request, route)
         except UnsupportedGrantError:
-            response = self.response_class()
-            response.add_header("Content-Type", "application/json")
-            response.status_code = 400
-            response.body = json.dumps({
-                "error": "unsupported_grant",
-                "error_description": "Grant not supported"
-            })
-            return response
-        except:
-            app_log.error("Uncaught Exception", exc_info=True)
-            response = self.response_class()
-            return grant_type.handle_error(
-                error=SpressoInvalidError(
-                    error="server_error",
-                    message="Internal server error"
-                ),
-                response=response
+            return self._unsupported_grant()
+
+        if hasattr(grant_type, "process_async"):
+            return await self.process_async(
+                grant_type,
+                request,
+                environ,
+                executor=executor
             )
 
+        if not grant_type.blocking:
+            return self.process(grant_type, request, environ)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor,
+            self.process,
+            grant_type,
+            request,
+            environ
+        )
+
+    def process(self, grant_type, request, environ):
+        with Processing(self, grant_type) as processing:
+            response = processing.prepare(request)
+            with processing.phase("process"):
+                processing.response = grant_type.process(
+                    request,
+                    response,
+                    environ
+                )
+        return processing.response
+
+    async def process_async(self, grant_type, request, environ,
+                            executor=None):
+        with Processing(self, grant_type) as processing:
+            response = processing.prepare(request)
+            with processing.phase("process"):
+                processing.response = await grant_type.process_async(
+                    request,
+                    response,
+                    environ,
+                    executor=executor
+                )
+        return processing.response
+
     def add_grant(self, grant):
         self.grant_types.append(grant)
 
-    def _grant_type(self, request):
+    def _grant_type(self, request, route=None):
+        # Resolved by a route table, see :class:`RouteTable`
+        if route is not None:
+            return route(self)
+
         for grant in self.grant_types:
             grant_handler = grant(request, self)
             if grant_handler is not None:
                 return grant_handler
 
         raise UnsupportedGrantError
+
+    def _handle_error(self, grant_type, error):
+        response = self.response_class()
+
+        if isinstance(error, SpressoInvalidError):
+            return grant_type.handle_error(error=error, response=response)
+
+        app_log.error("Uncaught Exception", exc_info=error)
+        return grant_type.handle_error(
+            error=SpressoInvalidError(
+                error="server_error",
+                message="Internal server error"
+            ),
+            response=response
+        )
+
+    def _unsupported_grant(self):
+        response = self.response_class()
+        response.add_header("Content-Type", "application/json")
+        response.status_code = 400
+        response.data = json.dumps({
+            "error": "unsupported_grant",
+            "error_description": "Grant not supported"
+        })
+        return response
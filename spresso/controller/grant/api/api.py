@@ -3,6 +3,8 @@ from spresso.view.api.api import ApiView
 
 
 class ApiInformationHandler(GrantHandler):
+    blocking = False
+
     def __init__(self, application, settings, **kwargs):
         super(ApiInformationHandler, self).__init__(**kwargs)
         self.application = application
@@ -4,6 +4,8 @@ from spresso.model.authentication.json_schema import WellKnownInfoDefinition, \
 from spresso.model.settings import Container, Schema, Endpoint
 
 from spresso.utils.base import get_file_content
+from spresso.utils.crypto import key_registry, signature_scheme_for
+from spresso.view.base import static_cache
 
 
 class IdentityProvider(Setting):
@@ -32,8 +34,44 @@ class IdentityProvider(Setting):
     sri = False
     sri_hash = None
 
+    private_key = None
+    public_key = None
+
+    # Backend creating the identity assertion signatures, e.g. a
+    # spresso.utils.signer.ProcessPoolSigner. Signatures are created on the
+    # request thread if None.
+    # Backends holding the key themselves, like the
+    # spresso.utils.signing_service.SocketSigner, allow to omit the
+    # private key path
+    signer = None
+
     def __init__(self, domain, private_key_path, public_key_path):
         super(IdentityProvider, self).__init__()
         self.domain = domain
-        self.private_key = get_file_content(private_key_path, "rb")
+        self.load_keys(private_key_path, public_key_path)
+
+    def load_keys(self, private_key_path, public_key_path):
+        """Loads the key pair, replacing and invalidating a previous one."""
+        if self.private_key is not None:
+            key_registry.invalidate(self.private_key)
+        if self.public_key is not None:
+            # Registered by :attr:`signature_scheme`
+            key_registry.invalidate(self.public_key.encode('utf-8'))
+            # The well known info advertises the public key
+            static_cache.invalidate(self)
+
+        if private_key_path is None:
+            self.private_key = None
+        else:
+            self.private_key = get_file_content(private_key_path, "rb")
+            # Parse the private key once at startup, signing reuses the
+            # registered key object
+            key_registry.private_key(self.private_key)
+
         self.public_key = get_file_content(public_key_path, "r")
+
+    @property
+    def signature_scheme(self):
+        """The name of the signature scheme, selected by the key type."""
+        public_key = key_registry.public_key(self.public_key.encode('utf-8'))
+        return signature_scheme_for(public_key).name
@@ -1,9 +1,12 @@
 from spresso.controller.grant.settings import Setting
 from spresso.model.authentication.json_schema import StartLoginDefinition, \
     IdentityAssertionDefinition, WellKnownInfoDefinition
-from spresso.model.cache import Cache
+from spresso.model.authentication.session_token import SessionSealer
+from spresso.model.cache import Cache, VerificationCache
+from spresso.model.request import HttpClient, AsyncHttpClient
 from spresso.model.settings import Container, Schema, Endpoint, \
     SelectionContainer, CachingSetting, ForwardDomain
+from spresso.utils.concurrency import SingleFlight
 
 
 class RelyingParty(Setting):
@@ -38,14 +41,61 @@ class RelyingParty(Setting):
     # CachingSetting container for the well known info on multiple idps
     default_caching = CachingSetting("default", True, 48 * 60 * 60)
     caching_settings = SelectionContainer("select", default=default_caching)
+    # Bounds of the well known info cache, size in bytes
+    cache_max_entries = 1024
+    cache_max_size = 4 * 1024 * 1024
 
     fwd_selector = SelectionContainer("random")
 
+    # Outcomes of identity assertion verifications, repeated submissions of
+    # an assertion skip the cryptography. Lifetime in seconds, 0 disables
+    # the cache
+    verification_cache_lifetime = 0
+    verification_cache_max_entries = 4096
+
+    # Stateless login sessions, the session state is sealed with AES-GCM into
+    # the login session token instead of being saved by the site adapters.
+    # 'session_key' is a 16, 24 or 32 byte key shared by all processes of
+    # the Relying Party, None keeps the sessions in the site adapters.
+    # Lifetime in seconds, tokens are accepted by the login endpoint once
+    session_key = None
+    session_token_lifetime = 600
+    session_token_max_entries = 65536
+
     # Requests are done by the requests package,
     # refer to its documentation on 'proxies' and 'verify'
     proxies = {}
     verify = True
 
+    # Pooled HTTP clients for the well known info requests,
+    # 'timeout' is a (connect, read) tuple in seconds.
+    # The asynchronous client requires the optional 'httpx' package
+    timeout = (3.05, 10)
+    pool_connections = 10
+    pool_maxsize = 10
+    retries = 2
+    retry_backoff = 0.5
+
+    # Rebuilt when one of their settings is assigned, e.g. assigning
+    # 'session_key' after construction enables the stateless sessions
+    derived = dict(
+        cache=("cache_max_entries", "cache_max_size"),
+        http_client=(
+            "timeout", "pool_connections", "pool_maxsize", "retries",
+            "retry_backoff"
+        ),
+        async_http_client=(
+            "timeout", "pool_maxsize", "retries", "retry_backoff"
+        ),
+        verification_cache=(
+            "verification_cache_lifetime", "verification_cache_max_entries"
+        ),
+        session_sealer=(
+            "session_key", "session_token_lifetime",
+            "session_token_max_entries"
+        ),
+    )
+
     def __init__(self, domain, forwarder_domain):
         super(RelyingParty, self).__init__()
         self.domain = domain
@@ -53,4 +103,70 @@ class RelyingParty(Setting):
             ForwardDomain("default", forwarder_domain)
         )
         self.scheme_well_known_info = self.scheme
-        self.cache = Cache(self)
+        # Deduplicates concurrent well known info requests per netloc
+        self.info_flight = SingleFlight()
+        self.build_derived()
+
+    def _build_cache(self):
+        return Cache(
+            self,
+            max_entries=self.cache_max_entries,
+            max_size=self.cache_max_size
+        )
+
+    def _build_http_client(self):
+        return HttpClient(
+            timeout=self.timeout,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            retries=self.retries,
+            backoff_factor=self.retry_backoff
+        )
+
+    def _build_async_http_client(self):
+        return AsyncHttpClient(
+            timeout=self.timeout,
+            pool_maxsize=self.pool_maxsize,
+            retries=self.retries,
+            backoff_factor=self.retry_backoff
+        )
+
+    def _build_verification_cache(self):
+        if self.verification_cache_lifetime <= 0:
+            return None
+        return VerificationCache(
+            self,
+            lifetime=self.verification_cache_lifetime,
+            max_entries=self.verification_cache_max_entries
+        )
+
+    def _build_session_sealer(self):
+        if self.session_key is None:
+            return None
+        sealer = SessionSealer(
+            self,
+            self.session_key,
+            lifetime=self.session_token_lifetime,
+            max_entries=self.session_token_max_entries
+        )
+
+        # Tokens of an unchanged key that were consumed stay consumed
+        previous = self.__dict__.get("session_sealer")
+        if previous is not None and previous.key == sealer.key:
+            sealer.consumed = previous.consumed
+            sealer.consumed.max_entries = self.session_token_max_entries
+            sealer.consumed.max_size = self.session_token_max_entries
+        return sealer
+
+    def _release_cache(self, cache):
+        # Removes the files of disk entries
+        cache.flush()
+
+    def _release_http_client(self, http_client):
+        http_client.close()
+
+    def _release_async_http_client(self, async_http_client):
+        async_http_client.close()
+
+    def _release_verification_cache(self, verification_cache):
+        verification_cache.flush()
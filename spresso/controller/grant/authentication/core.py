@@ -7,23 +7,27 @@ from spresso.controller.grant.authentication.config.identity_provider import \
     IdentityProvider
 from spresso.controller.grant.authentication.config.relying_party import \
     RelyingParty
-from spresso.controller.grant.base import GrantHandlerFactory, SettingsMixin
+from spresso.controller.grant.base import RoutedGrantHandlerFactory, \
+    SettingsMixin
 
 
-class ForwardAuthenticationGrant(GrantHandlerFactory, SettingsMixin):
+class ForwardAuthenticationGrant(RoutedGrantHandlerFactory, SettingsMixin):
     settings_class = Forward
 
-    def __call__(self, request, application):
-        if request.path == self.settings.endpoints.get('proxy').path and \
-           request.method in self.settings.endpoints.get('proxy').methods:
-            return spresso.controller.grant.authentication.\
-                forward.ProxyHandler(
-                    settings=self.settings
-                )
-        return None
+    def routes(self):
+        handlers = spresso.controller.grant.authentication.forward
+        endpoints = self.settings.endpoints
 
+        return [
+            (endpoints.get('proxy'),
+             lambda application: handlers.ProxyHandler(
+                 settings=self.settings
+             )),
+        ]
 
-class IdentityProviderAuthenticationGrant(GrantHandlerFactory, SettingsMixin):
+
+class IdentityProviderAuthenticationGrant(RoutedGrantHandlerFactory,
+                                          SettingsMixin):
     settings_class = IdentityProvider
 
     def __init__(self, login_site_adapter, signature_site_adapter, **kwargs):
@@ -32,33 +36,29 @@ class IdentityProviderAuthenticationGrant(GrantHandlerFactory, SettingsMixin):
         self.signature_site_adapter = signature_site_adapter
         self.endpoints = self.settings.endpoints
 
-    def __call__(self, request, application):
-        if request.path == self.endpoints.get('info').path and \
-           request.method in self.endpoints.get('info').methods:
-            return spresso.controller.grant.authentication.\
-                identity_provider.InfoHandler(
-                    settings=self.settings
-                )
-
-        if request.path == self.endpoints.get('login').path and \
-           request.method in self.endpoints.get('login').methods:
-            return spresso.controller.grant.authentication.\
-                identity_provider.LoginHandler(
-                    site_adapter=self.login_site_adapter,
-                    settings=self.settings
-                )
-
-        if request.path == self.endpoints.get('sign').path and \
-           request.method in self.endpoints.get('sign').methods:
-            return spresso.controller.grant.authentication.\
-                identity_provider.SignatureHandler(
-                    site_adapter=self.signature_site_adapter,
-                    settings=self.settings
-                )
-        return None
-
-
-class RelyingPartyAuthenticationGrant(GrantHandlerFactory, SettingsMixin):
+    def routes(self):
+        handlers = spresso.controller.grant.authentication.identity_provider
+
+        return [
+            (self.endpoints.get('info'),
+             lambda application: handlers.InfoHandler(
+                 settings=self.settings
+             )),
+            (self.endpoints.get('login'),
+             lambda application: handlers.LoginHandler(
+                 site_adapter=self.login_site_adapter,
+                 settings=self.settings
+             )),
+            (self.endpoints.get('sign'),
+             lambda application: handlers.SignatureHandler(
+                 site_adapter=self.signature_site_adapter,
+                 settings=self.settings
+             )),
+        ]
+
+
+class RelyingPartyAuthenticationGrant(RoutedGrantHandlerFactory,
+                                      SettingsMixin):
     settings_class = RelyingParty
 
     def __init__(self, index_site_adapter, start_login_site_adapter,
@@ -70,43 +70,32 @@ class RelyingPartyAuthenticationGrant(GrantHandlerFactory, SettingsMixin):
         self.login_site_adapter = login_site_adapter
         self.endpoints = self.settings.endpoints
 
-    def __call__(self, request, application):
-        if request.path == self.endpoints.get('index').path and \
-           request.method in self.endpoints.get('index').methods:
-            return spresso.controller.grant.authentication.\
-                relying_party.IndexHandler(
-                    site_adapter=self.index_site_adapter,
-                    settings=self.settings
-                )
-
-        if request.path == self.endpoints.get('wait').path and \
-           request.method in self.endpoints.get('wait').methods:
-            return spresso.controller.grant.authentication.\
-                relying_party.WaitHandler(
-                    settings=self.settings
-                )
-
-        if request.path == self.endpoints.get('start_login').path and \
-           request.method in self.endpoints.get('start_login').methods:
-            return spresso.controller.grant.authentication.\
-                relying_party.StartLoginHandler(
-                    site_adapter=self.start_login_site_adapter,
-                    settings=self.settings
-                )
-
-        if request.path == self.endpoints.get('redirect').path and \
-           request.method in self.endpoints.get('redirect').methods:
-            return spresso.controller.grant.authentication.\
-                relying_party.RedirectHandler(
-                    site_adapter=self.redirect_site_adapter,
-                    settings=self.settings
-                )
-
-        if request.path == self.endpoints.get('login').path and \
-           request.method in self.endpoints.get('login').methods:
-            return spresso.controller.grant.authentication.\
-                relying_party.LoginHandler(
-                    site_adapter=self.login_site_adapter,
-                    settings=self.settings,
-                )
-        return None
+    def routes(self):
+        handlers = spresso.controller.grant.authentication.relying_party
+
+        return [
+            (self.endpoints.get('index'),
+             lambda application: handlers.IndexHandler(
+                 site_adapter=self.index_site_adapter,
+                 settings=self.settings
+             )),
+            (self.endpoints.get('wait'),
+             lambda application: handlers.WaitHandler(
+                 settings=self.settings
+             )),
+            (self.endpoints.get('start_login'),
+             lambda application: handlers.StartLoginHandler(
+                 site_adapter=self.start_login_site_adapter,
+                 settings=self.settings
+             )),
+            (self.endpoints.get('redirect'),
+             lambda application: handlers.RedirectHandler(
+                 site_adapter=self.redirect_site_adapter,
+                 settings=self.settings
+             )),
+            (self.endpoints.get('login'),
+             lambda application: handlers.LoginHandler(
+                 site_adapter=self.login_site_adapter,
+                 settings=self.settings,
+             )),
+        ]
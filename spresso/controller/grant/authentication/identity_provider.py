@@ -14,8 +14,10 @@ from spresso.view.base import View, Script
 
 class InfoHandler(GrantHandler, SettingsMixin,
                   JsonErrorMixin):
+    blocking = False
+
     def process(self, request, response, environ):
-        view = WellKnownInfoView(settings=self.settings)
+        view = WellKnownInfoView(request=request, settings=self.settings)
         return view.process(response)
 
 
@@ -35,7 +37,7 @@ class LoginHandler(GrantHandler, SiteAdapterMixin,
             email = ""
 
         script = Script(self.settings)
-        script.template_context.update(dict(email=email))
+        script.template_context = dict(email=email)
 
         self.site_adapter.set_javascript(script.render())
         data = self.site_adapter.render_page(request, response, environ)
@@ -1,3 +1,4 @@
+import asyncio
 from json import JSONDecodeError
 from urllib.parse import unquote
 
@@ -17,16 +18,21 @@ from spresso.utils.base import create_nonce, from_b64
 from spresso.utils.error import SpressoInvalidError, UnsupportedAdditionalData
 from spresso.view.authentication.relying_party import WaitView, \
     StartLoginView, RedirectView, LoginView
-from spresso.view.base import View, Script
+from spresso.view.base import View, Script, static_cache
 
 
 class IndexHandler(GrantHandler, SiteAdapterMixin, SettingsMixin):
     site_adapter_class = IndexSiteAdapter
 
     def process(self, request, response, environ):
-        script = Script(settings=self.settings)
+        # The script only depends on the settings, render it once
+        script = static_cache.get(
+            self.settings,
+            Script,
+            lambda: Script(settings=self.settings).render()
+        )
 
-        self.site_adapter.set_javascript(script.render())
+        self.site_adapter.set_javascript(script)
         data = self.site_adapter.render_page(request, response, environ)
 
         view = View()
@@ -34,8 +40,10 @@ class IndexHandler(GrantHandler, SiteAdapterMixin, SettingsMixin):
 
 
 class WaitHandler(GrantHandler, SettingsMixin):
+    blocking = False
+
     def process(self, request, response, environ):
-        view = WaitView(settings=self.settings)
+        view = WaitView(request=request, settings=self.settings)
         return view.process(response)
 
 
@@ -59,7 +67,24 @@ class StartLoginHandler(ValidatingGrantHandler, SiteAdapterMixin,
     def process(self, request, response, environ):
         retriever = IdpInfoRequest(self.user.netloc, settings=self.settings)
         idp_info = retriever.get_content()
+        return self.start_session(request, response, idp_info)
+
+    async def process_async(self, request, response, environ,
+                            executor=None):
+        retriever = IdpInfoRequest(self.user.netloc, settings=self.settings)
+        idp_info = await retriever.aget_content()
+
+        # The site adapter may block, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor,
+            self.start_session,
+            request,
+            response,
+            idp_info
+        )
 
+    def start_session(self, request, response, idp_info):
         session = Session(self.user, idp_info, settings=self.settings)
         try:
             session.validate()
@@ -76,14 +101,50 @@ class StartLoginHandler(ValidatingGrantHandler, SiteAdapterMixin,
                 uri=request.path
             )
 
-        self.site_adapter.save_session(session)
+        if self.settings.session_sealer is None:
+            self.site_adapter.save_session(session)
+        else:
+            # The state travels in the login session token
+            session.seal()
 
         view = StartLoginView(session, settings=self.settings)
         return view.process(response)
 
 
+class SessionLoaderMixin(object):
+    def load_session(self, request):
+        """
+            Loads the session of the login session token from the site
+            adapter, or unseals it from the token itself.
+        """
+        if self.settings.session_sealer is None:
+            login_session = self.site_adapter.load_session(
+                self.login_session_token
+            )
+        else:
+            try:
+                login_session = Session.unseal(
+                    self.login_session_token,
+                    self.settings
+                )
+            except ValueError as error:
+                raise SpressoInvalidError(
+                    error="invalid_request",
+                    message=error,
+                    uri=request.path
+                )
+
+        if not login_session or not isinstance(login_session, Session):
+            raise SpressoInvalidError(
+                error="invalid_request",
+                message="Invalid session",
+                uri=request.path
+            )
+        return login_session
+
+
 class RedirectHandler(ValidatingGrantHandler, SiteAdapterMixin,
-                      SettingsMixin, JsonErrorMixin):
+                      SessionLoaderMixin, SettingsMixin, JsonErrorMixin):
     site_adapter_class = RedirectSiteAdapter
 
     def read_validate_params(self, request):
@@ -102,16 +163,7 @@ class RedirectHandler(ValidatingGrantHandler, SiteAdapterMixin,
         )
 
     def process(self, request, response, environ):
-        login_session = self.site_adapter.load_session(
-            self.login_session_token
-        )
-
-        if not login_session or not isinstance(login_session, Session):
-            raise SpressoInvalidError(
-                error="invalid_request",
-                message="Invalid session",
-                uri=request.path
-            )
+        login_session = self.load_session(request)
 
         view = RedirectView(settings=self.settings)
 
@@ -128,8 +180,8 @@ class RedirectHandler(ValidatingGrantHandler, SiteAdapterMixin,
         return view.process(response)
 
 
-class LoginHandler(ValidatingGrantHandler, SiteAdapterMixin, SettingsMixin,
-                   JsonErrorMixin):
+class LoginHandler(ValidatingGrantHandler, SiteAdapterMixin,
+                   SessionLoaderMixin, SettingsMixin, JsonErrorMixin):
     site_adapter_class = LoginSiteAdapter
 
     def read_validate_params(self, request):
@@ -158,17 +210,24 @@ class LoginHandler(ValidatingGrantHandler, SiteAdapterMixin, SettingsMixin,
             )
 
     def process(self, request, response, environ):
-        login_session = self.site_adapter.load_session(
-            self.login_session_token
-        )
+        login_session = self.load_session(request)
 
-        if not login_session or not isinstance(login_session, Session):
-            raise SpressoInvalidError(
-                error="invalid_request",
-                message="Invalid session",
-                uri=request.path
-            )
+        cache = self.settings.verification_cache
+        if self.settings.session_sealer is not None:
+            service_token = self.verify_sealed(request, login_session)
+        elif cache is None:
+            self.verify(request, login_session)
+            service_token = self.rotate(login_session)
+        else:
+            service_token = self.verify_cached(request, login_session, cache)
 
+        response = self.site_adapter.set_cookie(service_token, response)
+
+        view = LoginView(login_session.user.email)
+        return view.process(response)
+
+    def verify(self, request, login_session, additional_data=None):
+        """Decrypts and verifies the identity assertion."""
         ia = IdentityAssertion(settings=self.settings)
         ia.from_session(login_session)
 
@@ -194,13 +253,8 @@ class LoginHandler(ValidatingGrantHandler, SiteAdapterMixin, SettingsMixin,
             )
 
         # Extend IA
-        additional_data = self.site_adapter.get_additional_data()
-
-        if not isinstance(additional_data, dict):
-            raise UnsupportedAdditionalData(
-                "Additional data must be of type 'dict'"
-            )
-
+        if additional_data is None:
+            additional_data = self.get_additional_data()
         ia.expected_signature.update(additional_data)
 
         try:
@@ -224,10 +278,89 @@ class LoginHandler(ValidatingGrantHandler, SiteAdapterMixin, SettingsMixin,
                 uri=request.path
             )
 
+    def verify_cached(self, request, login_session, cache):
+        """
+            Verifies the identity assertion unless the same assertion was
+            already verified for the session, returns the service token.
+        """
+        additional_data = self.get_additional_data()
+        handle = cache.digest(
+            self.login_session_token,
+            self.eia,
+            additional_data
+        )
+
+        outcome = cache.lookup(handle, login_session.token)
+        if outcome is not None:
+            if outcome["error"] is not None:
+                raise SpressoInvalidError(
+                    error=outcome["error"],
+                    message=outcome["message"],
+                    uri=request.path
+                )
+            # A repeated submission keeps the issued service token
+            return login_session.token
+
+        try:
+            self.verify(request, login_session, additional_data)
+        except SpressoInvalidError as error:
+            cache.store(
+                handle,
+                login_session.token,
+                error=error.error,
+                message=error.explanation
+            )
+            raise
+
+        service_token = self.rotate(login_session)
+        cache.store(handle, service_token)
+        return service_token
+
+    def verify_sealed(self, request, login_session):
+        """
+            Verifies the identity assertion of a sealed session, returns the
+            service token. The login session token is accepted once.
+        """
+        retriever = IdpInfoRequest(
+            login_session.user.netloc,
+            settings=self.settings
+        )
+        try:
+            login_session.bind_well_known_info(retriever.get_content())
+        except JSONDecodeError:
+            raise SpressoInvalidError(
+                error="invalid_session",
+                message="JSON decoding failed",
+                uri=request.path
+            )
+        except (ValidationError, ValueError) as error:
+            raise SpressoInvalidError(
+                error="invalid_session",
+                message=error,
+                uri=request.path
+            )
+
+        self.verify(request, login_session)
+
+        if not login_session.consume():
+            raise SpressoInvalidError(
+                error="invalid_request",
+                message="Login session token was already used",
+                uri=request.path
+            )
+        return self.rotate(login_session)
+
+    def get_additional_data(self):
+        additional_data = self.site_adapter.get_additional_data()
+
+        if not isinstance(additional_data, dict):
+            raise UnsupportedAdditionalData(
+                "Additional data must be of type 'dict'"
+            )
+        return additional_data
+
+    def rotate(self, login_session):
         service_token = create_nonce(32)
         login_session.token = service_token
         self.site_adapter.save_session(login_session)
-        response = self.site_adapter.set_cookie(service_token, response)
-
-        view = LoginView(login_session.user.email)
-        return view.process(response)
+        return service_token
@@ -8,6 +8,12 @@ class ErrorHandler(object):
 
 
 class GrantHandler(object):
+    # Handlers that neither do I/O nor call site adapters may be processed
+    # on an event loop, blocking handlers are run in an executor.
+    # Handlers may additionally provide a `process_async` coroutine, taking
+    # the executor of the application for blocking work as `executor`.
+    blocking = True
+
     def process(self, request, response, environ):
         raise NotImplementedError
 
@@ -22,6 +28,27 @@ class GrantHandlerFactory(object):
         raise NotImplementedError
 
 
+class RoutedGrantHandlerFactory(GrantHandlerFactory):
+    """
+        Grant factory that declares its endpoints up front, so that they can
+        be served from a route table without calling every factory.
+    """
+
+    def routes(self):
+        """
+            Returns a list of (endpoint, constructor) tuples, a constructor
+            is called with the application and returns the grant handler.
+        """
+        raise NotImplementedError
+
+    def __call__(self, request, application):
+        for endpoint, constructor in self.routes():
+            if request.path == endpoint.path and \
+               request.method in endpoint.methods:
+                return constructor(application)
+        return None
+
+
 class SiteAdapterMixin(object):
     site_adapter_class = None
 
@@ -8,6 +8,37 @@ class Setting(object):
     endpoints = Container()
     scheme = "https"
     debug = False
+    # Validate server generated JSON against its schema before sending it,
+    # may be disabled in production once the output is known to be valid
+    validate_output = True
+    # Largest accepted request body in bytes, larger requests are answered
+    # with '413 Payload Too Large' before their body is read
+    max_body_size = 64 * 1024
+
+    # Attributes built from other settings by a `_build_<name>` method,
+    # mapped to the names of the settings they are built from. Assigning
+    # one of those settings after construction rebuilds the attribute, the
+    # replaced value is passed to `_release_<name>` if it is defined
+    derived = {}
+
+    def build_derived(self, *names):
+        """
+            Builds the derived attributes `names`, all of them by default.
+            Nothing is assigned if a builder fails.
+        """
+        names = names or list(self.derived)
+        built = [
+            (name, getattr(self, "_build_{}".format(name))())
+            for name in names
+        ]
+        for name, value in built:
+            previous = self.__dict__.get(name)
+            super(Setting, self).__setattr__(name, value)
+
+            release = getattr(self, "_release_{}".format(name), None)
+            if release is not None and previous is not None and \
+                    previous is not value:
+                release(previous)
 
     def __setattr__(self, key, value):
         if key == "scheme":
@@ -26,4 +57,24 @@ class Setting(object):
                     "HTTPS!",
                     RuntimeWarning
                 )
+
+        dependents = [
+            name for name, knobs in self.derived.items()
+            if key in knobs and name in self.__dict__
+        ]
+        if not dependents:
+            super(Setting, self).__setattr__(key, value)
+            return
+
+        missing = object()
+        previous = self.__dict__.get(key, missing)
         super(Setting, self).__setattr__(key, value)
+        try:
+            self.build_derived(*dependents)
+        except Exception:
+            # Keep the setting consistent with the attributes built from it
+            if previous is missing:
+                del self.__dict__[key]
+            else:
+                self.__dict__[key] = previous
+            raise
@@ -0,0 +1,189 @@
+import asyncio
+
+from spresso.controller.web.base import RouteTable
+from spresso.model.request import AsyncHttpClient
+from spresso.model.web.asgi import AsgiRequest
+from spresso.model.web.base import BODILESS_STATUS_CODES, encode_body, \
+    read_blocks
+from spresso.utils.error import PayloadTooLargeError
+
+
+async def send_response(send, status_code, headers, data, executor=None):
+    """
+        Sends the data of a :class:`Response` on the send channel. Files
+        and iterators are read block by block in `executor`, so blocking
+        reads do not stall the event loop.
+    """
+    body, length = encode_body(data)
+    headers = list(headers)
+    if length is not None and status_code not in BODILESS_STATUS_CODES and \
+            "Content-Length" not in dict(headers):
+        headers.append(("Content-Length", str(length)))
+
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (name.encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ]
+    })
+
+    if isinstance(body, list):
+        await send({
+            "type": "http.response.body",
+            "body": b"".join(body)
+        })
+        return
+
+    if hasattr(body, "read"):
+        body = read_blocks(body)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            # Chunks are byte strings, None marks the end of the body
+            chunk = await loop.run_in_executor(executor, next, body, None)
+            if chunk is None:
+                break
+            await send({
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": True
+            })
+    finally:
+        # Releases files of bodies that were not sent completely
+        body.close()
+    await send({"type": "http.response.body", "body": b""})
+
+
+class AsgiApplication(object):
+    """
+    Implements ASGI.
+    Request bodies are limited to the `max_body_size` of the settings of
+    the grant serving the route. Blocking grant handlers are run in
+    `executor`, which defaults to the default executor of the event loop.
+    The connection pools of the asynchronous HTTP clients of the grants are
+    closed on lifespan shutdown.
+    """
+
+    def __init__(self, application, executor=None):
+        self.application = application
+        self.executor = executor
+        self.route_table = RouteTable(application.grant_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        if scope["type"] != "http":
+            raise ValueError(
+                "Unsupported scope type '{0}'".format(scope["type"])
+            )
+
+        path = scope["path"]
+        method = scope["method"]
+        status, route = self.route_table.match(method, path)
+
+        if status == RouteTable.NOT_FOUND:
+            return await send_response(
+                send,
+                404,
+                [('Content-Type', 'text/plain')],
+                b'Not Found'
+            )
+
+        if status == RouteTable.METHOD_NOT_ALLOWED:
+            allow = ", ".join(self.route_table.allowed_methods(path))
+            return await send_response(
+                send,
+                405,
+                [('Content-Type', 'text/plain'), ('Allow', allow)],
+                b'Method Not Allowed'
+            )
+
+        request = AsgiRequest(scope)
+        try:
+            await request.read_body(
+                receive,
+                max_body_size=self.route_table.max_body_size(method, path)
+            )
+        except PayloadTooLargeError:
+            return await send_response(
+                send,
+                413,
+                [('Content-Type', 'text/plain')],
+                b'Payload Too Large'
+            )
+
+        response = await self.application.dispatch_async(
+            request,
+            scope,
+            route=route,
+            executor=self.executor
+        )
+
+        await send_response(
+            send,
+            response.status_code,
+            response.headers.items(),
+            response.data,
+            executor=self.executor
+        )
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def close(self):
+        """Closes the connection pools the grants opened on this loop."""
+        clients = []
+        for grant in self.application.grant_types:
+            settings = getattr(grant, "settings", None)
+            client = getattr(settings, "async_http_client", None)
+            if isinstance(client, AsyncHttpClient) and client not in clients:
+                clients.append(client)
+
+        for client in clients:
+            await client.aclose()
+
+
+class AsgiPathDispatcher(object):
+    def __init__(self, default_app, app):
+        self.default_app = default_app
+
+        if not isinstance(app, AsgiApplication):
+            raise ValueError("'app' must be of type {0}".format(
+                AsgiApplication.__name__)
+            )
+        self.app = app
+
+    def get_application(self, scope):
+        if scope["type"] != "http":
+            return None
+
+        path = scope["path"]
+        status, _ = self.app.route_table.match(scope["method"], path)
+        if status == RouteTable.FOUND:
+            return self.app
+
+        # Answer with 405 unless the default application knows the path
+        if status == RouteTable.METHOD_NOT_ALLOWED and \
+                isinstance(self.default_app, AsgiApplication) and \
+                path not in self.default_app.route_table:
+            return self.app
+
+        return None
+
+    async def __call__(self, scope, receive, send):
+        app = self.get_application(scope)
+
+        if app is None:
+            app = self.default_app
+
+        return await app(scope, receive, send)
@@ -0,0 +1,78 @@
+from spresso.controller.grant.base import RoutedGrantHandlerFactory
+from spresso.controller.grant.settings import Setting
+
+
+class RouteTable(object):
+    """
+        Maps (method, path) to the handler constructor of the grant serving
+        the endpoint. Grants that do not declare routes are registered with
+        their settings endpoints and a `None` constructor, the application
+        then resolves them by calling every grant factory.
+        Every route keeps the `max_body_size` of the settings of its grant.
+    """
+    FOUND = 200
+    NOT_FOUND = 404
+    METHOD_NOT_ALLOWED = 405
+
+    def __init__(self, grants):
+        self.routes = dict()
+        self.methods = dict()
+        self.max_body_sizes = dict()
+
+        for grant in grants:
+            if isinstance(grant, RoutedGrantHandlerFactory):
+                routes = grant.routes()
+            else:
+                routes = [
+                    (endpoint, None)
+                    for endpoint in grant.settings.endpoints.all().values()
+                ]
+
+            for endpoint, constructor in routes:
+                self.add(
+                    endpoint,
+                    constructor,
+                    max_body_size=grant.settings.max_body_size
+                )
+
+    def add(self, endpoint, constructor,
+            max_body_size=Setting.max_body_size):
+        methods = self.methods.setdefault(endpoint.path, [])
+        for method in endpoint.methods:
+            # The first grant serving an endpoint takes precedence
+            self.routes.setdefault((method, endpoint.path), constructor)
+            self.max_body_sizes.setdefault(
+                (method, endpoint.path),
+                max_body_size
+            )
+            if method not in methods:
+                methods.append(method)
+
+    def match(self, method, path):
+        """
+            Returns a (status, constructor) tuple, the status is one of
+            `FOUND`, `NOT_FOUND` or `METHOD_NOT_ALLOWED`.
+        """
+        key = (method, path)
+        if key in self.routes:
+            return self.FOUND, self.routes[key]
+
+        if path in self.methods:
+            return self.METHOD_NOT_ALLOWED, None
+
+        return self.NOT_FOUND, None
+
+    def max_body_size(self, method, path):
+        """
+            Returns the largest accepted request body of a route in bytes.
+        """
+        return self.max_body_sizes.get((method, path), Setting.max_body_size)
+
+    def allowed_methods(self, path):
+        return self.methods.get(path, [])
+
+    def __contains__(self, path):
+        return path in self.methods
+
+    def __len__(self):
+        return len(self.routes)
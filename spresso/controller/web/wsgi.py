@@ -1,46 +1,99 @@
-from spresso.model.web.wsgi import WsgiRequest
+import warnings
 
+from spresso.controller.web.base import RouteTable
+from spresso.model.web.base import BLOCK_SIZE, BODILESS_STATUS_CODES, \
+    encode_body, read_blocks
+from spresso.model.web.wsgi import WsgiRequest, content_length
 
-def in_supported_endpoints(endpoints, environ):
-    def f(x):
-        return environ['PATH_INFO'] == x.path and \
-               environ['REQUEST_METHOD'] in x.methods
 
-    return any(map(f, endpoints.values()))
+def in_supported_endpoints(endpoints, environ):
+    """
+        Deprecated, requests are matched by the :class:`RouteTable
+        <spresso.controller.web.base.RouteTable>` of the application.
+    """
+    warnings.warn(
+        "'in_supported_endpoints' is deprecated, use "
+        "'WsgiApplication.route_table.match' instead",
+        DeprecationWarning,
+        stacklevel=2
+    )
+    route_table = RouteTable([])
+    for endpoint in endpoints.values():
+        route_table.add(endpoint, None)
+    status, _ = route_table.match(
+        environ['REQUEST_METHOD'],
+        environ['PATH_INFO']
+    )
+    return status == RouteTable.FOUND
 
 
 class WsgiApplication(object):
     """
     Implements WSGI.
+    Request bodies are limited to the `max_body_size` of the settings of
+    the grant serving the route. Response bodies are passed to the server
+    as they are, with their `Content-Length` if it is known, file bodies
+    are sent through the `wsgi.file_wrapper` of the server.
     """
     HTTP_CODES = {200: "200 OK",
                   301: "301 Moved Permanently",
                   302: "302 Found",
+                  304: "304 Not Modified",
                   400: "400 Bad Request",
                   401: "401 Unauthorized",
                   404: "404 Not Found",
-                  405: "405 Method not allowed"}
+                  405: "405 Method not allowed",
+                  413: "413 Payload Too Large"}
 
     def __init__(self, application):
         self.application = application
-        self.endpoints = dict()
-        for grant in application.grant_types:
-            self.endpoints.update(grant.settings.endpoints.all())
+        self.route_table = RouteTable(application.grant_types)
 
     def __call__(self, environ, start_response):
-        if not self.endpoints or \
-                not in_supported_endpoints(self.endpoints, environ):
+        path = environ['PATH_INFO']
+        method = environ['REQUEST_METHOD']
+        status, route = self.route_table.match(method, path)
+
+        if status == RouteTable.NOT_FOUND:
             start_response('404 NOT FOUND', [('Content-Type', 'text/plain')])
             return [b'Not Found']
 
+        if status == RouteTable.METHOD_NOT_ALLOWED:
+            allow = ", ".join(self.route_table.allowed_methods(path))
+            start_response(self.HTTP_CODES[405], [
+                ('Content-Type', 'text/plain'),
+                ('Allow', allow)
+            ])
+            return [b'Method Not Allowed']
+
+        # Bodies are only read on demand, oversized ones never
+        length = content_length(environ)
+        if length and length > self.route_table.max_body_size(method, path):
+            start_response(self.HTTP_CODES[413], [
+                ('Content-Type', 'text/plain')
+            ])
+            return [b'Payload Too Large']
+
         request = WsgiRequest(environ)
 
-        response = self.application.dispatch(request, environ)
+        response = self.application.dispatch(request, environ, route=route)
 
-        start_response(self.HTTP_CODES[response.status_code],
-                       list(response.headers.items()))
+        body, length = encode_body(response.data)
+        headers = list(response.headers.items())
+        if length is not None and \
+                response.status_code not in BODILESS_STATUS_CODES and \
+                "Content-Length" not in response.headers:
+            headers.append(("Content-Length", str(length)))
 
-        return [response.data.encode('utf-8')]
+        start_response(self.HTTP_CODES[response.status_code], headers)
+
+        if hasattr(body, "read"):
+            file_wrapper = environ.get("wsgi.file_wrapper")
+            if file_wrapper is not None:
+                return file_wrapper(body, BLOCK_SIZE)
+            return read_blocks(body)
+
+        return body
 
 
 class PathDispatcher(object):
@@ -54,8 +107,20 @@ class PathDispatcher(object):
         self.app = app
 
     def get_application(self, environ):
-        if in_supported_endpoints(self.app.endpoints, environ):
+        path = environ['PATH_INFO']
+        status, _ = self.app.route_table.match(
+            environ['REQUEST_METHOD'],
+            path
+        )
+        if status == RouteTable.FOUND:
             return self.app
+
+        # Answer with 405 unless the default application knows the path
+        if status == RouteTable.METHOD_NOT_ALLOWED and \
+                isinstance(self.default_app, WsgiApplication) and \
+                path not in self.default_app.route_table:
+            return self.app
+
         return None
 
     def __call__(self, environ, start_response):
@@ -1,60 +1,115 @@
-from spresso.model.base import Composition, SettingsMixin
-from spresso.utils.base import update_existing_keys, \
-    to_b64, from_b64
+from collections import namedtuple
+
+from spresso.model.base import ExtensibleRecord, Record, SettingsMixin
+from spresso.utils.base import to_b64, from_b64
 from spresso.utils.crypto import create_signature, decrypt_aes_gcm, \
-    verify_signature
+    verify_signature, verify_signatures
 from spresso.utils.error import InvalidSettings
 
 
-class IdentityAssertionBase(Composition, SettingsMixin):
+class AssertionPayload(ExtensibleRecord):
+    """The signed content of an identity assertion."""
+    __slots__ = fields = ("email", "forwarder_domain", "tag")
+
+
+class EncryptedAssertion(Record):
+    __slots__ = fields = ("ciphertext", "iv")
+
+
+class AssertionSignature(Record):
+    __slots__ = fields = ("ia_signature",)
+
+
+class IdentityAssertionBase(SettingsMixin):
     """
     Basic Identity Assertion Class.
-    The template instances 'signature' and 'expected_signature'
-    can be extended to hold further information.
+    The payloads 'signature' and 'expected_signature' can be extended to
+    hold further information, their fields are taken from the attributes of
+    the same name. The IdP only uses 'signature' and the RP only
+    'expected_signature', each payload is created on first access.
     Object is used by IdP and RP.
     """
-    template = Composition(
-        tag=None,
-        email=None,
-        forwarder_domain=None
+    __slots__ = (
+        "settings",
+        "_expected_signature",
+        "_signature",
+        "tag",
+        "email",
+        "forwarder_domain",
+        "public_key",
+        "signature_scheme",
+        "iv",
+        "cipher_text",
+        "ia_key"
     )
+    template = AssertionPayload
 
     def __init__(self, **kwargs):
         super(IdentityAssertionBase, self).__init__(**kwargs)
-        self.expected_signature = Composition()
-        self.expected_signature.update(self.template)
-        self.signature = Composition()
-        self.signature.update(self.template)
+        self._expected_signature = None
+        self._signature = None
         self.tag = None
         self.email = None
         self.forwarder_domain = None
         self.public_key = None
+        self.signature_scheme = None
         self.iv = None
         self.cipher_text = None
         self.ia_key = None
 
+    @property
+    def expected_signature(self):
+        if self._expected_signature is None:
+            self._expected_signature = self.template()
+        return self._expected_signature
+
+    @expected_signature.setter
+    def expected_signature(self, payload):
+        self._expected_signature = payload
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = self.template()
+        return self._signature
+
+    @signature.setter
+    def signature(self, payload):
+        self._signature = payload
+
     def from_session(self, session):
         self.tag = session.tag_enc_json
         self.email = session.user.email
         self.forwarder_domain = session.forwarder_domain
         self.ia_key = session.ia_key
         self.public_key = session.idp_wk.public_key
+        self.signature_scheme = session.idp_wk.signature_scheme
 
     def from_request(self, request):
         self.email = request.post_param('email')
         self.tag = request.post_param('tag')
         self.forwarder_domain = request.post_param('forwarder_domain')
 
+    def update_payload(self, payload):
+        """
+        Sets the fields of `payload` the assertion has an attribute for,
+        they take precedence over additional data of the same name.
+        """
+        for name in payload.fields:
+            if hasattr(self, name):
+                payload[name] = getattr(self, name)
+
 
 class IdentityAssertion(IdentityAssertionBase):
+    __slots__ = ()
+
     def sign(self):
         """
         Method for signing the identity assertion.
         """
-        # Update IA template with values from self
-        update_existing_keys(self, self.signature)
+        self.update_payload(self.signature)
 
-        if self.settings.private_key is None:
+        if self.settings.private_key is None and self.settings.signer is None:
             raise InvalidSettings(
                 "Private key is empty"
             )
@@ -69,12 +124,20 @@ class IdentityAssertion(IdentityAssertionBase):
         ia_json_bytes = ia_json.encode('utf-8')
 
         # Create signature
-        signature = create_signature(self.settings.private_key, ia_json_bytes)
+        if self.settings.signer is None:
+            signature = create_signature(
+                self.settings.private_key,
+                ia_json_bytes
+            )
+        else:
+            signature = self.settings.signer.sign(
+                self.settings.private_key,
+                ia_json_bytes
+            )
         return to_b64(signature)
 
     def decrypt(self, data):
-        eia = Composition()
-        eia.from_json(data)
+        eia = EncryptedAssertion.from_json(data)
 
         self.iv = eia.iv
         self.cipher_text = eia.ciphertext
@@ -104,20 +167,35 @@ class IdentityAssertion(IdentityAssertionBase):
         Verifies with a public key from whom the data came that
         it was indeed signed by their private key
         """
+        public_key_bytes, signature_bytes, expected_signature_bytes = \
+            self.verification_input(signature)
+
+        # Verify, throws exception on failure. The scheme is selected by the
+        # key type and has to match the advertised one
+        verify_signature(
+            public_key_bytes,
+            signature_bytes,
+            expected_signature_bytes,
+            scheme=self.signature_scheme
+        )
+
+    def verification_input(self, signature):
+        """
+        Returns the public key, the signature and the signed data
+        of an identity assertion as bytes
+        """
         # Get signature from IA
         if signature is None:
             raise ValueError("Empty required parameter during: signature")
 
         ia = signature.decode('utf-8')
 
-        ia_json = Composition()
-        ia_json.from_json(ia)
-
-        signature_b64 = ia_json.ia_signature
+        signature_b64 = AssertionSignature.from_json(ia).ia_signature
+        if signature_b64 is None:
+            raise ValueError("Empty required parameter in signature")
         signature_bytes = from_b64(signature_b64, return_bytes=True)
 
-        # Update IA template with values from self
-        update_existing_keys(self, self.expected_signature)
+        self.update_payload(self.expected_signature)
 
         if None in [*self.expected_signature.values(), self.public_key]:
             raise ValueError("Empty required parameter in expected signature")
@@ -125,11 +203,61 @@ class IdentityAssertion(IdentityAssertionBase):
         # Get expected signature
         expected_signature = self.expected_signature.to_json()
         expected_signature_bytes = expected_signature.encode('utf-8')
-        public_key_bytes = self.public_key.encode('utf-8')
+        public_key_bytes = self.public_key
+        if isinstance(public_key_bytes, str):
+            public_key_bytes = public_key_bytes.encode('utf-8')
 
-        # Verify, throws exception on failure
-        verify_signature(
-            public_key_bytes,
-            signature_bytes,
-            expected_signature_bytes
-        )
+        return public_key_bytes, signature_bytes, expected_signature_bytes
+
+
+#: Identity assertion to verify in a batch. `expected_signature` holds the
+#: expected fields including additional data, `signature` the decrypted
+#: identity assertion as passed to :meth:`IdentityAssertion.verify`.
+VerificationRecord = namedtuple(
+    "VerificationRecord",
+    ["expected_signature", "signature", "public_key", "signature_scheme"]
+)
+VerificationRecord.__new__.__defaults__ = (None,)
+
+#: Outcome of a record, `error` describes why the record is invalid
+VerificationResult = namedtuple("VerificationResult", ["valid", "error"])
+
+
+def verify_batch(records, workers=None, executor=None):
+    """
+    Verifies many identity assertions, e.g. to re-audit stored logins.
+    Records are grouped by public key, each key is loaded once per process.
+    Failures do not abort the batch, a result is returned per record.
+    :param records: iterable of VerificationRecord
+    :param workers: number of worker processes, 0 verifies in this process
+    :param executor: concurrent.futures.Executor to use instead of a new
+        process pool
+    :return: list of VerificationResult, in the order of the records
+    """
+    records = list(records)
+    results = [None] * len(records)
+    items = []
+    positions = []
+
+    for index, record in enumerate(records):
+        ia = IdentityAssertion(settings=None)
+        fields = dict(record.expected_signature)
+        for key in ia.template.fields:
+            setattr(ia, key, fields.get(key))
+        ia.expected_signature.update(fields)
+        ia.public_key = record.public_key
+
+        try:
+            public_key, signature, data = \
+                ia.verification_input(record.signature)
+        except Exception as error:
+            results[index] = VerificationResult(False, str(error))
+            continue
+        items.append((public_key, signature, data, record.signature_scheme))
+        positions.append(index)
+
+    errors = verify_signatures(items, workers=workers, executor=executor)
+    for index, error in zip(positions, errors):
+        results[index] = VerificationResult(error is None, error)
+
+    return results
@@ -9,6 +9,7 @@ class WellKnownInfoDefinition(AuthenticationJsonSchema):
     file_path = "json/wk_info.json"
 
     public_key = "public_key"
+    signature_scheme = "signature_scheme"
 
 
 class IdentityAssertionDefinition(AuthenticationJsonSchema):
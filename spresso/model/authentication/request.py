@@ -1,5 +1,6 @@
 from spresso.model.base import SettingsMixin
 from spresso.model.request import GetRequest
+from spresso.utils.instrumentation import instrumentation
 
 
 class IdpInfoRequest(SettingsMixin):
@@ -19,7 +20,9 @@ class IdpInfoRequest(SettingsMixin):
             netloc,
             endpoint.get("info").path,
             self.settings.verify,
-            self.settings.proxies
+            self.settings.proxies,
+            client=self.settings.http_client,
+            async_client=self.settings.async_http_client
         )
 
     def get_content(self):
@@ -27,11 +30,33 @@ class IdpInfoRequest(SettingsMixin):
         if cache:
             return cache
 
-        response = self.instance.request()
+        # Concurrent cache misses share one request per netloc
+        return self.settings.info_flight.do(self.netloc, self._fetch)
 
+    async def aget_content(self):
+        cache = self.settings.cache.get(self.netloc)
+        if cache:
+            return cache
+
+        return await self.settings.info_flight.do_async(
+            self.netloc,
+            self._afetch
+        )
+
+    def _fetch(self):
+        with instrumentation.measure("idp_info.fetch"):
+            response = self.instance.request()
+        return self._store(response.text)
+
+    async def _afetch(self):
+        with instrumentation.measure("idp_info.fetch"):
+            response = await self.instance.request_async()
+        return self._store(response.text)
+
+    def _store(self, text):
         self.settings.cache.set(
             self.netloc,
             self.settings.caching_settings.select(self.netloc),
-            response.text
+            text
         )
-        return response.text
+        return text
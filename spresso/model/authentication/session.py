@@ -1,10 +1,32 @@
+import json
+import struct
 from urllib.parse import quote
 
 from spresso.controller.grant.authentication.config.relying_party import \
     RelyingParty
 from spresso.model.authentication.tag import Tag
-from spresso.model.base import Composition, SettingsMixin, User
-from spresso.utils.base import create_nonce, get_url, to_b64
+from spresso.model.authentication.well_known_info import WellKnownInfo
+from spresso.model.base import SettingsMixin, User
+from spresso.utils.base import get_url, random_pool, to_b64
+from spresso.utils.crypto import key_registry, signature_schemes
+
+#: Format version, flags and the fixed size secrets of a serialised session,
+#: followed by length prefixed fields
+SESSION_HEADER = struct.Struct(">BB32s32s32s12s")
+FIELD_LENGTH = struct.Struct(">H")
+FIELD_COUNT = 6
+NONE_LENGTH = 0xffff
+NONE_FIELD = FIELD_LENGTH.pack(NONE_LENGTH)
+
+FORMAT_VERSION = 1
+FLAG_PADDING = 1
+FLAG_KEY_DIGEST = 2
+
+
+def _decode(field):
+    if field is None:
+        return None
+    return field.decode('utf-8')
 
 
 class Session(SettingsMixin):
@@ -12,11 +34,164 @@ class Session(SettingsMixin):
         super(Session, self).__init__(**kwargs)
         self.user = user
         self.idp_info = idp_info
-        self.rp_nonce = create_nonce(32)
-        self.token = create_nonce(32)
-        self.ia_key = create_nonce(32)
-        self.tag_key = create_nonce(32)
-        self.tag_iv = create_nonce(12)
+
+        # Draw the secrets of the session from the pool at once
+        secrets = random_pool.read(4 * 32 + 12)
+        self.rp_nonce = secrets[0:32]
+        self.token = secrets[32:64]
+        self.ia_key = secrets[64:96]
+        self.tag_key = secrets[96:128]
+        self.tag_iv = secrets[128:140]
+
+        # Set once the tag is encrypted, the tag key and iv are only used once
+        self.tag_enc_json = None
+
+        # Set by sealed sessions, see :meth:`seal`
+        self.token_id = None
+        self.expires = None
+        self.idp_key_digest = None
+
+    @classmethod
+    def from_bytes(cls, data, settings):
+        """
+            Restores a session serialised by :meth:`to_bytes` and binds it
+            to `settings`.
+            Raises a ValueError if `data` is malformed or of another format
+            version.
+            :param data: byte
+            :param settings: RelyingParty
+            :return: Session
+        """
+        try:
+            version, flags, rp_nonce, ia_key, tag_key, tag_iv = \
+                SESSION_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("Malformed session")
+
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported session format version {0}".format(version)
+            )
+
+        fields = []
+        offset = SESSION_HEADER.size
+        try:
+            for _ in range(FIELD_COUNT):
+                length, = FIELD_LENGTH.unpack_from(data, offset)
+                offset += FIELD_LENGTH.size
+                if length == NONE_LENGTH:
+                    fields.append(None)
+                else:
+                    fields.append(bytes(data[offset:offset + length]))
+                    offset += length
+        except struct.error:
+            raise ValueError("Malformed session")
+
+        if offset != len(data):
+            raise ValueError("Malformed session")
+
+        token, email, forwarder_domain, tag_enc_json, public_key, \
+            signature_scheme = fields
+
+        # The secrets are restored, do not draw new ones
+        session = cls.__new__(cls)
+        SettingsMixin.__init__(session, settings)
+        session.user = User(email.decode('utf-8'), regexp=settings.regexp)
+        session.idp_info = None
+        session.rp_nonce = rp_nonce
+        session.token = token
+        session.ia_key = ia_key
+        session.tag_key = tag_key
+        session.tag_iv = tag_iv
+        session.tag_enc_json = _decode(tag_enc_json)
+        session.token_id = None
+        session.expires = None
+        session.idp_key_digest = None
+
+        # The forwarder selected at the start of the login is kept
+        session._bind_settings()
+        session.padding = bool(flags & FLAG_PADDING)
+        session.forwarder_domain = _decode(forwarder_domain)
+
+        if flags & FLAG_KEY_DIGEST:
+            session.idp_key_digest = public_key
+        elif public_key is not None:
+            session.idp_wk = WellKnownInfo(
+                public_key=public_key.decode('utf-8'),
+                signature_scheme=_decode(signature_scheme)
+            )
+        return session
+
+    def to_bytes(self, key_digest=False):
+        """
+            Serialises the state of a validated session in a compact,
+            versioned format, see :meth:`from_bytes`.
+            The settings, the JSON schema and the well known info are not
+            included, only the public key and signature scheme of the IdP.
+            :param key_digest: bool, stores the SHA-256 digest of the public
+                key instead of the key
+            :return: byte
+        """
+        flags = 0
+        if self.padding:
+            flags |= FLAG_PADDING
+
+        idp_wk = getattr(self, "idp_wk", None)
+        public_key = None
+        signature_scheme = None
+        if idp_wk is not None:
+            public_key = idp_wk.public_key.encode('utf-8')
+            signature_scheme = idp_wk.signature_scheme
+            if key_digest:
+                flags |= FLAG_KEY_DIGEST
+                public_key = key_registry.digest(public_key)
+
+        parts = [
+            SESSION_HEADER.pack(
+                FORMAT_VERSION,
+                flags,
+                self.rp_nonce,
+                self.ia_key,
+                self.tag_key,
+                self.tag_iv
+            )
+        ]
+        for field in [
+            self.token,
+            self.user.email,
+            self.forwarder_domain,
+            self.tag_enc_json,
+            public_key,
+            signature_scheme
+        ]:
+            if field is None:
+                parts.append(NONE_FIELD)
+                continue
+            if isinstance(field, str):
+                field = field.encode('utf-8')
+            if len(field) >= NONE_LENGTH:
+                raise ValueError("Session field exceeds the maximum length")
+            parts.append(FIELD_LENGTH.pack(len(field)))
+            parts.append(field)
+
+        return b"".join(parts)
+
+    @classmethod
+    def unseal(cls, token, settings):
+        """
+            Restores a session sealed by :meth:`seal`.
+            The well known info of the IdP is not part of the token, it has
+            to be bound by :meth:`bind_well_known_info` before the identity
+            assertion is verified.
+            Raises a ValueError if the token is invalid or expired.
+        """
+        expires, state = settings.session_sealer.unseal(token)
+
+        session = cls.from_bytes(state, settings)
+        session.token_id = session.token
+        session.token = token
+        session.expires = expires
+        return session
 
     def validate(self):
         self._validate_user()
@@ -37,6 +212,12 @@ class Session(SettingsMixin):
                 )
             )
 
+        self._bind_settings()
+        forward = self.settings.fwd_selector.select(self.user.netloc)
+        self.padding = forward.padding
+        self.forwarder_domain = forward.domain
+
+    def _bind_settings(self):
         self.idp_endpoints = self.settings.endpoints_ext.select(
             self.user.netloc
         )
@@ -46,27 +227,71 @@ class Session(SettingsMixin):
             self.settings.scheme,
             self.settings.domain
         )
-        forward = self.settings.fwd_selector.select(self.user.netloc)
-        self.padding = forward.padding
-        self.forwarder_domain = forward.domain
 
     def _validate_well_known_info(self):
-        request_json = Composition()
-        request_json.from_json(self.idp_info)
+        request_json = json.loads(self.idp_info)
 
         self.schema.validate(request_json)
 
-        idp_wk = Composition(
-            public_key=request_json[self.schema.public_key]
+        # Schemes are registered at runtime, the schema accepts any name
+        signature_scheme = request_json.get(self.schema.signature_scheme)
+        if signature_scheme is not None and \
+                signature_scheme not in signature_schemes:
+            raise ValueError(
+                "Unsupported signature scheme '{0}'".format(signature_scheme)
+            )
+
+        self.idp_wk = WellKnownInfo(
+            public_key=request_json[self.schema.public_key],
+            signature_scheme=signature_scheme
         )
-        self.idp_wk = idp_wk
 
-    def get_login_url(self):
+    def seal(self):
+        """
+            Seals the state of the validated session into its token, which
+            replaces storing the session by the site adapter.
+        """
+        if self.tag_enc_json is None:
+            self.encrypt_tag()
+
+        self.token_id = self.token
+        self.token, self.expires = self.settings.session_sealer.seal(
+            self.to_bytes(key_digest=True)
+        )
+
+    def bind_well_known_info(self, idp_info):
+        """
+            Binds the well known info to a sealed session.
+            Raises a ValueError if the public key of the IdP is not the one
+            the session was started with.
+        """
+        self.idp_info = idp_info
+        self._validate_well_known_info()
+
+        digest = key_registry.digest(self.idp_wk.public_key)
+        if digest != self.idp_key_digest:
+            raise ValueError(
+                "The public key of the Identity Provider has changed"
+            )
+
+    def consume(self):
+        """Marks a sealed session as used, False if it was used before."""
+        return self.settings.session_sealer.consume(
+            self.token_id,
+            self.expires
+        )
+
+    def encrypt_tag(self):
         tag = self._create_tag()
         tag_enc = tag.encrypt(self.padding)
+        self.tag_enc_json = tag_enc.to_json()
+        return self.tag_enc_json
+
+    def get_login_url(self):
+        if self.tag_enc_json is None:
+            self.encrypt_tag()
         ld_path = self._create_ld_path()
 
-        self.tag_enc_json = tag_enc.to_json()
         email = self.user.email
         ia_key = to_b64(self.ia_key)
 
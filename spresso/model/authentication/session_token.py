@@ -0,0 +1,101 @@
+import struct
+import time
+
+from cryptography.exceptions import InvalidTag
+
+from spresso.model.base import SettingsMixin
+from spresso.model.cache import ConsumedTokenCache
+from spresso.utils.base import random_pool
+from spresso.utils.crypto import AES_GCM_TAG_LENGTH, aes_gcm, \
+    decrypt_aes_gcm, encrypt_aes_gcm
+
+#: Format version and expiry timestamp, authenticated but not encrypted
+HEADER = struct.Struct(">BQ")
+
+IV_LENGTH = 12
+
+
+class SessionSealer(SettingsMixin):
+    """
+        Seals the state of a login session with AES-GCM into the login
+        session token, so that the Relying Party does not need to store
+        sessions between the requests of a login.
+        A token carries its expiry in the clear and the sealed state, which
+        holds the random id of the token. Tokens are accepted until they
+        expire and consumed at most once, see :meth:`consume`.
+
+        The consumed token ids are only known to the process. Relying
+        Parties running several processes may replace `consumed` by a shared
+        store implementing :meth:`ConsumedTokenCache.consume
+        <spresso.model.cache.ConsumedTokenCache.consume>`.
+    """
+    version = 1
+
+    def __init__(self, settings, key, lifetime=600, max_entries=65536):
+        super(SessionSealer, self).__init__(settings)
+        # Fails early on keys of an invalid size. The key is expanded once,
+        # it is used for every token
+        self.cipher = aes_gcm(key)
+        self.key = key
+        self.lifetime = lifetime
+        self.consumed = ConsumedTokenCache(settings, max_entries=max_entries)
+
+    def seal(self, state):
+        """
+            Seals `state` into a token.
+            :param state: byte
+            :return: byte, int (token, expiry timestamp)
+        """
+        expires = int(time.time()) + self.lifetime
+        header = HEADER.pack(self.version, expires)
+        # Random IVs, the key must be replaced long before 2^32 tokens
+        iv = random_pool.read(IV_LENGTH)
+        cipher_text, tag = encrypt_aes_gcm(
+            self.cipher,
+            iv,
+            state,
+            header
+        )
+        return header + iv + cipher_text + tag, expires
+
+    def unseal(self, token):
+        """
+            Opens a token created by :meth:`seal`.
+            Raises a ValueError if the token is malformed, expired or was
+            not sealed with the key of the sealer.
+            :param token: byte
+            :return: int, byte (expiry timestamp, state)
+        """
+        if len(token) < HEADER.size + IV_LENGTH + AES_GCM_TAG_LENGTH:
+            raise ValueError("Malformed login session token")
+
+        version, expires = HEADER.unpack_from(token)
+        if version != self.version:
+            raise ValueError("Unsupported login session token version")
+
+        # Expired tokens are rejected without decrypting them
+        if expires <= time.time():
+            raise ValueError("Login session token expired")
+
+        iv = token[HEADER.size:HEADER.size + IV_LENGTH]
+        try:
+            state = decrypt_aes_gcm(
+                self.cipher,
+                iv,
+                token[-AES_GCM_TAG_LENGTH:],
+                token[HEADER.size + IV_LENGTH:-AES_GCM_TAG_LENGTH],
+                token[:HEADER.size]
+            )
+        except InvalidTag:
+            raise ValueError("Invalid login session token")
+
+        return expires, state
+
+    def consume(self, token_id, expires):
+        """
+            Marks a token as used.
+            :param token_id: byte
+            :param expires: int
+            :return: bool, False if the token was used before
+        """
+        return self.consumed.consume(token_id, expires)
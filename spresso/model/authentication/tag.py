@@ -1,21 +1,24 @@
-from spresso.model.base import Composition
-from spresso.utils.base import to_b64, create_random_characters, \
-    update_existing_keys
+from spresso.model.base import Record
+from spresso.utils.base import to_b64, create_random_characters
 from spresso.utils.crypto import encrypt_aes_gcm
 
 
-class TagBase(Composition):
-    max_domain_length = 256
+class TagPayload(Record):
+    """The encrypted content of a tag."""
+    __slots__ = fields = ("rp_nonce", "rp_origin")
+
+
+class EncryptedTag(Record):
+    __slots__ = fields = ("ciphertext", "iv")
+
 
-    template = Composition(
-        rp_nonce=None,
-        rp_origin=None
-    )
+class TagBase(object):
+    __slots__ = ("rp_origin", "rp_nonce", "key", "iv")
 
-    def __init__(self, rp_origin, rp_nonce, key, iv, **kwargs):
-        super(TagBase, self).__init__(**kwargs)
-        self.tag = Composition()
-        self.tag.update(self.template)
+    max_domain_length = 256
+    template = TagPayload
+
+    def __init__(self, rp_origin, rp_nonce, key, iv):
         self.rp_origin = rp_origin
         self.rp_nonce = rp_nonce
         self.key = key
@@ -23,30 +26,34 @@ class TagBase(Composition):
 
 
 class Tag(TagBase):
+    __slots__ = ()
+
     def encrypt(self, padding=True):
         if None in [self.rp_nonce, self.rp_origin]:
             raise ValueError("Empty required parameter in tag")
 
-        self.rp_nonce = to_b64(self.rp_nonce)
-
+        rp_origin = self.rp_origin
         if padding:
             # Prevent Tag length side channel attacks by padding
-            padding_length = self.max_domain_length - len(self.rp_origin)
-            self.rp_origin += "={0}".format(
+            padding_length = self.max_domain_length - len(rp_origin)
+            rp_origin += "={0}".format(
                 create_random_characters(padding_length - 1)
             )
 
         # Create Tag
-        update_existing_keys(self, self.tag)
+        tag = self.template(
+            rp_nonce=to_b64(self.rp_nonce),
+            rp_origin=rp_origin
+        )
 
-        if None in [*self.tag, self.key, self.iv]:
+        if None in [self.key, self.iv]:
             raise ValueError("Empty required parameter during encryption")
 
-        tag_json = self.tag.to_json().encode('utf-8')
+        tag_json = tag.to_json().encode('utf-8')
 
         # Encrypt
         cipher_text, auth_tag = encrypt_aes_gcm(self.key, self.iv, tag_json)
 
         iv = to_b64(self.iv)
         encrypted_tag = to_b64(cipher_text + auth_tag)
-        return Composition(iv=iv, ciphertext=encrypted_tag)
+        return EncryptedTag(iv=iv, ciphertext=encrypted_tag)
@@ -0,0 +1,6 @@
+from spresso.model.base import Record
+
+
+class WellKnownInfo(Record):
+    """The well known info an IdP publishes, see `wk_info.json`."""
+    __slots__ = fields = ("public_key", "signature_scheme")
@@ -1,10 +1,13 @@
 import json
 import re
+from json.encoder import encode_basestring_ascii
 from urllib.parse import urlparse
 
-from jsonschema import validate
+from jsonschema import validators
+from jsonschema.exceptions import best_match
 
 from spresso.utils.base import get_resource, get_url
+from spresso.utils.instrumentation import instrumentation
 
 
 class Composition(dict):
@@ -24,7 +27,191 @@ class Composition(dict):
             self[key] = value
 
 
+class CanonicalEncoder(object):
+    """
+        Encodes the fields of a record exactly like
+        ``json.dumps(record.to_dict(), sort_keys=True)``, the canonical JSON
+        signed by the Identity Provider and rebuilt by the Relying Party.
+        The members are sorted and their keys escaped once per schema,
+        string and null values skip the generic encoder.
+    """
+    def __init__(self, fields):
+        self.members = [
+            (name, "{}: ".format(encode_basestring_ascii(name)))
+            for name in sorted(fields)
+        ]
+
+    def encode(self, record):
+        parts = []
+        for name, key in self.members:
+            value = getattr(record, name)
+            if value.__class__ is str:
+                parts.append(key + encode_basestring_ascii(value))
+            elif value is None:
+                parts.append(key + "null")
+            else:
+                parts.append(key + json.dumps(value, sort_keys=True))
+        return "{" + ", ".join(parts) + "}"
+
+
+class Record(object):
+    """
+        Value object with the fixed set of fields named in `fields`.
+        Subclasses declare the fields as their slots, e.g.
+        ``__slots__ = fields = ("email", "tag")``. Fields default to None,
+        records serialise to the canonical JSON of
+        :meth:`Composition.to_json` for the same items, using the
+        :class:`CanonicalEncoder` compiled for the class.
+    """
+    __slots__ = ()
+    fields = ()
+    encoder = CanonicalEncoder(fields)
+
+    def __init_subclass__(cls, **kwargs):
+        super(Record, cls).__init_subclass__(**kwargs)
+        cls.encoder = CanonicalEncoder(cls.fields)
+
+    def __init__(self, *args, **kwargs):
+        for name in self.fields:
+            setattr(self, name, None)
+        self.update(*args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        for mapping in args:
+            for name, value in mapping.items():
+                self[name] = value
+        for name, value in kwargs.items():
+            self[name] = value
+
+    def __setitem__(self, name, value):
+        if name not in self.fields:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __getitem__(self, name):
+        if name not in self.fields:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.to_dict())
+
+    def get(self, name, default=None):
+        if name in self.fields:
+            return getattr(self, name)
+        return default
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.fields]
+
+    def values(self):
+        return [getattr(self, name) for name in self.fields]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.fields}
+
+    def to_json(self):
+        return self.encoder.encode(self)
+
+    @classmethod
+    def from_json(cls, data):
+        """
+            Creates a record from a JSON object, other members are ignored.
+            Raises a ValueError if `data` is not a JSON object.
+        """
+        data_json = json.loads(data)
+        if not isinstance(data_json, dict):
+            raise ValueError("Expected a JSON object")
+
+        record = cls()
+        for name in cls.fields:
+            setattr(record, name, data_json.get(name))
+        return record
+
+
+class ExtensibleRecord(Record):
+    """
+        Record holding further items in `extra`, e.g. the additional data
+        of an identity assertion. Fields take precedence over extra items of
+        the same name. The dict of the extra items is only created once an
+        item is added.
+    """
+    __slots__ = ("_extra",)
+
+    #: Shared and never modified stand-in for an empty `extra`
+    _no_extra = {}
+
+    def __init__(self, *args, **kwargs):
+        self._extra = self._no_extra
+        super(ExtensibleRecord, self).__init__(*args, **kwargs)
+
+    @property
+    def extra(self):
+        if self._extra is self._no_extra:
+            self._extra = {}
+        return self._extra
+
+    def __setitem__(self, name, value):
+        if name in self.fields:
+            setattr(self, name, value)
+        else:
+            self.extra[name] = value
+
+    def __getitem__(self, name):
+        if name in self.fields:
+            return getattr(self, name)
+        return self._extra[name]
+
+    def __contains__(self, name):
+        return name in self.fields or name in self._extra
+
+    def __iter__(self):
+        return iter([*self.fields, *self._extra])
+
+    def __len__(self):
+        return len(self.fields) + len(self._extra)
+
+    def get(self, name, default=None):
+        if name in self.fields:
+            return getattr(self, name)
+        return self._extra.get(name, default)
+
+    def items(self):
+        return [*super(ExtensibleRecord, self).items(), *self._extra.items()]
+
+    def values(self):
+        return [*super(ExtensibleRecord, self).values(), *self._extra.values()]
+
+    def to_dict(self):
+        data = dict(self._extra)
+        for name in self.fields:
+            data[name] = getattr(self, name)
+        return data
+
+    def to_json(self):
+        # Extra items are not part of the compiled schema
+        if self._extra:
+            return json.dumps(self.to_dict(), sort_keys=True)
+        return self.encoder.encode(self)
+
+
 class SettingsMixin(object):
+    __slots__ = ()
+
     def __init__(self, settings):
         super(SettingsMixin, self).__init__()
         self.settings = settings
@@ -34,9 +221,31 @@ class JsonSchema(object):
     resource_path = "resources/"
     file_path = ""
 
+    # Compiled validators, shared by all instances of a schema file
+    _validators = {}
+
     def validate(self, data_dict):
-        schema = json.loads(self.get_schema())
-        validate(data_dict, schema)
+        with instrumentation.measure(
+            "schema.validate",
+            schema=self.__class__.__name__
+        ):
+            error = best_match(self.validator.iter_errors(data_dict))
+        if error is not None:
+            raise error
+
+    @property
+    def validator(self):
+        handle = (self.resource_path, self.file_path)
+        validator = self._validators.get(handle)
+
+        if validator is None:
+            schema = json.loads(self.get_schema())
+            validator_class = validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            self._validators[handle] = validator
+
+        return validator
 
     def get_schema(self):
         return get_resource(self.resource_path, self.file_path)
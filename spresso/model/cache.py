@@ -1,8 +1,17 @@
+import hashlib
+import heapq
+import itertools
+import json
+import math
 import os
+import threading
 import time
+from collections import OrderedDict
 from tempfile import mkstemp
 
 from spresso.model.base import SettingsMixin
+from spresso.model.settings import CachingSetting
+from spresso.utils.base import to_b64
 
 
 class CacheEntry(object):
@@ -12,13 +21,20 @@ class CacheEntry(object):
         self.in_memory = in_memory
         self.data = None
         self.data_file = None
+        self.size = 0
 
     @property
     def valid(self):
         timestamp = time.time()
         return timestamp - self.timestamp < self.lifetime
 
+    @property
+    def expires(self):
+        return self.timestamp + self.lifetime
+
     def set_data(self, data):
+        self.size = len(data.encode('utf-8'))
+
         if self.in_memory:
             self.data = data
         else:
@@ -47,9 +63,40 @@ class CacheEntry(object):
 
             return data
 
+    def remove(self):
+        """Removes the backing file of a disk entry."""
+        if self.data_file is not None:
+            try:
+                os.remove(self.data_file)
+            except FileNotFoundError:
+                pass
+            self.data_file = None
+        self.data = None
+
 
 class Cache(SettingsMixin):
-    cache = {}
+    """
+        Bounded cache with LRU ordering and TTL expiry.
+        Expiry is driven by a min-heap of deadlines, entries are evicted in
+        least recently used order once `max_entries` or `max_size` (bytes of
+        UTF-8 encoded data) is exceeded.
+    """
+
+    def __init__(self, settings, max_entries=1024, max_size=4 * 1024 * 1024):
+        super(Cache, self).__init__(settings)
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+        self._deadlines = []
+        self._counter = itertools.count()
+        self._lock = threading.RLock()
 
     def set(self, handle, settings, data):
         in_memory = settings.in_memory
@@ -58,15 +105,179 @@ class Cache(SettingsMixin):
         if lifetime > 0:
             entry = CacheEntry(lifetime, in_memory)
             entry.set_data(data)
-            self.cache.update({
-                handle: entry
-            })
+
+            with self._lock:
+                self._remove(handle)
+
+                if entry.size > self.max_size:
+                    entry.remove()
+                    self.evictions += 1
+                    return
+
+                self.cache.update({
+                    handle: entry
+                })
+                self.size += entry.size
+                heapq.heappush(
+                    self._deadlines,
+                    (entry.expires, next(self._counter), handle, entry)
+                )
+                self._evict()
 
     def get(self, handle):
-        entry = self.cache.get(handle)
-        if entry is not None:
-            return entry.get_data()
-        return None
+        with self._lock:
+            self._expire()
+
+            entry = self.cache.get(handle)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.cache.move_to_end(handle)
+            data = entry.get_data()
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return data
+
+    def delete(self, handle):
+        with self._lock:
+            self._remove(handle)
 
     def flush(self):
-        self.cache.clear()
+        with self._lock:
+            for entry in self.cache.values():
+                entry.remove()
+            self.cache.clear()
+            self.size = 0
+            self._deadlines = []
+
+    @property
+    def stats(self):
+        return dict(
+            entries=len(self.cache),
+            size=self.size,
+            hits=self.hits,
+            misses=self.misses,
+            expirations=self.expirations,
+            evictions=self.evictions
+        )
+
+    def _remove(self, handle):
+        entry = self.cache.pop(handle, None)
+        if entry is not None:
+            self.size -= entry.size
+            entry.remove()
+        return entry
+
+    def _expire(self):
+        now = time.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, handle, entry = heapq.heappop(self._deadlines)
+            # Skip deadlines of entries that were replaced or evicted
+            if self.cache.get(handle) is entry:
+                self._remove(handle)
+                self.expirations += 1
+
+    def _evict(self):
+        while len(self.cache) > self.max_entries or self.size > self.max_size:
+            handle = next(iter(self.cache))
+            self._remove(handle)
+            self.evictions += 1
+
+        # Drop stale deadlines once they outnumber the live entries
+        if len(self._deadlines) > 2 * len(self.cache) + 16:
+            self._deadlines = [
+                item for item in self._deadlines
+                if self.cache.get(item[2]) is item[3]
+            ]
+            heapq.heapify(self._deadlines)
+
+
+class VerificationCache(Cache):
+    """
+        Short-lived cache of identity assertion verification outcomes.
+        Entries are keyed by a digest of the login session token, the
+        encrypted identity assertion and the additional data, and are bound
+        to the token the session held after the verification. An entry is
+        removed once the token of its session was rotated.
+    """
+
+    def __init__(self, settings, lifetime=300, max_entries=4096):
+        super(VerificationCache, self).__init__(
+            settings,
+            max_entries=max_entries,
+            max_size=max_entries * 256
+        )
+        self.caching_setting = CachingSetting("verification", True, lifetime)
+
+    @staticmethod
+    def digest(login_session_token, eia, additional_data):
+        digest = hashlib.sha256()
+        for part in [
+            login_session_token,
+            eia.encode('utf-8'),
+            json.dumps(additional_data, sort_keys=True).encode('utf-8')
+        ]:
+            # Length prefixes keep the concatenation unambiguous
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def store(self, handle, session_token, error=None, message=None):
+        """Stores a successful outcome, or the error of a failed one."""
+        outcome = dict(
+            token=to_b64(session_token),
+            error=error,
+            message=None if message is None else str(message)
+        )
+        self.set(handle, self.caching_setting, json.dumps(outcome))
+
+    def lookup(self, handle, session_token):
+        """Returns the outcome dict, None if missing or no longer valid."""
+        data = self.get(handle)
+        if data is None:
+            return None
+
+        outcome = json.loads(data)
+        if outcome["token"] != to_b64(session_token):
+            self.delete(handle)
+            return None
+        return outcome
+
+
+class ConsumedTokenCache(Cache):
+    """
+        Remembers consumed single-use tokens until they expire.
+        Unlike the other caches it never evicts live entries, a forgotten
+        token could be replayed. Tokens are rejected instead while
+        `max_entries` tokens are held.
+    """
+
+    def __init__(self, settings, max_entries=65536):
+        super(ConsumedTokenCache, self).__init__(
+            settings,
+            max_entries=max_entries,
+            max_size=max_entries
+        )
+
+    def consume(self, token_id, expires):
+        """Marks a token as consumed, False if it can not be consumed."""
+        handle = to_b64(token_id)
+        # Entries must not expire before their token
+        lifetime = int(math.ceil(expires - time.time()))
+
+        with self._lock:
+            self._expire()
+
+            if lifetime <= 0 or handle in self.cache or \
+                    len(self.cache) >= self.max_entries:
+                return False
+
+            self.set(
+                handle,
+                CachingSetting("consumed", True, lifetime),
+                ""
+            )
+        return True
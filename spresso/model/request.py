@@ -1,23 +1,238 @@
+import asyncio
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
 
 from spresso.utils.base import get_url
 from spresso.utils.error import SpressoInvalidError
 
 
+class HttpClient(object):
+    """
+        Pooled HTTP client based on a :class:`requests.Session`.
+        Connections are kept alive and reused, at most `pool_maxsize`
+        connections are opened per host. Connection errors and the status
+        codes in `retry_status` are retried with exponential backoff.
+    """
+    retry_status = [502, 503, 504]
+
+    def __init__(self, timeout=(3.05, 10), pool_connections=10,
+                 pool_maxsize=10, retries=2, backoff_factor=0.5):
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.retry_status,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=True
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, verify, proxies):
+        return self.session.get(
+            url=url,
+            verify=verify,
+            proxies=proxies,
+            timeout=self.timeout
+        )
+
+    def close(self):
+        self.session.close()
+
+
+def proxy_mounts(proxies):
+    """
+        Maps the `proxies` of :mod:`requests` to the mount patterns of
+        :mod:`httpx`. Keys are a scheme or `all`, optionally followed by
+        `://` and a host name. The hosts listed in `no_proxy`, and their
+        subdomains, are connected to directly, as are keys mapped to None.
+    """
+    mounts = {}
+    for key, proxy in proxies:
+        if key == "no_proxy":
+            for host in (proxy or "").split(","):
+                host = host.strip().lstrip(".")
+                if host:
+                    mounts["all://*{0}".format(host)] = None
+        elif "://" in key:
+            mounts[key] = proxy
+        else:
+            mounts["{0}://".format(key)] = proxy
+    return mounts
+
+
+class AsyncHttpClient(object):
+    """
+        Pooled, non-blocking HTTP client based on :class:`httpx.AsyncClient`,
+        available if the optional `httpx` package is installed.
+        A connection pool is kept per event loop and combination of `verify`
+        and `proxies`. Connection errors and the status codes in
+        `retry_status` are retried with exponential backoff.
+    """
+    retry_status = [502, 503, 504]
+
+    def __init__(self, timeout=(3.05, 10), pool_maxsize=10, retries=2,
+                 backoff_factor=0.5):
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._clients = {}
+
+    @property
+    def available(self):
+        return httpx is not None
+
+    async def get(self, url, verify, proxies):
+        client = self._client(verify, proxies)
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await client.get(url)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or \
+                        response.status_code not in self.retry_status:
+                    return response
+
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def aclose(self):
+        """Closes the connection pools of the running event loop."""
+        loop = asyncio.get_running_loop()
+        for key in [key for key in self._clients if key[0] is loop]:
+            await self._clients.pop(key).aclose()
+
+    def close(self):
+        """
+            Closes the connection pools of all event loops, may be called
+            from any thread. Pools are closed on their running loops,
+            pools of loops that are not running are dropped.
+        """
+        clients, self._clients = self._clients, {}
+        for (loop, _, _), client in clients.items():
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    def _client(self, verify, proxies):
+        if not self.available:
+            raise ImportError(
+                "The asynchronous HTTP client requires the 'httpx' package"
+            )
+
+        loop = asyncio.get_running_loop()
+        proxies = tuple(sorted((proxies or {}).items()))
+        key = (loop, verify, proxies)
+
+        client = self._clients.get(key)
+        if client is None:
+            # Release pools of event loops that are gone
+            for stale in [key for key in self._clients if key[0].is_closed()]:
+                del self._clients[stale]
+
+            limits = httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize
+            )
+            # Patterns mounted to None use the transport without a proxy
+            mounts = {
+                pattern: httpx.AsyncHTTPTransport(
+                    proxy=proxy,
+                    verify=verify,
+                    limits=limits
+                ) if proxy is not None else None
+                for pattern, proxy in proxy_mounts(proxies).items()
+            }
+            client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(
+                    verify=verify,
+                    limits=limits
+                ),
+                mounts=mounts,
+                timeout=self._httpx_timeout(),
+            )
+            self._clients[key] = client
+
+        return client
+
+    def _httpx_timeout(self):
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(self.timeout)
+
+
 class GetRequest(object):
     """
         Class to resolve GET requests.
+        Uses the pooled `client` if given, otherwise a new connection is
+        opened for every request. :meth:`request_async` uses `async_client`
+        and falls back to running :meth:`request` in the default executor
+        if no asynchronous client is available.
     """
 
-    def __init__(self, scheme, netloc, path, verify, proxies):
+    def __init__(self, scheme, netloc, path, verify, proxies, client=None,
+                 async_client=None):
         super(GetRequest, self).__init__()
         self.url = get_url(scheme, netloc, path)
         self.verify = verify
         self.proxies = proxies
+        self.client = client
+        self.async_client = async_client
 
     def request(self):
         try:
-            res = requests.get(
+            if self.client is not None:
+                res = self.client.get(
+                    url=self.url,
+                    verify=self.verify,
+                    proxies=self.proxies
+                )
+            else:
+                res = requests.get(
+                    url=self.url,
+                    verify=self.verify,
+                    proxies=self.proxies
+                )
+        except Exception as e:
+            raise SpressoInvalidError(
+                error="connection_error",
+                message="{0}".format(e),
+                uri=self.url
+            )
+        if res.status_code != 200:
+            raise SpressoInvalidError(
+                error="invalid_status",
+                message="Received HTTP status code {0}".format(res.status_code),
+                uri=self.url
+            )
+        return res
+
+    async def request_async(self):
+        if self.async_client is None or not self.async_client.available:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.request)
+
+        try:
+            res = await self.async_client.get(
                 url=self.url,
                 verify=self.verify,
                 proxies=self.proxies
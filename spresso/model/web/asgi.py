@@ -0,0 +1,124 @@
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+from spresso.model.web.base import Request
+from spresso.utils.error import PayloadTooLargeError
+
+
+class AsgiRequest(Request):
+    """
+        Request of an ASGI HTTP connection scope.
+        The body is not part of the scope, it has to be read from the
+        receive channel by awaiting :meth:`read_body` before the post
+        parameters are accessed.
+    """
+
+    @property
+    def content_length(self):
+        """
+            Length of the request body announced by the client, 0 if the
+            request has no body or the header is invalid.
+        """
+        try:
+            length = int(self.header("Content-Length") or 0)
+        except ValueError:
+            return 0
+        return max(length, 0)
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.query_string = scope.get("query_string", b"").decode('latin-1')
+        self.query_params = {}
+        self.post_params = {}
+        self.body = b""
+
+        self.headers = {}
+        for name, value in scope.get("headers", []):
+            name = name.decode('latin-1').lower()
+            value = value.decode('latin-1')
+            if name in self.headers:
+                separator = "; " if name == "cookie" else ", "
+                value = self.headers[name] + separator + value
+            self.headers[name] = value
+
+        for param, value in parse_qs(self.query_string).items():
+            self.query_params[param] = value[0]
+
+    async def read_body(self, receive, max_body_size=None):
+        """
+            Reads the body from the receive channel. Raises
+            :class:`PayloadTooLargeError` without reading further once more
+            than `max_body_size` bytes are announced or received.
+        """
+        if max_body_size is not None and \
+                self.content_length > max_body_size:
+            raise PayloadTooLargeError
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if max_body_size is not None and size > max_body_size:
+                raise PayloadTooLargeError
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        self.body = b"".join(chunks)
+
+        content_type = self.header("Content-Type", "")
+        if self.method == "POST" and \
+                content_type.startswith("application/x-www-form-urlencoded"):
+            for param, value in parse_qs(self.body).items():
+                decoded_param = param.decode('utf-8')
+                decoded_value = value[0].decode('utf-8')
+                self.post_params[decoded_param] = decoded_value
+
+    @property
+    def method(self):
+        return self.scope["method"]
+
+    @property
+    def path(self):
+        return self.scope["path"]
+
+    def get_param(self, name, default=None):
+        try:
+            return self.query_params[name]
+        except KeyError:
+            return default
+
+    def post_param(self, name, default=None):
+        try:
+            return self.post_params[name]
+        except KeyError:
+            return default
+
+    def header(self, name, default=None):
+        try:
+            return self.headers[name.lower()]
+        except KeyError:
+            return default
+
+    @property
+    def cookies(self):
+        cookie_string = self.header("Cookie")
+        if cookie_string is None:
+            return {}
+
+        cookie = SimpleCookie()
+        cookie.load(cookie_string)
+
+        # Construct dict from morsel
+        cookies = {}
+        for key, morsel in cookie.items():
+            cookies[key] = morsel.value
+
+        return cookies
+
+    def get_cookie(self, key):
+        return self.cookies.get(key)
@@ -1,5 +1,12 @@
+import os
 from http.cookies import SimpleCookie
 
+#: Size of the chunks file bodies are read in
+BLOCK_SIZE = 64 * 1024
+
+#: Responses that never carry a body
+BODILESS_STATUS_CODES = (204, 304)
+
 
 class Request(object):
     @property
@@ -27,7 +34,71 @@ class Request(object):
         raise NotImplementedError
 
 
+def file_length(body):
+    # Remaining bytes of a regular file, None for pipes and streams
+    try:
+        stat = os.fstat(body.fileno())
+        position = body.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+    if stat.st_size < position:
+        return None
+    return stat.st_size - position
+
+
+def read_blocks(body, block_size=BLOCK_SIZE):
+    try:
+        for block in iter(lambda: body.read(block_size), b""):
+            yield block
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+
+
+def encode_chunks(chunks):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        elif not isinstance(chunk, bytes):
+            chunk = bytes(chunk)
+        yield chunk
+
+
+def encode_body(data):
+    """
+        Prepares the data of a :class:`Response` for the servers.
+        Returns the body and its length in bytes, None if it is not known
+        up front. The body is a list of byte strings, a binary file object
+        or an iterator of byte strings. Text is encoded once, byte strings
+        and memoryviews covering a whole byte string are passed on without
+        a copy.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif isinstance(data, memoryview):
+        whole = type(data.obj) is bytes and data.c_contiguous and \
+            data.nbytes == len(data.obj)
+        data = data.obj if whole else data.tobytes()
+    elif isinstance(data, bytearray):
+        data = bytes(data)
+
+    if isinstance(data, bytes):
+        return [data], len(data)
+
+    if hasattr(data, "read"):
+        return data, file_length(data)
+
+    return encode_chunks(data), None
+
+
 class Response(object):
+    """
+        HTTP response of a grant handler.
+        `data` is the body, either text, which is encoded to UTF-8, bytes,
+        a memoryview, a binary file object or an iterable of such chunks,
+        see :func:`encode_body`.
+    """
+
     def __init__(self):
         self.status_code = 200
         self._headers = {"Content-Type": "text/html; charset=utf-8"}
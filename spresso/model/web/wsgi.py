@@ -1,32 +1,60 @@
+from functools import cached_property
 from http.cookies import SimpleCookie
 from urllib.parse import parse_qs
 
 from spresso.model.web.base import Request
 
 
+def content_length(env):
+    """
+        Length of the request body announced by the client, 0 if the
+        request has no body or the header is invalid.
+    """
+    try:
+        length = int(env.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return 0
+    return max(length, 0)
+
+
 class WsgiRequest(Request):
+    """
+        Request of a WSGI environment.
+        The query string, the form body and the cookies are parsed when
+        they are first accessed, once per request. The body is read up to
+        the announced `CONTENT_LENGTH`, its size has to be checked before,
+        see :class:`WsgiApplication
+        <spresso.controller.web.wsgi.WsgiApplication>`.
+    """
+
     def __init__(self, env):
-        self.query_params = {}
         self.query_string = env["QUERY_STRING"]
-        self.post_params = {}
         self.env_raw = env
 
-        for param, value in parse_qs(env["QUERY_STRING"]).items():
-            self.query_params[param] = value[0]
-
-        if self.method == "POST" and \
-                self.env_raw["CONTENT_TYPE"].startswith(
+    @cached_property
+    def query_params(self):
+        query_params = {}
+        for param, value in parse_qs(self.query_string).items():
+            query_params[param] = value[0]
+        return query_params
+
+    @cached_property
+    def post_params(self):
+        post_params = {}
+        content_type = self.env_raw.get("CONTENT_TYPE", "")
+        if self.method != "POST" or \
+                not content_type.startswith(
                     "application/x-www-form-urlencoded"
                 ):
-            self.post_params = {}
-            content = self.env_raw['wsgi.input'].read(
-                int(self.env_raw['CONTENT_LENGTH']))
-            post_params = parse_qs(content)
+            return post_params
+
+        content = self.env_raw['wsgi.input'].read(content_length(self.env_raw))
 
-            for param, value in post_params.items():
-                decoded_param = param.decode('utf-8')
-                decoded_value = value[0].decode('utf-8')
-                self.post_params[decoded_param] = decoded_value
+        for param, value in parse_qs(content).items():
+            decoded_param = param.decode('utf-8')
+            decoded_value = value[0].decode('utf-8')
+            post_params[decoded_param] = decoded_value
+        return post_params
 
     @property
     def method(self):
@@ -49,14 +77,14 @@ class WsgiRequest(Request):
             return default
 
     def header(self, name, default=None):
-        wsgi_header = "HTTP_{0}".format(name.upper())
+        wsgi_header = "HTTP_{0}".format(name.upper().replace("-", "_"))
 
         try:
             return self.env_raw[wsgi_header]
         except KeyError:
             return default
 
-    @property
+    @cached_property
     def cookies(self):
         cookie_string = self.header("Cookie")
         if cookie_string is None:
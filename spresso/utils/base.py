@@ -1,24 +1,154 @@
+import functools
+import multiprocessing
 import os
 import pkgutil
 import random
 import string
+import struct
+import weakref
 from base64 import b64encode, b64decode
+from collections import deque
 from urllib.parse import ParseResult, urlunparse
 
 
+class RandomPool(object):
+    """
+    Thread-safe pool of random bytes.
+    Requests are served from a queue per requested length, which is
+    refilled by slicing a chunk of `chunk_size` bytes from os.urandom,
+    every byte is handed out once. Reading takes no lock, queues are
+    :class:`collections.deque` objects, whose pops are thread-safe.
+    Requests larger than a quarter of a chunk are read from os.urandom
+    directly. The pool is discarded in the child process after os.fork,
+    so parent and child never share random bytes.
+    """
+    def __init__(self, chunk_size=4096):
+        self.chunk_size = chunk_size
+        self._reset()
+        _random_pools.add(self)
+
+    def read(self, length):
+        """
+        Returns `length` random bytes.
+        :param length: int
+        :return: byte
+        """
+        # Fallback for platforms without os.register_at_fork
+        if _check_pid and self._pid != os.getpid():
+            self._reset()
+
+        queue = self._queues.get(length)
+        if queue is not None:
+            try:
+                return queue.popleft()
+            except IndexError:
+                pass
+        return self._refill(length)
+
+    def _refill(self, length):
+        if length > self.chunk_size // 4:
+            return os.urandom(length)
+
+        # Concurrent refills append distinct chunks
+        count = self.chunk_size // length
+        chunk = os.urandom(count * length)
+        queue = self._queues.setdefault(length, deque())
+        first, *rest = _splitter(length, count).unpack(chunk)
+        queue.extend(rest)
+        return first
+
+    def _reset(self):
+        self._queues = {}
+        self._pid = os.getpid()
+
+
+@functools.lru_cache(maxsize=64)
+def _splitter(length, count):
+    # Splits a chunk into `count` byte strings of `length` bytes in C
+    return struct.Struct("{0}s".format(length) * count)
+
+
+_random_pools = weakref.WeakSet()
+
+
+def _reseed_random_pools():
+    for pool in list(_random_pools):
+        pool._reset()
+
+
+_check_pid = not hasattr(os, "register_at_fork")
+if not _check_pid:
+    os.register_at_fork(after_in_child=_reseed_random_pools)
+
+#: Process wide pool used by :func:`create_nonce`
+random_pool = RandomPool()
+
+
+def process_pool_context():
+    """
+    Returns the multiprocessing context starting the workers of process
+    pools. Forking a threaded server copies the locks other threads hold,
+    like the one of the key registry, workers are started from a fresh
+    interpreter instead, by the `forkserver` start method where available
+    and by `spawn` otherwise.
+    :return: multiprocessing context
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
 def create_nonce(length):
     """
     Generates random_choice bit string.
-    UNIX-like system will query /dev/urandom, Windows will use CryptGenRandom()
+    The bytes are drawn from the :data:`random_pool`, which reads
+    /dev/urandom on UNIX-like systems and CryptGenRandom() on Windows.
     :param length: int
     :return: byte
     """
-    return os.urandom(length)
+    return random_pool.read(length)
+
+
+@functools.lru_cache(maxsize=16)
+def _character_table(chars):
+    # Maps every random byte to a character, bytes at or above the largest
+    # multiple of the alphabet size are rejected to avoid a modulo bias
+    size = len(chars)
+    limit = 256 - 256 % size
+    encoded = chars.encode('ascii')
+    table = bytes(encoded[byte % size] if byte < limit else 0
+                  for byte in range(256))
+    return table, bytes(range(limit, 256))
 
 
 def create_random_characters(length,
                              chars=string.ascii_uppercase + string.digits):
-    return ''.join(random.SystemRandom().choice(chars) for _ in range(length))
+    """
+    Generates a string of characters drawn uniformly from `chars`.
+    Random bytes are mapped to characters in bulk, bytes that would bias
+    the distribution are rejected.
+    :param length: int
+    :param chars: str, at most 256 ASCII characters
+    :return: str
+    """
+    if not chars:
+        raise ValueError("'chars' must not be empty")
+
+    if not chars.isascii() or len(chars) > 256:
+        return ''.join(
+            random.SystemRandom().choice(chars) for _ in range(length)
+        )
+
+    table, rejected = _character_table(chars)
+
+    result = b""
+    while len(result) < length:
+        missing = length - len(result)
+        # A few more bytes than needed make a second read unlikely
+        data = random_pool.read(missing + missing // 8 + 8)
+        result += data.translate(table, rejected)
+
+    return result[:length].decode('ascii')
 
 
 def get_file_content(path, mode):
@@ -0,0 +1,97 @@
+"""This module provides synchronisation primitives shared by the providers."""
+
+import asyncio
+import threading
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Deduplicates concurrent calls that share a key.
+
+    While a call for a key is in flight, further callers for the same key do
+    not invoke their function but wait for the result of the running call.
+    Exceptions are propagated to all callers. Threads and asyncio tasks are
+    tracked separately, tasks are grouped by their event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+
+    def do(self, key, function):
+        """Calls `function` unless a call for `key` is already in flight.
+
+        Args:
+            key: The hashable deduplication key.
+            function (callable): Callable without arguments.
+
+        Returns:
+            The return value of the call in flight.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+    async def do_async(self, key, function):
+        """Awaits `function()` unless a call for `key` is already in flight.
+
+        Args:
+            key: The hashable deduplication key.
+            function (callable): Callable without arguments returning an
+                awaitable.
+
+        Returns:
+            The result of the call in flight.
+        """
+        loop = asyncio.get_running_loop()
+        handle = (loop, key)
+
+        future = self._futures.get(handle)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._futures[handle] = future
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Mark the exception as retrieved, waiters are optional
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._futures[handle]
@@ -2,50 +2,78 @@
 It is based on the `cryptography <https://cryptography.io/en/latest/>`_
 package."""
 
+import hashlib
+import threading
+from collections import OrderedDict
+
+from concurrent.futures import ProcessPoolExecutor
+
+from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, \
+    rsa
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from spresso.utils.base import process_pool_context
+from spresso.utils.instrumentation import instrumentation
+
 
+#: Tag length of AES-GCM in bytes
+AES_GCM_TAG_LENGTH = 16
 
+
+def aes_gcm(key):
+    """Returns the :class:`AESGCM` object of a key.
+
+    Secret keys are not cached. Holders of a long-lived key expand it once
+    and pass the object instead of the key to :func:`encrypt_aes_gcm` and
+    :func:`decrypt_aes_gcm`, per-login keys are expanded on every call.
+
+    Args:
+        key (bytes or AESGCM): The symmetric key or its AEAD object, which
+            is returned unchanged.
+
+    Returns:
+        AESGCM: The AEAD object of the key.
+    """
+    if hasattr(key, "encrypt") and hasattr(key, "decrypt"):
+        return key
+    return AESGCM(key)
+
+
+@instrumentation.instrument("crypto.encrypt_aes_gcm")
 def encrypt_aes_gcm(key, iv, plaintext, associated_data=b""):
     """
     Method for encrypting AES-GCM
-    :param key: byte
+    :param key: byte or the AESGCM object of the key, see :func:`aes_gcm`
     :param plaintext: byte
     :param associated_data: byte
     :param iv: byte
     :return: byte, byte
     """
 
-    #: Construct an AES-GCM Cipher object with the given key and a
-    #: randomly generated IV.
-    encryptor = Cipher(
-        algorithms.AES(key),
-        modes.GCM(iv),
-        backend=default_backend()
-    ).encryptor()
-
     #: Associated_data will be authenticated but not encrypted,
     #: it must also be passed in on decryption.
-    encryptor.authenticate_additional_data(associated_data)
+    #: GCM does not require padding, the tag is appended to the cipher text.
+    data = aes_gcm(key).encrypt(iv, plaintext, associated_data)
 
-    #: Encrypt the plaintext and get the associated cipher text.
-    #: GCM does not require padding.
-    cipher_text = encryptor.update(plaintext) + encryptor.finalize()
-
-    return cipher_text, encryptor.tag
+    cipher_text = data[:-AES_GCM_TAG_LENGTH]
+    tag = data[-AES_GCM_TAG_LENGTH:]
+    return cipher_text, tag
 
 
+@instrumentation.instrument("crypto.decrypt_aes_gcm")
 def decrypt_aes_gcm(key, iv, auth_tag, cipher_text, associated_data=b""):
     """Method to decrypt AES in GCM mode.
 
-    Constructs a :class:`Cipher <cryptography.hazmat.primitives.ciphers.Cipher>`
-    object from key, iv and authentication tag. The associated data is passed in
-    during decryption.
+    The associated data is passed in during decryption.
 
     Args:
-        key (bytes): The symmetric key used during decryption.
+        key (bytes or AESGCM): The symmetric key used during decryption or
+            its :class:`AESGCM
+            <cryptography.hazmat.primitives.ciphers.aead.AESGCM>` object,
+            see :func:`aes_gcm`.
         iv (bytes): The initialisation vector used during decryption.
         auth_tag (bytes): The authentication tag used during decryption.
         cipher_text (bytes): Cipher text to decrypt.
@@ -59,61 +87,372 @@ def decrypt_aes_gcm(key, iv, auth_tag, cipher_text, associated_data=b""):
         InvalidTag: The authentication tag in combination with the given
             parameters is invalid.
     """
-    decryptor = Cipher(
-        algorithms.AES(key),
-        modes.GCM(iv, auth_tag),
-        backend=default_backend()
-    ).decryptor()
+    return aes_gcm(key).decrypt(iv, cipher_text + auth_tag, associated_data)
+
+
+class KeyRegistry(object):
+    """Bounded registry of deserialised keys.
+
+    Parsing a PEM encoded RSA key is expensive compared to the signature
+    operation itself. The registry holds the loaded key objects, indexed by
+    the SHA-256 digest of their PEM encoding, and evicts the least recently
+    used entry once `max_size` keys are held.
+
+    Args:
+        max_size (int): The maximum number of key objects to hold.
+    """
+
+    def __init__(self, max_size=16):
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("'max_size' must be a positive integer value")
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(pem):
+        """Computes the registry handle of a PEM encoded key.
+
+        Args:
+            pem (bytes): The PEM encoded key, `str` is encoded as UTF-8.
+
+        Returns:
+            bytes: The SHA-256 digest of the PEM encoding.
+        """
+        if isinstance(pem, str):
+            pem = pem.encode('utf-8')
+        return hashlib.sha256(pem).digest()
+
+    def private_key(self, pem):
+        """Returns the loaded private key for a PEM encoding.
+
+        Args:
+            pem (bytes): The PEM encoded, unencrypted private key.
 
-    decryptor.authenticate_additional_data(associated_data)
-    plaintext = decryptor.update(cipher_text) + decryptor.finalize()
-    return plaintext
+        Returns:
+            The private key object.
+        """
+        return self._get("private", pem, lambda: load_private_key(pem))
 
+    def public_key(self, pem):
+        """Returns the loaded public key for a PEM encoding.
 
-def create_signature(private_key, data):
+        Args:
+            pem (bytes): The PEM encoded public key.
+
+        Returns:
+            The public key object.
+        """
+        return self._get("public", pem, lambda: load_public_key(pem))
+
+    def invalidate(self, pem=None):
+        """Removes keys from the registry, e.g. after a key rotation.
+
+        Args:
+            pem (bytes): The PEM encoded key to remove, if omitted all keys
+                are removed.
+        """
+        with self._lock:
+            if pem is None:
+                self._keys.clear()
+                return
+
+            digest = self.digest(pem)
+            for kind in ["private", "public"]:
+                self._keys.pop((kind, digest), None)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, pem):
+        digest = self.digest(pem)
+        return ("private", digest) in self._keys or \
+            ("public", digest) in self._keys
+
+    def _get(self, kind, pem, loader):
+        handle = (kind, self.digest(pem))
+
+        with self._lock:
+            key = self._keys.get(handle)
+            if key is not None:
+                self._keys.move_to_end(handle)
+                return key
+
+        # Parse outside of the lock, concurrent loads of the same key are
+        # harmless and must not serialise unrelated lookups
+        key = loader()
+
+        with self._lock:
+            self._keys[handle] = key
+            self._keys.move_to_end(handle)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+
+        return key
+
+
+def load_private_key(private_key):
     """
-    Create PKCS#1 signature using SHA256.
+    Load an unencrypted PEM encoded private key.
     :param private_key: byte
-    :param data: byte
-    :return: byte
+    :return: private key object
     """
-
-    private_key = serialization.load_pem_private_key(
+    return serialization.load_pem_private_key(
         private_key,
         password=None,
         backend=default_backend()
     )
 
-    signer = private_key.signer(
-        padding.PKCS1v15(),
-        hashes.SHA256()
+
+def load_public_key(public_key):
+    """
+    Load a PEM encoded public key.
+    :param public_key: byte
+    :return: public key object
+    """
+    return serialization.load_pem_public_key(
+        public_key,
+        backend=default_backend()
+    )
+
+
+#: Process wide registry used by :func:`create_signature` and
+#: :func:`verify_signature`.
+key_registry = KeyRegistry()
+
+
+class SignatureScheme(object):
+    """Base class of the signature schemes of identity assertions.
+
+    A scheme is identified by its `name`, which the Identity Provider
+    advertises in the well known info, and selected by the type of the key.
+    """
+    name = None
+    private_key_type = None
+    public_key_type = None
+
+    def sign(self, private_key, data):
+        """Signs `data` with a loaded private key, returns the signature."""
+        raise NotImplementedError
+
+    def verify(self, public_key, signature, data):
+        """Verifies `signature` with a loaded public key.
+
+        Raises:
+            InvalidSignature: The signature is invalid.
+        """
+        raise NotImplementedError
+
+    def supports(self, key):
+        return isinstance(key, (self.private_key_type, self.public_key_type))
+
+
+class RsaScheme(SignatureScheme):
+    """PKCS#1 v1.5 signatures using SHA-256."""
+    name = "RS256"
+    private_key_type = rsa.RSAPrivateKey
+    public_key_type = rsa.RSAPublicKey
+
+    def sign(self, private_key, data):
+        return private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+
+    def verify(self, public_key, signature, data):
+        public_key.verify(
+            signature,
+            data,
+            padding.PKCS1v15(),
+            hashes.SHA256()
+        )
+
+
+class EcdsaScheme(SignatureScheme):
+    """DER encoded ECDSA signatures on the P-256 curve using SHA-256."""
+    name = "ES256"
+    private_key_type = ec.EllipticCurvePrivateKey
+    public_key_type = ec.EllipticCurvePublicKey
+
+    def sign(self, private_key, data):
+        return private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+    def verify(self, public_key, signature, data):
+        public_key.verify(signature, data, ec.ECDSA(hashes.SHA256()))
+
+    def supports(self, key):
+        return super(EcdsaScheme, self).supports(key) and \
+            isinstance(key.curve, ec.SECP256R1)
+
+
+class Ed25519Scheme(SignatureScheme):
+    """Ed25519 signatures."""
+    name = "EdDSA"
+    private_key_type = ed25519.Ed25519PrivateKey
+    public_key_type = ed25519.Ed25519PublicKey
+
+    def sign(self, private_key, data):
+        return private_key.sign(data)
+
+    def verify(self, public_key, signature, data):
+        public_key.verify(signature, data)
+
+
+#: The supported signature schemes by name
+signature_schemes = OrderedDict(
+    (scheme.name, scheme)
+    for scheme in [RsaScheme(), EcdsaScheme(), Ed25519Scheme()]
+)
+
+
+def register_signature_scheme(scheme):
+    """Adds a :class:`SignatureScheme`, replacing one of the same name."""
+    signature_schemes[scheme.name] = scheme
+
+
+def signature_scheme_for(key):
+    """Selects the signature scheme by the type of a loaded key.
+
+    Args:
+        key: The loaded private or public key.
+
+    Returns:
+        SignatureScheme: The scheme supporting the key.
+
+    Raises:
+        ValueError: No scheme supports the key.
+    """
+    for scheme in signature_schemes.values():
+        if scheme.supports(key):
+            return scheme
+
+    raise ValueError(
+        "Unsupported key type {0}".format(key.__class__.__name__)
     )
 
-    signer.update(data)
-    signed_data = signer.finalize()
-    return signed_data
 
+def _select_scheme(key, name):
+    scheme = signature_scheme_for(key)
+    # Never let the peer choose an algorithm the key is not meant for
+    if name is not None and name != scheme.name:
+        raise ValueError(
+            "Signature scheme '{0}' does not match the key".format(name)
+        )
+    return scheme
 
-def verify_signature(public_key, signature, data):
+
+@instrumentation.instrument("crypto.create_signature")
+def create_signature(private_key, data, scheme=None):
+    """
+    Create a signature, by default a PKCS#1 signature using SHA256.
+    The scheme is selected by the key type, see :data:`signature_schemes`.
+    The loaded key is taken from the :data:`key_registry`.
+    :param private_key: byte
+    :param data: byte
+    :param scheme: expected scheme name, str
+    :return: byte
     """
-    Verify PKCS#1 signature using SHA256.
-    Raises an InvalidSignature Exception on failure.
+
+    private_key = key_registry.private_key(private_key)
+    return _select_scheme(private_key, scheme).sign(private_key, data)
+
+
+@instrumentation.instrument("crypto.verify_signature")
+def verify_signature(public_key, signature, data, scheme=None):
+    """
+    Verify a signature, by default a PKCS#1 signature using SHA256.
+    Raises an InvalidSignature Exception on failure and a ValueError if the
+    expected scheme does not match the key type.
+    The scheme is selected by the key type, see :data:`signature_schemes`.
+    The loaded key is taken from the :data:`key_registry`.
     :param public_key: byte
     :param signature: byte
     :param data: byte
+    :param scheme: expected scheme name, str
     :return:
     """
 
-    public_key = serialization.load_pem_public_key(
-        public_key,
-        backend=default_backend()
-    )
+    public_key = key_registry.public_key(public_key)
+    _select_scheme(public_key, scheme).verify(public_key, signature, data)
 
-    verifier = public_key.verifier(
-        signature,
-        padding.PKCS1v15(),
-        hashes.SHA256()
-    )
 
-    verifier.update(data)
-    verifier.verify()
+@instrumentation.instrument("crypto.verify_signatures")
+def verify_signatures(items, workers=None, executor=None, chunk_size=256):
+    """Verifies many signatures, grouped by public key.
+
+    Each key is loaded once per process, the workers of a new pool load
+    all keys as soon as they start. Groups are split into chunks of
+    `chunk_size` signatures that are verified in a process pool, a batch
+    of a single chunk is verified in the calling process.
+
+    Args:
+        items (iterable): Tuples of public key, signature, data and the
+            expected scheme name or None, see :func:`verify_signature`.
+        workers (int): The number of worker processes of the pool, 0
+            verifies in the calling process.
+        executor: A :class:`concurrent.futures.Executor` to use instead of
+            a new process pool.
+        chunk_size (int): The maximum number of signatures per task.
+
+    Returns:
+        list: None for a valid signature, otherwise a description of the
+        failure, in the order of the items.
+    """
+    groups = OrderedDict()
+    count = 0
+    for index, (public_key, signature, data, scheme) in enumerate(items):
+        groups.setdefault(public_key, []).append(
+            (index, signature, data, scheme)
+        )
+        count += 1
+
+    chunks = [
+        (public_key, entries[start:start + chunk_size])
+        for public_key, entries in groups.items()
+        for start in range(0, len(entries), chunk_size)
+    ]
+
+    if executor is not None:
+        futures = [executor.submit(_verify_chunk, *chunk) for chunk in chunks]
+        outcomes = [future.result() for future in futures]
+    elif workers == 0 or len(chunks) < 2:
+        outcomes = [_verify_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=process_pool_context(),
+            initializer=_preload_public_keys,
+            initargs=(tuple(groups),)
+        ) as pool:
+            outcomes = list(pool.map(_verify_chunk, *zip(*chunks)))
+
+    results = [None] * count
+    for outcome in outcomes:
+        for index, error in outcome:
+            results[index] = error
+    return results
+
+
+def _preload_public_keys(public_keys):
+    for public_key in public_keys:
+        try:
+            key_registry.public_key(public_key)
+        except Exception:
+            # Reported for the signatures of the key
+            pass
+
+
+def _verify_chunk(public_key, entries):
+    try:
+        key = key_registry.public_key(public_key)
+    except Exception as error:
+        message = "Invalid public key: {0}".format(error)
+        return [(entry[0], message) for entry in entries]
+
+    results = []
+    for index, signature, data, scheme in entries:
+        try:
+            _select_scheme(key, scheme).verify(key, signature, data)
+            results.append((index, None))
+        except InvalidSignature:
+            results.append((index, "Signature verification failed"))
+        except Exception as error:
+            results.append((index, str(error)))
+    return results
@@ -29,3 +29,11 @@ class UnsupportedGrantError(Exception):
 
 class UnsupportedAdditionalData(Exception):
     pass
+
+
+class SignerUnavailable(Exception):
+    pass
+
+
+class PayloadTooLargeError(Exception):
+    pass
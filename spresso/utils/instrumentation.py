@@ -0,0 +1,256 @@
+"""This module provides timing hooks for the request path of the providers.
+
+Sections of the request path are measured by the process wide
+:data:`instrumentation`, which reports them to its observers:
+
+=========================== ==================================
+``dispatch``                a request, label ``handler``
+``handler.validate``        reading and validating parameters
+``handler.process``         processing a request
+``idp_info.fetch``          requesting the well known info
+``schema.validate``         a JSON schema, label ``schema``
+``template.render``         a template, label ``template``
+``crypto.<function>``       a cryptographic primitive
+=========================== ==================================
+
+Without observers a measured section costs one attribute lookup.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import nullcontext
+
+from spresso.utils.log import gen_log
+
+
+class Observer(object):
+    """Base class of the observers of an :class:`Instrumentation`.
+
+    Observers are called on the thread running the section, they must be
+    thread safe and should return quickly.
+    """
+
+    def started(self, name, labels):
+        """Called when a section is entered.
+
+        Args:
+            name (str): The name of the section.
+            labels (dict): Further properties of the section.
+        """
+
+    def finished(self, name, labels, duration, error):
+        """Called when a section is left.
+
+        Args:
+            name (str): The name of the section.
+            labels (dict): Further properties of the section.
+            duration (float): The duration in seconds.
+            error (Exception): The exception leaving the section or None.
+        """
+
+
+class _Measurement(object):
+    __slots__ = ("observers", "name", "labels", "start")
+
+    def __init__(self, observers, name, labels):
+        self.observers = observers
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        for observer in self.observers:
+            try:
+                observer.started(self.name, self.labels)
+            except Exception:
+                gen_log.exception("Observer failed on '%s'", self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        duration = time.perf_counter() - self.start
+        for observer in self.observers:
+            try:
+                observer.finished(self.name, self.labels, duration, error)
+            except Exception:
+                gen_log.exception("Observer failed on '%s'", self.name)
+        return False
+
+
+_NOT_MEASURED = nullcontext()
+
+
+class Instrumentation(object):
+    """Reports measured sections to pluggable observers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced on change, measurements iterate without the lock
+        self.observers = ()
+
+    def add_observer(self, observer):
+        with self._lock:
+            self.observers = self.observers + (observer,)
+
+    def remove_observer(self, observer):
+        with self._lock:
+            self.observers = tuple(
+                registered for registered in self.observers
+                if registered is not observer
+            )
+
+    def measure(self, name, **labels):
+        """Returns a context manager measuring the section it encloses.
+
+        Args:
+            name (str): The name of the section.
+            **labels: Further properties of the section. Labels should only
+                take a few distinct values, every combination is recorded
+                separately by the :class:`HistogramCollector`.
+        """
+        observers = self.observers
+        if not observers:
+            return _NOT_MEASURED
+        return _Measurement(observers, name, labels)
+
+    def instrument(self, name):
+        """Decorator measuring every call of a function as section `name`."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.measure(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+#: Process wide instrumentation of the request path.
+instrumentation = Instrumentation()
+
+
+class Histogram(object):
+    """Durations of a section, counted in buckets.
+
+    Args:
+        bounds (list): The ascending upper bounds of the buckets in seconds,
+            durations above the last bound are counted in an overflow
+            bucket.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, duration, error=False):
+        self.counts[bisect.bisect_left(self.bounds, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if error:
+            self.errors += 1
+
+    @property
+    def mean(self):
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def quantile(self, q):
+        """Estimates a quantile by the upper bound of its bucket.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The bound in seconds, the maximum for the overflow
+            bucket and 0 without observations.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class HistogramCollector(Observer):
+    """Observer keeping a :class:`Histogram` per section and labels in memory.
+
+    Example:
+        collector = HistogramCollector()
+        instrumentation.add_observer(collector)
+        ...
+        for entry in collector.snapshot():
+            print(entry["name"], entry["labels"], entry["p99"])
+    """
+
+    #: Default bucket bounds in seconds, from 50 microseconds to 10 seconds
+    bounds = (
+        0.00005, 0.0001, 0.00025, 0.0005,
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+        0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+    )
+
+    def __init__(self, bounds=None):
+        if bounds is not None:
+            self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.since = time.monotonic()
+
+    def finished(self, name, labels, duration, error):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.bounds)
+            histogram.observe(duration, error is not None)
+
+    def histogram(self, name, **labels):
+        """Returns the histogram of a section or None."""
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def snapshot(self):
+        """Summarises the histograms.
+
+        Returns:
+            list: A dict per section and labels, holding the ``count``, the
+            ``errors``, the ``rate`` per second since the collector was
+            created or reset, the ``mean`` and ``max`` duration and the
+            estimated ``p50``, ``p90`` and ``p99`` in seconds.
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self.since, 1e-9)
+            return [
+                dict(
+                    name=name,
+                    labels=dict(labels),
+                    count=histogram.count,
+                    errors=histogram.errors,
+                    rate=histogram.count / elapsed,
+                    mean=histogram.mean,
+                    max=histogram.max,
+                    p50=histogram.quantile(0.5),
+                    p90=histogram.quantile(0.9),
+                    p99=histogram.quantile(0.99)
+                )
+                for (name, labels), histogram in sorted(
+                    self.histograms.items(),
+                    key=lambda item: item[0]
+                )
+            ]
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.since = time.monotonic()
@@ -0,0 +1,176 @@
+"""This module provides the backends creating the identity assertion
+signatures of the Identity Provider."""
+
+import concurrent.futures
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
+
+from spresso.utils.base import process_pool_context
+from spresso.utils.crypto import create_signature, key_registry
+from spresso.utils.error import SignerUnavailable
+
+
+def _preload(private_keys):
+    for private_key in private_keys:
+        key_registry.private_key(private_key)
+
+
+class InlineSigner(object):
+    """Signs on the calling thread, like calling :func:`create_signature`."""
+
+    def sign(self, private_key, data, timeout=None):
+        return create_signature(private_key, data)
+
+    def close(self, wait=True):
+        pass
+
+
+class ProcessPoolSigner(object):
+    """Signs in a pool of worker processes.
+
+    RSA signatures hold the GIL of the calling process, so signing on the
+    request threads of a threaded server uses a single core. Each worker
+    process keeps the loaded keys in its own
+    :data:`spresso.utils.crypto.key_registry`, `private_keys` are loaded as
+    soon as a worker starts.
+
+    At most `max_pending` signatures are queued or in progress, further
+    callers wait for a free slot. Waiting for a slot and for the signature
+    together is bounded by the per-call timeout.
+
+    Args:
+        private_keys (iterable): PEM encoded private keys to preload.
+        workers (int): The number of worker processes, defaults to the
+            number of CPUs.
+        max_pending (int): The bound of the queue, defaults to four
+            signatures per worker.
+        timeout (float): The default per-call timeout in seconds.
+        mp_context: The multiprocessing context used to start the workers,
+            defaults to the `forkserver` start method where available and
+            to `spawn` otherwise. The signing function is imported anew
+            in the workers, it has to be defined at module level.
+    """
+    #: Callable run in the workers, must be picklable
+    function = staticmethod(create_signature)
+
+    def __init__(self, private_keys=(), workers=None, max_pending=None,
+                 timeout=5, mp_context=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context or process_pool_context(),
+            initializer=_preload,
+            initargs=(tuple(
+                private_key for private_key in private_keys
+                if private_key is not None
+            ),)
+        )
+
+    def sign(self, private_key, data, timeout=None):
+        """Signs `data` in a worker process.
+
+        Args:
+            private_key (bytes): The PEM encoded private key.
+            data (bytes): The data to sign.
+            timeout (float): Overrides the default per-call timeout.
+
+        Returns:
+            bytes: The signature.
+
+        Raises:
+            SignerUnavailable: The signer is closed or broken, the call
+                timed out or no private key is given.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+
+        future = self.submit(private_key, data, timeout=timeout)
+        return self.result(future, max(0, deadline - time.monotonic()))
+
+    def submit(self, private_key, data, timeout=None):
+        """Queues signing `data` in a worker process without waiting for
+        the signature, so several signatures are created in parallel.
+
+        Args:
+            private_key (bytes): The PEM encoded private key.
+            data (bytes): The data to sign.
+            timeout (float): Bounds waiting for a free slot, overrides the
+                default per-call timeout.
+
+        Returns:
+            concurrent.futures.Future: The future of the signature, to be
+            passed to :meth:`result`.
+
+        Raises:
+            SignerUnavailable: The signer is closed, no slot became free in
+                time or no private key is given.
+        """
+        if private_key is None:
+            # The workers do not hold a key of their own
+            raise SignerUnavailable("The signer requires a private key")
+
+        if timeout is None:
+            timeout = self.timeout
+
+        if not self._slots.acquire(timeout=timeout):
+            raise SignerUnavailable("Timed out waiting for a free signer")
+
+        try:
+            with self._lock:
+                if self._closed:
+                    raise SignerUnavailable("The signer is closed")
+                future = self._executor.submit(
+                    self.function,
+                    private_key,
+                    data
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def result(self, future, timeout=None):
+        """Waits for a signature queued by :meth:`submit`.
+
+        Args:
+            future (concurrent.futures.Future): The future of the signature.
+            timeout (float): Overrides the default per-call timeout.
+
+        Returns:
+            bytes: The signature.
+
+        Raises:
+            SignerUnavailable: The signer is broken or the call timed out.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise SignerUnavailable("Timed out waiting for the signature")
+        except BrokenProcessPool as error:
+            raise SignerUnavailable(error)
+
+    def close(self, wait=True):
+        """Shuts the worker processes down, pending calls are cancelled."""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,472 @@
+"""This module provides a signing service for Identity Providers running
+several worker processes.
+
+The :class:`SigningServer` holds the private key in a single process and
+answers sign requests over a Unix domain socket. Workers sign through a
+:class:`SocketSigner`, configured as the `signer` of the Identity Provider
+settings, and do not need to load the private key themselves.
+
+Requests and responses are framed by a header holding a request id, an
+operation or status code and the length of the payload. Clients may send
+further requests before the previous ones are answered, responses are
+matched by their request id. The server signs the requests received on a
+connection in batches and writes the responses of a batch at once.
+
+Every process that may connect to the socket can have data signed with the
+private key. The socket is only accessible to its owner by default and the
+server only accepts peers running as one of `allowed_uids`, where the
+platform reports the credentials of the peer.
+
+Run the service with::
+
+    python -m spresso.utils.signing_service /run/spresso.sock private.pem
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import stat
+import struct
+import threading
+import weakref
+from concurrent.futures import Future, TimeoutError
+
+from spresso.utils.base import get_file_content
+from spresso.utils.crypto import key_registry
+from spresso.utils.error import SignerUnavailable
+from spresso.utils.log import gen_log
+from spresso.utils.signer import InlineSigner, ProcessPoolSigner
+
+#: Request id, operation or status code and payload length
+HEADER = struct.Struct(">IBI")
+
+OP_SIGN = 0
+
+#: Default upper bound of the payload length of a request in bytes
+MAX_PAYLOAD = 64 * 1024
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_socket_signers = weakref.WeakSet()
+
+
+def _after_fork():
+    for signer in list(_socket_signers):
+        signer._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class SigningServer(object):
+    """Serves sign requests over a Unix domain socket.
+
+    Args:
+        path (str): The path of the socket.
+        private_key (bytes): The PEM encoded private key.
+        signer: The backend creating the signatures, e.g. a
+            :class:`ProcessPoolSigner <spresso.utils.signer.ProcessPoolSigner>`.
+            Defaults to signing in `executor`.
+        max_batch (int): The maximum number of requests signed at once.
+        executor: The executor running the batches, defaults to the default
+            executor of the event loop.
+        mode (int): The permissions of the socket file.
+        allowed_uids (iterable): The user ids of the processes that may
+            connect, defaults to the user of the server. Ignored where
+            `SO_PEERCRED` is not available.
+        max_payload (int): The maximum payload length of a request,
+            connections sending larger requests are closed.
+    """
+
+    def __init__(self, path, private_key, signer=None, max_batch=64,
+                 executor=None, mode=0o600, allowed_uids=None,
+                 max_payload=MAX_PAYLOAD):
+        self.path = path
+        self.private_key = private_key
+        self.signer = signer or InlineSigner()
+        self.max_batch = max_batch
+        self.executor = executor
+        self.mode = mode
+        if allowed_uids is None:
+            allowed_uids = [os.getuid()]
+        self.allowed_uids = frozenset(allowed_uids)
+        self.max_payload = max_payload
+        self.server = None
+        self._connections = set()
+
+        # Throughput counters
+        self.signatures = 0
+        self.errors = 0
+        self.batches = 0
+
+        key_registry.private_key(private_key)
+
+    @property
+    def stats(self):
+        return dict(
+            signatures=self.signatures,
+            errors=self.errors,
+            batches=self.batches
+        )
+
+    async def start(self):
+        """Listens on the socket, replacing a stale socket file.
+
+        Raises:
+            FileExistsError: The path exists but is not a socket.
+        """
+        try:
+            path_mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(path_mode):
+                raise FileExistsError(
+                    "'{0}' exists and is not a socket".format(self.path)
+                )
+            os.unlink(self.path)
+
+        self.server = await asyncio.start_unix_server(
+            self.handle,
+            path=self.path
+        )
+        # The mode set by the umask may grant access to the group
+        os.chmod(self.path, self.mode)
+
+    def peer_allowed(self, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is None or not hasattr(socket, "SO_PEERCRED"):
+            return True
+
+        credentials = sock.getsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_PEERCRED,
+            struct.calcsize("3i")
+        )
+        _, uid, _ = struct.unpack("3i", credentials)
+        return uid in self.allowed_uids
+
+    async def stop(self):
+        self.server.close()
+
+        # Requests that were already received are answered
+        connections = list(self._connections)
+        for connection in connections:
+            connection.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def handle(self, reader, writer):
+        if not self.peer_allowed(writer):
+            gen_log.warning("Refused a connection to the signing service")
+            writer.close()
+            return
+
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+
+        queue = asyncio.Queue()
+        signing = asyncio.ensure_future(self.process(queue, writer))
+
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                request_id, operation, length = HEADER.unpack(header)
+                if length > self.max_payload:
+                    gen_log.warning(
+                        "Closed a connection sending %d bytes", length
+                    )
+                    break
+                payload = await reader.readexactly(length)
+                queue.put_nowait((request_id, operation, payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(connection)
+            queue.put_nowait(None)
+            try:
+                await signing
+            finally:
+                writer.close()
+
+    async def process(self, queue, writer):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            request = await queue.get()
+            if request is None:
+                return
+
+            # Batch the requests that arrived in the meantime
+            batch = [request]
+            while len(batch) < self.max_batch and not queue.empty():
+                request = queue.get_nowait()
+                if request is None:
+                    break
+                batch.append(request)
+
+            results = await loop.run_in_executor(
+                self.executor,
+                self.sign_batch,
+                batch
+            )
+
+            self.batches += 1
+            responses = []
+            for request_id, status, result in results:
+                if status == STATUS_OK:
+                    self.signatures += 1
+                else:
+                    self.errors += 1
+                responses.append(
+                    HEADER.pack(request_id, status, len(result)) + result
+                )
+
+            try:
+                writer.write(b"".join(responses))
+                await writer.drain()
+            except ConnectionError:
+                return
+
+            if request is None:
+                return
+
+    def sign_batch(self, batch):
+        """Signs a batch of requests.
+
+        Backends providing `submit` and `result`, like the
+        :class:`ProcessPoolSigner <spresso.utils.signer.ProcessPoolSigner>`,
+        get the whole batch queued before the first signature is awaited,
+        so its requests are signed in parallel. Other backends sign one
+        request after the other.
+        """
+        concurrent = hasattr(self.signer, "submit")
+        pending = []
+        for request_id, operation, payload in batch:
+            try:
+                if operation != OP_SIGN:
+                    raise ValueError(
+                        "Unsupported operation {0}".format(operation)
+                    )
+                if concurrent:
+                    result = self.signer.submit(self.private_key, payload)
+                else:
+                    result = self.signer.sign(self.private_key, payload)
+                pending.append((request_id, result))
+            except Exception as error:
+                pending.append((request_id, error))
+
+        results = []
+        for request_id, result in pending:
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                if concurrent:
+                    result = self.signer.result(result)
+                results.append((request_id, STATUS_OK, result))
+            except Exception as error:
+                message = str(error).encode('utf-8')
+                results.append((request_id, STATUS_ERROR, message))
+        return results
+
+
+class SocketSigner(object):
+    """Signs through a :class:`SigningServer`.
+
+    The signer is thread-safe, concurrent calls share one pipelined
+    connection. The connection is opened lazily and reopened after a fork,
+    so the signer may be created before a pre-fork server starts its
+    workers.
+
+    Args:
+        path (str): The path of the socket.
+        timeout (float): The default per-call timeout in seconds.
+    """
+
+    def __init__(self, path, timeout=5):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._socket = None
+        self._pending = {}
+        _socket_signers.add(self)
+
+    def sign(self, private_key, data, timeout=None):
+        """Signs `data` with the key held by the service.
+
+        Args:
+            private_key (bytes): Ignored, the service holds the key.
+            data (bytes): The data to sign.
+            timeout (float): Overrides the default per-call timeout.
+
+        Returns:
+            bytes: The signature.
+
+        Raises:
+            SignerUnavailable: The service is unreachable, failed to sign or
+                the call timed out.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        future = Future()
+        with self._lock:
+            sock = self._connect()
+            request_id = next(self._ids) & 0xffffffff
+            self._pending[request_id] = future
+            try:
+                sock.sendall(
+                    HEADER.pack(request_id, OP_SIGN, len(data)) + data
+                )
+            except OSError as error:
+                self._pending.pop(request_id, None)
+                self._disconnect()
+                raise SignerUnavailable(error)
+
+        try:
+            status, payload = future.result(timeout=timeout)
+        except TimeoutError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise SignerUnavailable("Timed out waiting for the signature")
+
+        if status != STATUS_OK:
+            raise SignerUnavailable(payload.decode('utf-8'))
+        return payload
+
+    def close(self, wait=True):
+        with self._lock:
+            self._disconnect()
+
+    def _connect(self):
+        if self._socket is not None:
+            return self._socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            sock.settimeout(None)
+        except OSError as error:
+            sock.close()
+            raise SignerUnavailable(error)
+
+        self._socket = sock
+        self._pending = {}
+
+        reader = threading.Thread(target=self._read, args=(sock,))
+        reader.daemon = True
+        reader.start()
+        return sock
+
+    def _disconnect(self):
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+        self._socket = None
+
+    def _reset(self):
+        # The child of a fork must neither use nor shut down the connection
+        # of its parent, only its copy of the descriptor is closed
+        self._lock = threading.Lock()
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = None
+        self._pending = {}
+
+    def _read(self, sock):
+        try:
+            while True:
+                header = _receive(sock, HEADER.size)
+                request_id, status, length = HEADER.unpack(header)
+                payload = _receive(sock, length)
+
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result((status, payload))
+        except (OSError, EOFError):
+            pass
+
+        with self._lock:
+            if self._socket is sock:
+                self._disconnect()
+            pending = self._pending
+            self._pending = {}
+
+        for future in pending.values():
+            future.set_exception(
+                SignerUnavailable("Lost the connection to the signer")
+            )
+
+
+def _receive(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("Connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="SPRESSO signing service")
+    parser.add_argument("socket", help="path of the Unix domain socket")
+    parser.add_argument("private_key", help="path of the PEM private key")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="number of signing processes, signs in threads if 0"
+    )
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument(
+        "--mode",
+        type=lambda value: int(value, 8),
+        default=0o600,
+        help="octal permissions of the socket file"
+    )
+    args = parser.parse_args(args)
+
+    private_key = get_file_content(args.private_key, "rb")
+    signer = None
+    if args.workers:
+        signer = ProcessPoolSigner([private_key], workers=args.workers)
+
+    server = SigningServer(
+        args.socket,
+        private_key,
+        signer=signer,
+        max_batch=args.max_batch,
+        mode=args.mode
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if signer is not None:
+            signer.close()
+
+
+if __name__ == "__main__":
+    main()
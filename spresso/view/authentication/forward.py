@@ -1,6 +1,11 @@
-from spresso.view.base import TemplateView
+from spresso.view.base import Script, StaticViewMixin, TemplateView
 
 
-class ProxyView(TemplateView):
+class ProxyView(StaticViewMixin, TemplateView):
     def template(self):
         return self.settings.proxy_template
+
+    def render_static(self):
+        script = Script(settings=self.settings)
+        self.template_context = dict(script=script.render())
+        return super(ProxyView, self).render_static()
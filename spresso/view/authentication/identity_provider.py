@@ -1,5 +1,7 @@
-from spresso.model.base import Composition
-from spresso.view.base import JsonView, SettingsMixin
+from spresso.model.authentication.identity_assertion import \
+    AssertionSignature
+from spresso.model.authentication.well_known_info import WellKnownInfo
+from spresso.view.base import JsonView, SettingsMixin, StaticViewMixin
 
 
 class SignatureView(JsonView, SettingsMixin):
@@ -10,25 +12,22 @@ class SignatureView(JsonView, SettingsMixin):
     def json(self):
         schema = self.settings.json_schemata.get("sign").schema
 
-        ia_signature = {
-            schema.ia: self.signature
-        }
-
-        signature = Composition(ia_signature)
-        schema.validate(signature)
+        signature = AssertionSignature({schema.ia: self.signature})
+        if self.settings.validate_output:
+            schema.validate(signature.to_dict())
         signature_json = signature.to_json()
         return signature_json
 
 
-class WellKnownInfoView(JsonView, SettingsMixin):
+class WellKnownInfoView(StaticViewMixin, JsonView, SettingsMixin):
     def json(self):
         schema = self.settings.json_schemata.get("info").schema
 
-        wk_info = {
-            schema.public_key: self.settings.public_key
-        }
-
-        info = Composition(wk_info)
-        schema.validate(info)
+        info = WellKnownInfo({
+            schema.public_key: self.settings.public_key,
+            schema.signature_scheme: self.settings.signature_scheme
+        })
+        if self.settings.validate_output:
+            schema.validate(info.to_dict())
         info_json = info.to_json()
         return info_json
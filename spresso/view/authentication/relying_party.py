@@ -1,9 +1,9 @@
 from spresso.model.base import Composition, SettingsMixin
 from spresso.utils.base import to_b64
-from spresso.view.base import JsonView, TemplateView
+from spresso.view.base import JsonView, StaticViewMixin, TemplateView
 
 
-class WaitView(TemplateView):
+class WaitView(StaticViewMixin, TemplateView):
     def template(self):
         return self.settings.wait_template
 
@@ -31,7 +31,8 @@ class StartLoginView(JsonView, SettingsMixin):
         }
 
         info = Composition(info_schema)
-        schema.validate(info)
+        if self.settings.validate_output:
+            schema.validate(info)
         info_json = info.to_json()
         return info_json
 
@@ -1,10 +1,170 @@
+import gzip
+import hashlib
 import json
+import threading
+import weakref
 
-from jinja2 import Template
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, \
+    TemplateNotFound
 
 from spresso.model.base import SettingsMixin
 from spresso.model.web.base import Response
 from spresso.utils.base import get_resource
+from spresso.utils.instrumentation import instrumentation
+
+
+class ResourceLoader(BaseLoader):
+    """
+        Loads templates from the package resources, template names are
+        of the form '<resource_path><template>'.
+        Package resources do not change at runtime, compiled templates are
+        never reloaded.
+    """
+
+    def get_source(self, environment, template):
+        try:
+            source = get_resource("", template)
+        except OSError:
+            raise TemplateNotFound(template)
+        return source, None, lambda: True
+
+
+#: Shared environment, holds the compiled templates in memory.
+template_environment = Environment(
+    loader=ResourceLoader(),
+    autoescape=False,
+    auto_reload=False
+)
+
+
+def enable_bytecode_cache(directory=None):
+    """
+        Stores the compiled templates on disk, so that new worker processes
+        do not need to compile them again.
+        Defaults to a directory in the system temporary folder.
+    """
+    template_environment.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def accepts_gzip(request):
+    if request is None:
+        return False
+
+    accept_encoding = request.header("Accept-Encoding")
+    if not accept_encoding:
+        return False
+
+    for coding in accept_encoding.split(","):
+        name, *parameters = coding.split(";")
+        if name.strip().lower() not in ["gzip", "*"]:
+            continue
+
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if quality > 0:
+            return True
+
+    return False
+
+
+def etag_matches(request, etag):
+    if request is None:
+        return False
+
+    if_none_match = request.header("If-None-Match")
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison function
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ["*", etag]:
+            return True
+
+    return False
+
+
+class StaticContent(object):
+    """
+        Pre-encoded response body together with its headers, a strong ETag
+        and a gzip compressed variant.
+    """
+
+    def __init__(self, text, headers):
+        self.text = text
+        self.headers = dict(headers)
+        self.data = text.encode('utf-8')
+        self.gzip_data = gzip.compress(self.data, mtime=0)
+
+        digest = hashlib.sha256(self.data).hexdigest()[:32]
+        self.etag = '"{}"'.format(digest)
+        self.gzip_etag = '"{}-gzip"'.format(digest)
+
+    def make_response(self, request, response):
+        for header, value in self.headers.items():
+            response.add_header(header, value)
+        response.add_header("Vary", "Accept-Encoding")
+
+        use_gzip = accepts_gzip(request)
+        etag = self.gzip_etag if use_gzip else self.etag
+        response.add_header("ETag", etag)
+
+        if etag_matches(request, etag):
+            response.status_code = 304
+            response.data = b""
+            return response
+
+        if use_gzip:
+            response.add_header("Content-Encoding", "gzip")
+            response.data = self.gzip_data
+        else:
+            response.data = self.data
+
+        response.status_code = 200
+        return response
+
+
+class StaticCache(object):
+    """
+        Holds content that only depends on a settings object, the content
+        is released together with the settings object.
+    """
+
+    def __init__(self):
+        self._contents = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, settings, key, render):
+        with self._lock:
+            contents = self._contents.setdefault(settings, {})
+            content = contents.get(key)
+
+        if content is None:
+            content = render()
+            with self._lock:
+                content = contents.setdefault(key, content)
+
+        return content
+
+    def invalidate(self, settings=None):
+        with self._lock:
+            if settings is None:
+                self._contents.clear()
+            else:
+                self._contents.pop(settings, None)
+
+
+#: Process wide cache of settings-only content.
+static_cache = StaticCache()
 
 
 def json_error_response(error, response, status_code=400):
@@ -20,13 +180,14 @@ def json_error_response(error, response, status_code=400):
     return response
 
 
-def json_success_response(data, response):
+def json_success_response(data, response, cache_control="no-store"):
     response.data = data
     response.status_code = 200
 
     response.add_header("Content-Type", "application/json")
-    response.add_header("Cache-Control", "no-store")
-    response.add_header("Pragma", "no-cache")
+    response.add_header("Cache-Control", cache_control)
+    if cache_control == "no-store":
+        response.add_header("Pragma", "no-cache")
 
     return response
 
@@ -49,24 +210,32 @@ class View(object):
 
 
 class JsonView(View):
+    cache_control = "no-store"
+
     def make_response(self, response):
-        return json_success_response(self.json(), response)
+        return json_success_response(
+            self.json(),
+            response,
+            cache_control=self.cache_control
+        )
 
     def json(self):
         raise NotImplementedError
 
 
 class TemplateBase(SettingsMixin):
+    # Shared by the instances of a class, replace it per instance instead
+    # of changing it
     template_context = dict()
 
     def render(self):
-        self.template_context.update(dict(settings=self.settings))
-        template_file = get_resource(
-            self.settings.resource_path,
-            self.template()
-        )
-        template = Template(template_file, autoescape=False)
-        return template.render(**self.template_context)
+        name = self.template()
+        with instrumentation.measure("template.render", template=name):
+            context = dict(self.template_context, settings=self.settings)
+            template = template_environment.get_template(
+                "{}{}".format(self.settings.resource_path, name)
+            )
+            return template.render(**context)
 
     def template(self):
         raise NotImplementedError
@@ -78,6 +247,34 @@ class TemplateView(View, TemplateBase):
         return response
 
 
+class StaticViewMixin(object):
+    """
+        Mixin for views that only depend on their settings.
+        The response is rendered once per settings object and served from
+        the :data:`static_cache`, conditional requests are answered with 304.
+    """
+    # May be stored, clients revalidate it with its ETag
+    cache_control = "no-cache"
+
+    def __init__(self, request=None, **kwargs):
+        super(StaticViewMixin, self).__init__(**kwargs)
+        self.request = request
+
+    def make_response(self, response):
+        content = static_cache.get(
+            self.settings,
+            self.__class__,
+            self.render_static
+        )
+        return content.make_response(self.request, response)
+
+    def render_static(self):
+        response = super(StaticViewMixin, self).make_response(
+            self.response_class()
+        )
+        return StaticContent(response.data, response.headers)
+
+
 class Script(TemplateBase):
     def template(self):
         return self.settings.js_template
@@ -29,9 +29,12 @@ class CoreTestCase(unittest.TestCase):
 
         self.check_call(grant, application)
 
+    @patch("spresso.controller.grant.authentication.config.identity_provider."
+           "key_registry")
     @patch("spresso.controller.grant.authentication.config.identity_provider."
            "get_file_content")
-    def test_identity_provider_authentication_grant(self, get_content_mock):
+    def test_identity_provider_authentication_grant(self, get_content_mock,
+                                                    registry_mock):
         login_site_adapter = Mock(
             spec=spresso.controller.grant.authentication.site_adapter.
             identity_provider.LoginSiteAdapter
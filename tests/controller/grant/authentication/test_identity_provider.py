@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import Mock, MagicMock, PropertyMock, patch
+from unittest.mock import Mock, MagicMock, patch
 
 from spresso.controller.grant.authentication.identity_provider import \
     InfoHandler, LoginHandler, SignatureHandler
@@ -30,7 +30,7 @@ class IdentityProviderAuthenticationGrantTestCase(unittest.TestCase):
         # Test process
         handler.process(request, response, environ)
 
-        view_mock.assert_called_once_with(settings=settings)
+        view_mock.assert_called_once_with(request=request, settings=settings)
         view.process.assert_called_once_with(response)
 
     @patch("spresso.controller.grant.authentication.identity_provider.View")
@@ -47,8 +47,7 @@ class IdentityProviderAuthenticationGrantTestCase(unittest.TestCase):
 
         script = MagicMock(spec=Script)
         script.render.return_value = "script"
-        context = PropertyMock()
-        script.template_context = context
+        script.template_context = dict()
         script_mock.return_value = script
 
         settings = Mock()
@@ -85,7 +84,7 @@ class IdentityProviderAuthenticationGrantTestCase(unittest.TestCase):
             environ
         )
         script_mock.assert_called_once_with(settings)
-        context.update.assert_called_once_with(dict(email=user_email))
+        self.assertEqual(script.template_context, dict(email=user_email))
         self.assertEqual(script.render.call_count, 1)
         login_site_adapter.set_javascript.assert_called_once_with("script")
         login_site_adapter.render_page.assert_called_once_with(
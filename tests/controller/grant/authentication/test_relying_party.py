@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from json import JSONDecodeError
 from unittest.mock import Mock, patch, ANY, MagicMock
@@ -5,6 +6,8 @@ from unittest.mock import Mock, patch, ANY, MagicMock
 from cryptography.exceptions import InvalidTag, InvalidSignature
 from jsonschema import ValidationError
 
+from spresso.controller.grant.authentication.config.relying_party import \
+    RelyingParty
 from spresso.controller.grant.authentication.relying_party import \
     IndexHandler, WaitHandler, \
     StartLoginHandler, RedirectHandler, \
@@ -13,6 +16,7 @@ from spresso.controller.grant.authentication.site_adapter.relying_party import \
     IndexSiteAdapter, StartLoginSiteAdapter, \
     RedirectSiteAdapter, LoginSiteAdapter
 from spresso.model.authentication.session import Session
+from spresso.model.cache import VerificationCache
 from spresso.utils.error import UnsupportedAdditionalData, \
     SpressoInvalidError
 
@@ -56,6 +60,11 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         self.assertEqual(view_mock.call_count, 1)
         view.process.assert_called_once_with(data)
 
+        # The script is rendered once per settings object
+        handler.process(request, response, environ)
+        self.assertEqual(script.render.call_count, 1)
+        index_site_adapter.set_javascript.assert_called_with("script")
+
     @patch("spresso.controller.grant.authentication.relying_party.WaitView")
     def test_wait_handler(self, view_mock):
         view = Mock()
@@ -68,7 +77,7 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         environ = Mock()
 
         handler.process(request, response, environ)
-        view_mock.assert_called_once_with(settings=settings)
+        view_mock.assert_called_once_with(request=request, settings=settings)
         view.process.assert_called_once_with(response)
 
     @patch("spresso.controller.grant.authentication.relying_party.User")
@@ -85,6 +94,7 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         start_login_site_adapter = Mock(spec=StartLoginSiteAdapter)
         settings = Mock()
         settings.regexp = "r"
+        settings.session_sealer = None
 
         user = Mock()
         netloc = Mock()
@@ -161,6 +171,33 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         view_mock.assert_called_once_with(session, settings=settings)
         view.process.assert_called_once_with(response)
 
+        # Test process_async
+        retriever_mock.reset_mock()
+        retriever.reset_mock()
+        session_mock.reset_mock()
+        start_login_site_adapter.reset_mock()
+        view.reset_mock()
+
+        async def aget_content():
+            return idp_info_mock
+
+        retriever.aget_content = aget_content
+        view.process.return_value = "result"
+
+        result = asyncio.run(handler.process_async(request, response, environ))
+
+        self.assertEqual(result, "result")
+        retriever_mock.assert_called_once_with(netloc, settings=settings)
+        self.assertEqual(retriever.get_content.call_count, 0)
+        session_mock.assert_called_once_with(
+            user,
+            idp_info_mock,
+            settings=settings
+        )
+        start_login_site_adapter.save_session.assert_called_once_with(
+            session
+        )
+
     @patch("spresso.controller.grant.authentication.relying_party.from_b64")
     @patch("spresso.controller.grant.authentication.relying_party.unquote")
     @patch("spresso.controller.grant.authentication.relying_party.RedirectView")
@@ -171,6 +208,7 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         redirect_site_adapter = Mock(spec=RedirectSiteAdapter)
 
         settings = Mock()
+        settings.session_sealer = None
 
         handler = RedirectHandler(
             site_adapter=redirect_site_adapter,
@@ -249,6 +287,8 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         # read_validate_params
         login_site_adapter = Mock(spec=LoginSiteAdapter)
         settings = Mock()
+        settings.verification_cache = None
+        settings.session_sealer = None
 
         handler = LoginHandler(
             site_adapter=login_site_adapter,
@@ -385,6 +425,164 @@ class RelyingPartyAuthenticationGrantTestCase(unittest.TestCase):
         view.process.assert_called_once_with("response")
         self.assertEqual(res, "res")
 
+    @patch("spresso.controller.grant.authentication.relying_party.LoginView")
+    @patch("spresso.controller.grant.authentication.relying_party."
+           "IdentityAssertion")
+    def test_login_handler_verification_cache(self, ia_mock, view_mock):
+        login_site_adapter = Mock(spec=LoginSiteAdapter)
+        login_site_adapter.get_additional_data.return_value = {}
+        login_site_adapter.set_cookie.side_effect = \
+            lambda token, response: response
+        settings = Mock()
+        settings.verification_cache = VerificationCache(settings)
+        settings.session_sealer = None
+
+        session = Mock(spec=Session)
+        session.token = b"login token"
+        session.user = Mock()
+        login_site_adapter.load_session.return_value = session
+
+        ia = MagicMock()
+        ia.decrypt.return_value = "signature"
+        ia_mock.return_value = ia
+
+        handler = LoginHandler(
+            site_adapter=login_site_adapter,
+            settings=settings
+        )
+        handler.login_session_token = b"login token"
+        handler.eia = "eia"
+        request = Mock()
+        response = Mock()
+
+        handler.process(request, response, Mock())
+        service_token = session.token
+        self.assertNotEqual(service_token, b"login token")
+        login_site_adapter.set_cookie.assert_called_once_with(
+            service_token,
+            response
+        )
+
+        # A repeated submission skips the verification
+        login_site_adapter.reset_mock()
+        handler.process(request, response, Mock())
+        self.assertEqual(ia.decrypt.call_count, 1)
+        self.assertEqual(ia.verify.call_count, 1)
+        self.assertEqual(login_site_adapter.save_session.call_count, 0)
+        login_site_adapter.set_cookie.assert_called_once_with(
+            service_token,
+            response
+        )
+
+        # The service token was rotated elsewhere
+        session.token = b"rotated"
+        handler.process(request, response, Mock())
+        self.assertEqual(ia.verify.call_count, 2)
+
+        # Failed verifications are cached as well
+        handler.eia = "invalid"
+        ia.verify.side_effect = InvalidSignature
+        for _ in range(2):
+            with self.assertRaises(SpressoInvalidError) as context:
+                handler.process(request, response, Mock())
+            self.assertEqual(context.exception.error, "invalid_signature")
+        self.assertEqual(ia.verify.call_count, 3)
+
+    @patch("spresso.controller.grant.authentication.relying_party.LoginView")
+    @patch("spresso.controller.grant.authentication.relying_party."
+           "IdentityAssertion")
+    @patch("spresso.controller.grant.authentication.relying_party.RedirectView")
+    @patch(
+        "spresso.controller.grant.authentication.relying_party.StartLoginView")
+    @patch(
+        "spresso.controller.grant.authentication.relying_party.IdpInfoRequest")
+    def test_sealed_session(self, retriever_mock, start_login_view_mock,
+                            redirect_view_mock, ia_mock, login_view_mock):
+        class SealingRelyingParty(RelyingParty):
+            session_key = b"k" * 32
+
+        settings = SealingRelyingParty("rp.test", "fwd.test")
+        retriever_mock.return_value.get_content.return_value = \
+            '{"public_key": "key"}'
+        ia = MagicMock()
+        ia.decrypt.return_value = "signature"
+        ia_mock.return_value = ia
+
+        start_login_site_adapter = Mock(spec=StartLoginSiteAdapter)
+        handler = StartLoginHandler(
+            site_adapter=start_login_site_adapter,
+            settings=settings
+        )
+        request = Mock()
+        request.post_param.return_value = "user@idp.test"
+        handler.read_validate_params(request)
+        handler.process(request, Mock(), Mock())
+
+        # Nothing is stored, the token carries the session
+        self.assertEqual(start_login_site_adapter.save_session.call_count, 0)
+        session = start_login_view_mock.call_args[0][0]
+        self.assertIsNotNone(session.tag_enc_json)
+
+        redirect_site_adapter = Mock(spec=RedirectSiteAdapter)
+        handler = RedirectHandler(
+            site_adapter=redirect_site_adapter,
+            settings=settings
+        )
+        handler.login_session_token = session.token
+        handler.process(request, Mock(), Mock())
+
+        self.assertEqual(redirect_site_adapter.load_session.call_count, 0)
+        login_url = redirect_view_mock.return_value.template_context["url"]
+        self.assertTrue(login_url.startswith(
+            "https://idp.test/.well-known/spresso-login#"
+        ))
+
+        login_site_adapter = Mock(spec=LoginSiteAdapter)
+        login_site_adapter.get_additional_data.return_value = {}
+        handler = LoginHandler(
+            site_adapter=login_site_adapter,
+            settings=settings
+        )
+        handler.login_session_token = session.token
+        handler.eia = "eia"
+        response = Mock()
+        handler.process(request, response, Mock())
+
+        self.assertEqual(login_site_adapter.load_session.call_count, 0)
+        ia.verify.assert_called_once_with("signature")
+        restored = ia.from_session.call_args[0][0]
+        self.assertEqual(restored.ia_key, session.ia_key)
+        login_site_adapter.save_session.assert_called_once_with(restored)
+        login_site_adapter.set_cookie.assert_called_once_with(
+            restored.token,
+            response
+        )
+        login_view_mock.assert_called_once_with("user@idp.test")
+
+        # Replays of the token are rejected
+        with self.assertRaises(SpressoInvalidError) as context:
+            handler.process(request, response, Mock())
+        self.assertEqual(context.exception.error, "invalid_request")
+
+        # Tokens of other keys, and sessions of replaced IdP keys
+        handler.login_session_token = session.token[:-1] + b"x"
+        self.assertRaises(
+            SpressoInvalidError,
+            handler.process,
+            request,
+            response,
+            Mock()
+        )
+
+        session.token = session.token_id
+        session.seal()
+        handler.login_session_token = session.token
+        retriever_mock.return_value.get_content.return_value = \
+            '{"public_key": "other"}'
+        with self.assertRaises(SpressoInvalidError) as context:
+            handler.process(request, response, Mock())
+        self.assertEqual(context.exception.error, "invalid_session")
+
 
 def post_param_mock(arg):
     return arg
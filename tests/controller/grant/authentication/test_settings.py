@@ -1,3 +1,4 @@
+import time
 import unittest
 
 from unittest.mock import Mock, patch, call
@@ -6,13 +7,20 @@ from spresso.controller.grant.authentication.config.identity_provider import \
     IdentityProvider
 from spresso.controller.grant.authentication.config.relying_party import \
     RelyingParty
+from spresso.model.authentication.session_token import SessionSealer
+from spresso.model.request import HttpClient, AsyncHttpClient
+from spresso.utils.concurrency import SingleFlight
+from spresso.utils.crypto import key_registry
 
 
 class SettingsTestCase(unittest.TestCase):
+    @patch(
+        "spresso.controller.grant.authentication.config.identity_provider."
+        "key_registry")
     @patch(
         "spresso.controller.grant.authentication.config.identity_provider."
         "get_file_content")
-    def test_identity_provider(self, get_content_mock):
+    def test_identity_provider(self, get_content_mock, registry_mock):
         domain = Mock()
         priv_key_path = Mock()
         pub_key_path = Mock()
@@ -32,6 +40,51 @@ class SettingsTestCase(unittest.TestCase):
         self.assertEqual(
             get_content_mock.mock_calls[1], call(pub_key_path, "r")
         )
+        registry_mock.private_key.assert_called_once_with("public key")
+        self.assertEqual(registry_mock.invalidate.call_count, 0)
+
+        get_content_mock.return_value = "rotated key"
+        idp.load_keys(priv_key_path, pub_key_path)
+        # Both keys of the previous pair are removed
+        self.assertEqual(
+            registry_mock.invalidate.mock_calls,
+            [call("public key"), call(b"public key")]
+        )
+        registry_mock.private_key.assert_called_with("rotated key")
+        self.assertEqual(idp.private_key, "rotated key")
+
+        # The key may be held by the signer backend
+        registry_mock.reset_mock()
+        get_content_mock.reset_mock()
+        idp = IdentityProvider(domain, None, pub_key_path)
+        self.assertIsNone(idp.private_key)
+        self.assertEqual(idp.public_key, "rotated key")
+        get_content_mock.assert_called_once_with(pub_key_path, "r")
+        self.assertEqual(registry_mock.private_key.call_count, 0)
+
+    def test_identity_provider_signature_scheme(self):
+        idp = IdentityProvider(
+            Mock(),
+            "test_priv_key.pem",
+            "test_pub_key.pem"
+        )
+        self.assertEqual(idp.signature_scheme, "RS256")
+
+    def test_identity_provider_key_rotation(self):
+        idp = IdentityProvider(
+            Mock(),
+            "test_priv_key.pem",
+            "test_pub_key.pem"
+        )
+        self.assertEqual(idp.signature_scheme, "RS256")
+        private_key = idp.private_key
+        public_key = idp.public_key.encode('utf-8')
+        self.assertIn(public_key, key_registry)
+
+        # Rotated to a key held by the signer backend
+        idp.load_keys(None, "test_pub_key.pem")
+        self.assertNotIn(private_key, key_registry)
+        self.assertNotIn(public_key, key_registry)
 
     @patch.object(RelyingParty, 'fwd_selector')
     @patch("spresso.controller.grant.authentication.config.relying_party."
@@ -49,5 +102,87 @@ class SettingsTestCase(unittest.TestCase):
         fwd_domain_mock.assert_called_once_with("default", forwarder_domain)
         selection_mock.update_default.assert_called_once_with("domain")
         self.assertEqual(rp.scheme_well_known_info, rp.scheme)
-        cache_mock.assert_called_once_with(rp)
+        cache_mock.assert_called_once_with(
+            rp,
+            max_entries=rp.cache_max_entries,
+            max_size=rp.cache_max_size
+        )
         self.assertEqual(rp.cache, "cache")
+        self.assertIsInstance(rp.info_flight, SingleFlight)
+        self.assertIsInstance(rp.http_client, HttpClient)
+        self.assertEqual(rp.http_client.timeout, rp.timeout)
+        self.assertIsInstance(rp.async_http_client, AsyncHttpClient)
+        self.assertEqual(rp.async_http_client.retries, rp.retries)
+        self.assertIsNone(rp.session_sealer)
+
+    def test_relying_party_session_sealer(self):
+        class SealingRelyingParty(RelyingParty):
+            session_key = b"k" * 32
+            session_token_lifetime = 60
+
+        rp = SealingRelyingParty("domain", "forwarder")
+        self.assertIsInstance(rp.session_sealer, SessionSealer)
+        self.assertEqual(rp.session_sealer.key, b"k" * 32)
+        self.assertEqual(rp.session_sealer.lifetime, 60)
+
+        SealingRelyingParty.session_key = b"invalid"
+        self.assertRaises(ValueError, SealingRelyingParty, "domain", "fwd")
+
+    def test_relying_party_assigned_settings(self):
+        # Settings are assigned after construction, see the examples
+        rp = RelyingParty("domain", "forwarder")
+        self.assertIsNone(rp.session_sealer)
+        self.assertIsNone(rp.verification_cache)
+
+        rp.session_key = b"k" * 32
+        self.assertIsInstance(rp.session_sealer, SessionSealer)
+        rp.session_sealer.consumed.consume(b"token id", time.time() + 60)
+        rp.session_token_lifetime = 60
+        self.assertEqual(rp.session_sealer.lifetime, 60)
+        # Consumed tokens can not be replayed after a change
+        self.assertFalse(
+            rp.session_sealer.consumed.consume(b"token id", time.time() + 60)
+        )
+
+        # Invalid settings are rejected, the previous ones are kept
+        sealer = rp.session_sealer
+        with self.assertRaises(ValueError):
+            rp.session_key = b"invalid"
+        self.assertEqual(rp.session_key, b"k" * 32)
+        self.assertIs(rp.session_sealer, sealer)
+
+        # Tokens of another key are not known to the new sealer
+        rp.session_key = b"l" * 32
+        self.assertTrue(
+            rp.session_sealer.consumed.consume(b"token id", time.time() + 60)
+        )
+
+        rp.verification_cache_lifetime = 30
+        self.assertEqual(rp.verification_cache.caching_setting.lifetime, 30)
+
+        verification_cache = rp.verification_cache
+        verification_cache.store("handle", b"token")
+        rp.verification_cache_lifetime = 20
+        self.assertEqual(verification_cache.stats["entries"], 0)
+
+        http_client = rp.http_client
+        with patch.object(http_client, "close") as close_mock, \
+                patch.object(rp.async_http_client, "close") as aclose_mock:
+            rp.timeout = (1, 2)
+        # Replaced clients are closed
+        close_mock.assert_called_once_with()
+        aclose_mock.assert_called_once_with()
+        self.assertIsNot(rp.http_client, http_client)
+        self.assertEqual(rp.http_client.timeout, (1, 2))
+        self.assertEqual(rp.async_http_client.timeout, (1, 2))
+        rp.retries = 5
+        self.assertEqual(rp.async_http_client.retries, 5)
+
+        cache = rp.cache
+        with patch.object(cache, "flush") as flush_mock:
+            rp.cache_max_entries = 8
+        flush_mock.assert_called_once_with()
+        self.assertEqual(rp.cache.max_entries, 8)
+
+        # Other instances keep the class defaults
+        self.assertIsNone(RelyingParty("domain", "fwd").session_sealer)
@@ -1,13 +1,19 @@
+import asyncio
 import json
+import threading
 import unittest
 from unittest.mock import Mock
 
-from spresso.controller.application import Application
+from spresso.controller.application import Application, Processing
+from spresso.controller.grant.authentication import identity_provider, \
+    relying_party
 from spresso.controller.grant.authentication.site_adapter.base import \
     AuthenticatingSiteAdapter
 from spresso.controller.grant.base import ValidatingGrantHandler
 from spresso.model.web.base import Response
 from spresso.utils.error import SpressoInvalidError
+from spresso.utils.instrumentation import HistogramCollector, \
+    instrumentation
 
 
 class ApplicationTestCase(unittest.TestCase):
@@ -50,6 +56,116 @@ class ApplicationTestCase(unittest.TestCase):
         )
         self.assertEqual(result, process_result)
 
+    def test_dispatch_instrumentation(self):
+        class Handler(ValidatingGrantHandler):
+            read_validate_params = Mock()
+            process = Mock(return_value="result")
+            handle_error = Mock(return_value="error")
+
+        collector = HistogramCollector()
+        instrumentation.add_observer(collector)
+        self.addCleanup(instrumentation.remove_observer, collector)
+
+        route_mock = Mock(return_value=Handler())
+        self.application.dispatch(Mock(), {}, route=route_mock)
+        Handler.process.side_effect = ValueError
+        self.application.dispatch(Mock(), {}, route=route_mock)
+
+        for name, errors in [
+            ("dispatch", 0),
+            ("handler.validate", 0),
+            ("handler.process", 1),
+        ]:
+            histogram = collector.histogram(
+                name,
+                handler=Handler.__module__ + "." + Handler.__qualname__
+            )
+            self.assertEqual(histogram.count, 2)
+            self.assertEqual(histogram.errors, errors)
+
+    def test_processing_handler_label(self):
+        # Handlers of the same name are measured separately
+        labels = {
+            Processing(self.application, Mock(spec=handler_class)).handler
+            for handler_class in [
+                identity_provider.LoginHandler,
+                relying_party.LoginHandler
+            ]
+        }
+        self.assertEqual(labels, {
+            "spresso.controller.grant.authentication.identity_provider."
+            "LoginHandler",
+            "spresso.controller.grant.authentication.relying_party."
+            "LoginHandler"
+        })
+
+    def test_dispatch_route(self):
+        request_mock = Mock(spec=Response)
+
+        grant_handler_mock = Mock(spec=ValidatingGrantHandler)
+        grant_handler_mock.process.return_value = "result"
+        route_mock = Mock(return_value=grant_handler_mock)
+
+        grant_factory_mock = Mock()
+        self.application.add_grant(grant_factory_mock)
+        result = self.application.dispatch(request_mock, {}, route=route_mock)
+
+        route_mock.assert_called_once_with(self.application)
+        self.assertEqual(grant_factory_mock.call_count, 0)
+        self.assertEqual(result, "result")
+
+    def test_dispatch_async(self):
+        request_mock = Mock(spec=Response)
+        threads = []
+
+        def process(request, response, environ):
+            threads.append(threading.current_thread())
+            return "result"
+
+        grant_handler_mock = Mock(spec=ValidatingGrantHandler)
+        grant_handler_mock.process.side_effect = process
+        grant_handler_mock.blocking = True
+        route_mock = Mock(return_value=grant_handler_mock)
+
+        result = asyncio.run(self.application.dispatch_async(
+            request_mock, {}, route=route_mock
+        ))
+        self.assertEqual(result, "result")
+        grant_handler_mock.read_validate_params.assert_called_with(request_mock)
+
+        grant_handler_mock.blocking = False
+        asyncio.run(self.application.dispatch_async(
+            request_mock, {}, route=route_mock
+        ))
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertIs(threads[1], threading.main_thread())
+
+        result = asyncio.run(self.application.dispatch_async(request_mock, {}))
+        self.assertEqual(self.response_mock.status_code, 400)
+        self.assertEqual(result, self.response_mock)
+
+    def test_process_async(self):
+        request_mock = Mock(spec=Response)
+        executors = []
+
+        async def process_async(request, response, environ, executor=None):
+            executors.append(executor)
+            raise SpressoInvalidError("")
+
+        grant_handler_mock = Mock(spec=ValidatingGrantHandler)
+        grant_handler_mock.process_async = process_async
+        grant_handler_mock.handle_error.return_value = "error"
+        route_mock = Mock(return_value=grant_handler_mock)
+
+        executor = Mock()
+        result = asyncio.run(self.application.dispatch_async(
+            request_mock, {}, route=route_mock, executor=executor
+        ))
+        self.assertEqual(result, "error")
+        self.assertEqual(grant_handler_mock.process.call_count, 0)
+        # The executor of the application is passed on to the handler
+        self.assertEqual(executors, [executor])
+
     def test_dispatch_no_grant_type_found(self):
         error_body = {
             "error": "unsupported_grant",
@@ -64,7 +180,7 @@ class ApplicationTestCase(unittest.TestCase):
             "Content-Type", "application/json"
         )
         self.assertEqual(self.response_mock.status_code, 400)
-        self.assertEqual(self.response_mock.body, json.dumps(error_body))
+        self.assertEqual(self.response_mock.data, json.dumps(error_body))
         self.assertEqual(result, self.response_mock)
 
     def test_dispatch_general_exception(self):
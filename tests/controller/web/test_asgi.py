@@ -0,0 +1,226 @@
+import asyncio
+import io
+import threading
+import unittest
+from unittest.mock import AsyncMock, Mock, MagicMock
+
+from spresso.controller.application import Application
+from spresso.controller.grant.base import GrantHandler, \
+    RoutedGrantHandlerFactory
+from spresso.controller.web.asgi import AsgiApplication, \
+    AsgiPathDispatcher, send_response
+from spresso.model.request import AsyncHttpClient
+from spresso.model.settings import Endpoint
+from spresso.model.web.base import Response
+
+
+class TestHandler(GrantHandler):
+    def __init__(self, blocking):
+        self.blocking = blocking
+
+    def process(self, request, response, environ):
+        response.data = "{} {}".format(
+            request.post_param("data"),
+            threading.current_thread() is threading.main_thread()
+        )
+        response.add_header("Content-Type", "text/plain")
+        return response
+
+
+class TestGrant(RoutedGrantHandlerFactory):
+    def __init__(self):
+        self.settings = Mock()
+        self.settings.endpoints.all.return_value = dict()
+        self.settings.max_body_size = 16
+
+    def routes(self):
+        return [
+            (Endpoint("blocking", "/blocking", ["POST"]),
+             lambda application: TestHandler(blocking=True)),
+            (Endpoint("inline", "/inline", ["POST"]),
+             lambda application: TestHandler(blocking=False)),
+        ]
+
+
+def call(app, scope, body=b""):
+    messages = [{"type": "http.request", "body": body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def http_scope(method, path):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"application/x-www-form-urlencoded")
+        ]
+    }
+
+
+class AsgiApplicationTestCase(unittest.TestCase):
+    def setUp(self):
+        application = Application()
+        application.add_grant(TestGrant())
+        self.app = AsgiApplication(application)
+
+    def test_call(self):
+        sent = call(self.app, http_scope("POST", "/inline"), b"data=value")
+
+        self.assertEqual(sent[0]["type"], "http.response.start")
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn((b"Content-Type", b"text/plain"), sent[0]["headers"])
+        self.assertIn((b"Content-Length", b"10"), sent[0]["headers"])
+        self.assertEqual(sent[1]["type"], "http.response.body")
+        # Non-blocking handlers are processed on the event loop
+        self.assertEqual(sent[1]["body"], b"value True")
+
+        sent = call(self.app, http_scope("POST", "/blocking"), b"data=value")
+        # Blocking handlers are processed in the executor
+        self.assertEqual(sent[1]["body"], b"value False")
+
+    def test_body_too_large(self):
+        sent = call(self.app, http_scope("POST", "/inline"), b"data=" * 4)
+        self.assertEqual(sent[0]["status"], 413)
+        self.assertEqual(sent[1]["body"], b"Payload Too Large")
+
+        # Announced lengths are refused before the body is read
+        scope = http_scope("POST", "/inline")
+        scope["headers"].append((b"content-length", b"17"))
+        sent = call(self.app, scope, b"data=value")
+        self.assertEqual(sent[0]["status"], 413)
+
+    def test_not_found(self):
+        sent = call(self.app, http_scope("GET", "/unknown"))
+        self.assertEqual(sent[0]["status"], 404)
+        self.assertEqual(sent[1]["body"], b"Not Found")
+
+        sent = call(self.app, http_scope("GET", "/inline"))
+        self.assertEqual(sent[0]["status"], 405)
+        self.assertIn((b"Allow", b"POST"), sent[0]["headers"])
+
+    def test_process_async(self):
+        handler = Mock(spec=["process_async"])
+
+        async def process_async(request, response, environ, executor=None):
+            response.data = b"async"
+            return response
+
+        handler.process_async.side_effect = process_async
+        application = MagicMock(spec=Application)
+        application.grant_types = []
+        app = AsgiApplication(application)
+        app.route_table.add(
+            Endpoint("async", "/async", ["GET"]),
+            lambda application: handler
+        )
+        application.dispatch_async.side_effect = \
+            Application().dispatch_async
+
+        sent = call(app, http_scope("GET", "/async"))
+        self.assertEqual(sent[1]["body"], b"async")
+
+    def test_send_response_stream(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(send_response(send, 200, [], iter(["a", b"b"])))
+        # Streamed bodies have no length
+        self.assertEqual(sent[0]["headers"], [])
+        self.assertEqual(
+            [(msg["body"], msg.get("more_body")) for msg in sent[1:]],
+            [(b"a", True), (b"b", True), (b"", None)]
+        )
+
+        sent.clear()
+        asyncio.run(send_response(send, 304, [], b""))
+        self.assertEqual(sent[0]["headers"], [])
+
+    def test_send_response_file(self):
+        sent = []
+        threads = []
+
+        async def send(message):
+            sent.append(message)
+
+        class File(io.BytesIO):
+            def read(self, size=-1):
+                threads.append(threading.current_thread())
+                return super(File, self).read(size)
+
+        body = File(b"file data")
+        asyncio.run(send_response(send, 200, [], body))
+
+        self.assertEqual(b"".join(msg["body"] for msg in sent[1:]),
+                         b"file data")
+        self.assertTrue(body.closed)
+        # Files are read in the executor, not on the event loop
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_lifespan(self):
+        messages = [{"type": "lifespan.startup"},
+                    {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        client = AsyncHttpClient()
+        client.aclose = AsyncMock()
+        self.app.application.grant_types[0].settings.async_http_client = \
+            client
+
+        asyncio.run(self.app({"type": "lifespan"}, receive, send))
+        self.assertEqual(sent, [{"type": "lifespan.startup.complete"},
+                                {"type": "lifespan.shutdown.complete"}])
+        # Connection pools are closed on shutdown
+        client.aclose.assert_awaited_once_with()
+
+        self.assertRaises(ValueError, asyncio.run,
+                          self.app({"type": "websocket"}, receive, send))
+
+
+class AsgiPathDispatcherTestCase(unittest.TestCase):
+    def test_call(self):
+        application = Application()
+        application.add_grant(TestGrant())
+        app = AsgiApplication(application)
+
+        default_response = Response()
+        default_response.data = "default"
+        default_application = MagicMock(spec=Application)
+        default_application.grant_types = []
+        default_application.dispatch_async.return_value = default_response
+        default_app = AsgiApplication(default_application)
+        default_app.route_table.add(Endpoint("index", "/", ["GET"]), None)
+
+        self.assertRaises(ValueError, AsgiPathDispatcher, default_app, Mock())
+        dispatcher = AsgiPathDispatcher(default_app=default_app, app=app)
+
+        sent = call(dispatcher, http_scope("POST", "/inline"), b"data=value")
+        self.assertEqual(sent[1]["body"], b"value True")
+
+        sent = call(dispatcher, http_scope("GET", "/"))
+        self.assertEqual(sent[1]["body"], b"default")
+
+        # Known path with an unsupported method
+        sent = call(dispatcher, http_scope("GET", "/inline"))
+        self.assertEqual(sent[0]["status"], 405)
+
+        self.assertIsNone(dispatcher.get_application({"type": "lifespan"}))
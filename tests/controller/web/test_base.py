@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import Mock
+
+from spresso.controller.grant.authentication.config.forward import Forward
+from spresso.controller.grant.authentication.config.relying_party import \
+    RelyingParty
+from spresso.controller.grant.authentication.core import \
+    ForwardAuthenticationGrant, RelyingPartyAuthenticationGrant
+from spresso.controller.grant.authentication.forward import ProxyHandler
+from spresso.controller.grant.authentication.relying_party import \
+    StartLoginHandler
+from spresso.controller.grant.authentication.site_adapter.relying_party import \
+    IndexSiteAdapter, StartLoginSiteAdapter, RedirectSiteAdapter, \
+    LoginSiteAdapter
+from spresso.controller.web.base import RouteTable
+from spresso.model.settings import Endpoint
+
+
+class RouteTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.forward_grant = ForwardAuthenticationGrant(settings=Forward())
+        self.rp_grant = RelyingPartyAuthenticationGrant(
+            index_site_adapter=Mock(spec=IndexSiteAdapter),
+            start_login_site_adapter=Mock(spec=StartLoginSiteAdapter),
+            redirect_site_adapter=Mock(spec=RedirectSiteAdapter),
+            login_site_adapter=Mock(spec=LoginSiteAdapter),
+            settings=RelyingParty(Mock(), Mock())
+        )
+
+    def test_match(self):
+        table = RouteTable([self.forward_grant, self.rp_grant])
+
+        status, constructor = table.match("GET", "/.well-known/spresso-proxy")
+        self.assertEqual(status, RouteTable.FOUND)
+        self.assertIsInstance(constructor(Mock()), ProxyHandler)
+
+        status, constructor = table.match("POST", "/startLogin")
+        self.assertEqual(status, RouteTable.FOUND)
+        handler = constructor(Mock())
+        self.assertIsInstance(handler, StartLoginHandler)
+        self.assertEqual(handler.settings, self.rp_grant.settings)
+        # A new handler is created for every request
+        self.assertIsNot(constructor(Mock()), handler)
+
+        status, constructor = table.match("GET", "/startLogin")
+        self.assertEqual(status, RouteTable.METHOD_NOT_ALLOWED)
+        self.assertIsNone(constructor)
+        self.assertEqual(table.allowed_methods("/startLogin"), ["POST"])
+
+        status, constructor = table.match("GET", "/unknown")
+        self.assertEqual(status, RouteTable.NOT_FOUND)
+        self.assertIsNone(constructor)
+        self.assertEqual(table.allowed_methods("/unknown"), [])
+
+        self.assertIn("/", table)
+        self.assertNotIn("/unknown", table)
+        self.assertEqual(len(table), 7)
+
+    def test_unrouted_grant(self):
+        grant = Mock()
+        grant.settings.endpoints.all.return_value = dict(
+            test=Endpoint("test", "/test", ["GET", "POST"])
+        )
+        table = RouteTable([grant])
+
+        self.assertEqual(table.match("GET", "/test"), (RouteTable.FOUND, None))
+        self.assertEqual(table.match("POST", "/test"), (RouteTable.FOUND, None))
+
+    def test_precedence(self):
+        constructor = Mock()
+        table = RouteTable([])
+        table.add(Endpoint("first", "/", ["GET"]), constructor)
+        table.add(Endpoint("second", "/", ["GET", "POST"]), Mock())
+
+        self.assertEqual(table.match("GET", "/"), (RouteTable.FOUND,
+                                                   constructor))
+        self.assertEqual(table.allowed_methods("/"), ["GET", "POST"])
@@ -1,10 +1,13 @@
+import tempfile
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 
 from spresso.controller.application import Application
-from spresso.controller.web.wsgi import WsgiApplication, PathDispatcher
+from spresso.controller.grant.base import RoutedGrantHandlerFactory
+from spresso.controller.web.wsgi import WsgiApplication, PathDispatcher, \
+    in_supported_endpoints
 from spresso.model.settings import Endpoint
-from spresso.model.web.base import Request, Response
+from spresso.model.web.base import BLOCK_SIZE, Request, Response
 
 
 class WSGIApplicationTestCase(unittest.TestCase):
@@ -43,10 +46,23 @@ class WSGIApplicationTestCase(unittest.TestCase):
         result = wsgi(environment, start_response_mock)
 
         request_class_mock.assert_called_once_with(environment)
-        application_mock.dispatch.assert_called_with(request_mock, environment)
-        start_response_mock.assert_called_with(http_code, list(headers.items()))
+        application_mock.dispatch.assert_called_with(request_mock, environment,
+                                                     route=None)
+        start_response_mock.assert_called_with(
+            http_code,
+            list(headers.items()) + [("Content-Length", "4")]
+        )
         self.assertEqual(result, [data.encode('utf-8')])
 
+        # Pre-encoded data is passed through, 304 responses have no length
+        response_mock.data = b"encoded"
+        response_mock.status_code = 304
+        result = wsgi(environment, start_response_mock)
+        start_response_mock.assert_called_with("304 Not Modified",
+                                               list(headers.items()))
+        self.assertEqual(result, [b"encoded"])
+        self.assertIs(result[0], response_mock.data)
+
         # Call some url
         environment.update(dict(PATH_INFO="/"))
 
@@ -56,6 +72,154 @@ class WSGIApplicationTestCase(unittest.TestCase):
             [('Content-Type', 'text/plain')]
         )
 
+        # Call with an unsupported method
+        environment.update(dict(PATH_INFO=path, REQUEST_METHOD="POST"))
+        result = wsgi(environment, start_response_mock)
+        start_response_mock.assert_called_with(
+            "405 Method not allowed",
+            [('Content-Type', 'text/plain'), ('Allow', 'GET')]
+        )
+        self.assertEqual(result, [b'Method Not Allowed'])
+
+    def test_call_route(self):
+        grant = Mock(spec=RoutedGrantHandlerFactory)
+        constructor = Mock()
+        grant.routes.return_value = [
+            (Endpoint("test", "/test", ["GET"]), constructor)
+        ]
+        grant.settings = Mock()
+        grant.settings.endpoints.all.return_value = dict()
+
+        application_mock = MagicMock(spec=Application)
+        application_mock.grant_types = [grant]
+        response = Response()
+        response.data = "body"
+        application_mock.dispatch.return_value = response
+
+        wsgi = WsgiApplication(application_mock)
+        environment = {"PATH_INFO": "/test", "REQUEST_METHOD": "GET",
+                       "QUERY_STRING": ""}
+        result = wsgi(environment, Mock())
+
+        self.assertEqual(result, [b"body"])
+        self.assertEqual(
+            application_mock.dispatch.call_args[1], dict(route=constructor)
+        )
+
+    def test_call_body_too_large(self):
+        grant = Mock()
+        grant.settings.endpoints.all.return_value = dict(
+            test=Endpoint("test", "/test", ["POST"])
+        )
+        grant.settings.max_body_size = 16
+
+        application_mock = MagicMock(spec=Application)
+        application_mock.grant_types = [grant]
+        application_mock.dispatch.return_value = Response()
+
+        # A larger limit of another grant does not apply
+        other_grant = Mock()
+        other_grant.settings.endpoints.all.return_value = dict(
+            other=Endpoint("other", "/other", ["POST"])
+        )
+        other_grant.settings.max_body_size = 1024
+        application_mock.grant_types.append(other_grant)
+
+        wsgi = WsgiApplication(application_mock)
+        self.assertEqual(wsgi.route_table.max_body_size("POST", "/test"), 16)
+
+        wsgi_input = Mock(spec=["read"])
+        environment = {"PATH_INFO": "/test", "REQUEST_METHOD": "POST",
+                       "QUERY_STRING": "", "CONTENT_LENGTH": "17",
+                       "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                       "wsgi.input": wsgi_input}
+        start_response_mock = Mock()
+        result = wsgi(environment, start_response_mock)
+
+        self.assertEqual(result, [b"Payload Too Large"])
+        start_response_mock.assert_called_once_with(
+            "413 Payload Too Large",
+            [('Content-Type', 'text/plain')]
+        )
+        wsgi_input.read.assert_not_called()
+        application_mock.dispatch.assert_not_called()
+
+        environment["CONTENT_LENGTH"] = "16"
+        wsgi(environment, start_response_mock)
+        application_mock.dispatch.assert_called_once()
+
+    def test_call_body(self):
+        grant = Mock()
+        grant.settings.endpoints.all.return_value = dict(
+            test=Endpoint("test", "/test", ["GET"])
+        )
+        grant.settings.max_body_size = 16
+
+        response = Response()
+        application_mock = MagicMock(spec=Application)
+        application_mock.grant_types = [grant]
+        application_mock.dispatch.return_value = response
+
+        wsgi = WsgiApplication(application_mock)
+        environment = {"PATH_INFO": "/test", "REQUEST_METHOD": "GET",
+                       "QUERY_STRING": ""}
+
+        def call(data, **environ):
+            start_response_mock = Mock()
+            response.data = data
+            result = wsgi(dict(environment, **environ), start_response_mock)
+            headers = dict(start_response_mock.call_args[0][1])
+            return result, headers.get("Content-Length")
+
+        # Whole memoryviews are not copied
+        data = b"data"
+        result, length = call(memoryview(data))
+        self.assertIs(result[0], data)
+        self.assertEqual(length, "4")
+
+        result, length = call(memoryview(b"xdata")[1:])
+        self.assertEqual(result, [b"data"])
+        self.assertEqual(length, "4")
+
+        # Iterables are streamed without a length
+        result, length = call(iter(["d", b"a", bytearray(b"ta")]))
+        self.assertEqual(list(result), [b"d", b"a", b"ta"])
+        self.assertIsNone(length)
+
+        with tempfile.TemporaryFile() as file:
+            file.write(b"file data")
+            file.seek(5)
+
+            file_wrapper = Mock()
+            result, length = call(file, **{"wsgi.file_wrapper": file_wrapper})
+            self.assertIs(result, file_wrapper.return_value)
+            file_wrapper.assert_called_once_with(file, BLOCK_SIZE)
+            self.assertEqual(length, "4")
+
+            result, length = call(file)
+            self.assertEqual(b"".join(result), b"data")
+            self.assertTrue(file.closed)
+
+        # Lengths set by the handler are kept
+        response.add_header("Content-Length", "4")
+        _, length = call(iter([b"data"]))
+        self.assertEqual(length, "4")
+
+
+class InSupportedEndpointsTestCase(unittest.TestCase):
+    def test_in_supported_endpoints(self):
+        endpoints = dict(test=Endpoint("test", "/test", ["GET"]))
+
+        for method, path, expected in [("GET", "/test", True),
+                                       ("POST", "/test", False),
+                                       ("GET", "/", False)]:
+            environ = {"REQUEST_METHOD": method, "PATH_INFO": path}
+            with self.assertWarns(DeprecationWarning):
+                self.assertEqual(
+                    in_supported_endpoints(endpoints, environ),
+                    expected
+                )
+
 
 class PathDispatcherTestCase(unittest.TestCase):
     @patch("spresso.controller.web.wsgi.WsgiRequest")
@@ -106,8 +270,12 @@ class PathDispatcherTestCase(unittest.TestCase):
         result = path_dispatcher(environment, start_response_mock)
 
         request_class_mock.assert_called_once_with(environment)
-        application_mock.dispatch.assert_called_with(request_mock, environment)
-        start_response_mock.assert_called_with(http_code, list(headers.items()))
+        application_mock.dispatch.assert_called_with(request_mock, environment,
+                                                     route=None)
+        start_response_mock.assert_called_with(
+            http_code,
+            list(headers.items()) + [("Content-Length", "4")]
+        )
         self.assertEqual(result, [data.encode('utf-8')])
 
         # Call url that is not in provider_mock
@@ -116,7 +284,42 @@ class PathDispatcherTestCase(unittest.TestCase):
 
         default_application_mock.dispatch.assert_called_with(
             request_mock,
-            environment
+            environment,
+            route=None
+        )
+        start_response_mock.assert_called_with(
+            http_code,
+            list(headers.items()) + [("Content-Length", "4")]
         )
-        start_response_mock.assert_called_with(http_code, list(headers.items()))
         self.assertEqual(result, [data.encode('utf-8')])
+
+    @patch("spresso.controller.web.wsgi.WsgiRequest")
+    def test_method_not_allowed(self, request_class_mock):
+        application_mock = MagicMock(spec=Application)
+        grant_mock = Mock()
+        grant_mock.settings.endpoints.all.return_value = dict(
+            test=Endpoint("test", "/test", ["GET"])
+        )
+        application_mock.grant_types = [grant_mock]
+
+        default_application_mock = MagicMock(spec=Application)
+        grant_mock = Mock()
+        grant_mock.settings.endpoints.all.return_value = dict(
+            index=Endpoint("index", "/", ["GET"])
+        )
+        default_application_mock.grant_types = [grant_mock]
+
+        wsgi = WsgiApplication(application=application_mock)
+        default_wsgi = WsgiApplication(application=default_application_mock)
+        path_dispatcher = PathDispatcher(default_app=default_wsgi, app=wsgi)
+
+        environment = {"PATH_INFO": "/test", "REQUEST_METHOD": "POST"}
+        self.assertEqual(path_dispatcher.get_application(environment), wsgi)
+
+        environment = {"PATH_INFO": "/", "REQUEST_METHOD": "POST"}
+        self.assertIsNone(path_dispatcher.get_application(environment))
+
+        # Other default applications receive the request
+        path_dispatcher = PathDispatcher(default_app=Mock(), app=wsgi)
+        environment = {"PATH_INFO": "/test", "REQUEST_METHOD": "POST"}
+        self.assertIsNone(path_dispatcher.get_application(environment))
@@ -5,8 +5,8 @@ from base64 import b64encode
 from unittest.mock import Mock, patch, MagicMock
 
 from spresso.model.authentication.identity_assertion import \
-    IdentityAssertionBase, IdentityAssertion
-from spresso.model.base import Composition
+    IdentityAssertionBase, IdentityAssertion, VerificationRecord, \
+    AssertionPayload, verify_batch
 from spresso.model.web.wsgi import WsgiRequest
 from spresso.utils.base import create_nonce, get_file_content
 from spresso.utils.crypto import encrypt_aes_gcm
@@ -18,7 +18,7 @@ class IdentityAssertionBaseTestCase(unittest.TestCase):
         settings = Mock()
         ia_base = IdentityAssertionBase(settings=settings)
 
-        for key in ia_base.template:
+        for key in ia_base.template.fields:
             for member in [ia_base.signature, ia_base.expected_signature]:
                 self.assertIn(key, member)
 
@@ -34,6 +34,7 @@ class IdentityAssertionBaseTestCase(unittest.TestCase):
         session.ia_key = ia_key
         public_key = "public key"
         session.idp_wk.public_key = public_key
+        session.idp_wk.signature_scheme = "EdDSA"
         settings = Mock()
         ia = IdentityAssertionBase(settings=settings)
         ia.from_session(session)
@@ -43,6 +44,7 @@ class IdentityAssertionBaseTestCase(unittest.TestCase):
         self.assertEqual(ia.forwarder_domain, forwarder_domain)
         self.assertEqual(ia.ia_key, ia_key)
         self.assertEqual(ia.public_key, public_key)
+        self.assertEqual(ia.signature_scheme, "EdDSA")
 
     def test_from_request(self):
         content_length = "42"
@@ -91,33 +93,32 @@ class IdentityAssertionTestCase(unittest.TestCase):
         self.fwd = "fwd.test"
         settings = Mock()
         settings.private_key = open(self.private_key_file, mode='rb').read()
+        settings.signer = None
 
         ia = IdentityAssertion(settings=settings)
         ia.tag = self.tag
         ia.email = self.email
         ia.forwarder_domain = self.fwd
-        ia.current_file = __file__
         self.signature = ia.sign()
 
-    @patch(
-        "spresso.model.authentication.identity_assertion.update_existing_keys")
     @patch("spresso.model.authentication.identity_assertion.create_signature")
     @patch("spresso.model.authentication.identity_assertion.to_b64")
-    def test_sign(self, b64_mock, create_signature_mock, update_mock):
+    def test_sign(self, b64_mock, create_signature_mock):
         settings = Mock()
         settings.private_key = "key"
+        settings.signer = None
 
         create_signature_mock.return_value = "signature"
         b64_mock.return_value = "signature_b64"
 
         ia = IdentityAssertion(settings=settings)
-        ia.signature.tag = "tag"
-        ia.signature.email = "email"
-        ia.signature.forwarder_domain = "fwd"
+        ia.tag = "tag"
+        ia.email = "email"
+        ia.forwarder_domain = "fwd"
 
         signature = ia.sign()
 
-        update_mock.assert_called_once_with(ia, ia.signature)
+        self.assertEqual(ia.signature.tag, "tag")
         create_signature_mock.assert_called_once_with(
             "key",
             json.dumps(
@@ -132,10 +133,51 @@ class IdentityAssertionTestCase(unittest.TestCase):
         b64_mock.assert_called_once_with("signature")
         self.assertEqual(signature, "signature_b64")
 
+        # Signer backend
+        settings.signer = Mock()
+        settings.signer.sign.return_value = "backend_signature"
+        create_signature_mock.reset_mock()
+
+        signature = ia.sign()
+
+        self.assertEqual(create_signature_mock.call_count, 0)
+        settings.signer.sign.assert_called_once_with(
+            "key",
+            json.dumps(
+                dict(
+                    tag="tag",
+                    email="email",
+                    forwarder_domain="fwd"
+                ),
+                sort_keys=True
+            ).encode('utf-8')
+        )
+        b64_mock.assert_called_with("backend_signature")
+
+        # Additional data, the fields of the assertion take precedence
+        settings.signer = None
+        ia.signature.update(dict(email="other", extension="data"))
+
+        ia.sign()
+
+        create_signature_mock.assert_called_once_with(
+            "key",
+            json.dumps(
+                dict(
+                    tag="tag",
+                    email="email",
+                    forwarder_domain="fwd",
+                    extension="data"
+                ),
+                sort_keys=True
+            ).encode('utf-8')
+        )
+
     def test_sign_error(self):
         # Parameter
         settings = Mock()
         settings.private_key = None
+        settings.signer = None
         ia = IdentityAssertion(settings=settings)
 
         self.assertRaises(InvalidSettings, ia.sign)
@@ -148,14 +190,15 @@ class IdentityAssertionTestCase(unittest.TestCase):
 
         self.assertRaises(ValueError, ia.sign)
 
-    @patch("spresso.model.authentication.identity_assertion.Composition")
+    @patch("spresso.model.authentication.identity_assertion."
+           "EncryptedAssertion")
     @patch("spresso.model.authentication.identity_assertion.from_b64")
     @patch("spresso.model.authentication.identity_assertion.decrypt_aes_gcm")
-    def test_decrypt(self, decrypt_mock, b64_mock, composition_mock):
+    def test_decrypt(self, decrypt_mock, b64_mock, eia_mock):
         eia = Mock()
         eia.iv = "iv"
         eia.ciphertext = "cipher"
-        composition_mock.return_value = eia
+        eia_mock.from_json.return_value = eia
         b64_mock.return_value = "0123456789" * 10
 
         settings = Mock()
@@ -167,8 +210,7 @@ class IdentityAssertionTestCase(unittest.TestCase):
 
         ia.decrypt(data)
 
-        self.assertEqual(composition_mock.call_count, 3)
-        eia.from_json.assert_called_once_with(data)
+        eia_mock.from_json.assert_called_once_with(data)
         self.assertEqual(b64_mock.call_count, 2)
         decrypt_mock.assert_called_once_with(
             "key",
@@ -202,18 +244,16 @@ class IdentityAssertionTestCase(unittest.TestCase):
 
         self.assertEqual(signature, signature_decrypted)
 
-    @patch("spresso.model.authentication.identity_assertion.Composition")
+    @patch("spresso.model.authentication.identity_assertion."
+           "AssertionSignature")
     @patch("spresso.model.authentication.identity_assertion.from_b64")
-    @patch(
-        "spresso.model.authentication.identity_assertion.update_existing_keys")
     @patch("spresso.model.authentication.identity_assertion.verify_signature")
-    def test_verify(self, verify_mock, update_mock, b64_mock, composition_mock):
+    def test_verify(self, verify_mock, b64_mock, signature_mock):
         settings = Mock()
         ia = IdentityAssertion(settings=settings)
-        expected_signature = MagicMock(spec=Composition)
-        expected_signature.tag = "tag"
-        expected_signature.email = "email"
-        expected_signature.forwarder_domain = "fwd"
+        expected_signature = MagicMock(spec=AssertionPayload)
+        expected_signature.fields = ()
+        expected_signature.values.return_value = ["tag", "email", "fwd"]
         expected_signature.to_json.return_value = "expected signature"
 
         ia.expected_signature = expected_signature
@@ -221,7 +261,7 @@ class IdentityAssertionTestCase(unittest.TestCase):
 
         ia_json = Mock()
         ia_json.ia_signature = "signature b64"
-        composition_mock.return_value = ia_json
+        signature_mock.from_json.return_value = ia_json
 
         b64_mock.return_value = "signature bytes"
 
@@ -229,14 +269,13 @@ class IdentityAssertionTestCase(unittest.TestCase):
 
         ia.verify(signature)
 
-        self.assertEqual(composition_mock.call_count, 3)
-        ia_json.from_json.assert_called_once_with("signature")
+        signature_mock.from_json.assert_called_once_with("signature")
         b64_mock.assert_called_once_with("signature b64", return_bytes=True)
-        update_mock.assert_called_once_with(ia, ia.expected_signature)
         verify_mock.assert_called_once_with(
             "key".encode('utf-8'),
             "signature bytes",
-            "expected signature".encode('utf-8')
+            "expected signature".encode('utf-8'),
+            scheme=None
         )
 
     def test_verify_functional(self):
@@ -250,6 +289,8 @@ class IdentityAssertionTestCase(unittest.TestCase):
         signature = b'{"ia_signature": "test"}'
 
         self.assertRaises(ValueError, ia.verify, signature)
+        for signature in [b'{}', b'["test"]']:
+            self.assertRaises(ValueError, ia.verify, signature)
 
         # Functionality
         signature = json.dumps({"ia_signature": self.signature}).encode('utf-8')
@@ -258,3 +299,37 @@ class IdentityAssertionTestCase(unittest.TestCase):
         ia.email = self.email
         ia.forwarder_domain = self.fwd
         ia.verify(signature)
+
+    def test_verify_batch(self):
+        public_key = get_file_content(self.public_key_file, "r")
+        expected = dict(tag=self.tag, email=self.email,
+                        forwarder_domain=self.fwd)
+        signature = json.dumps({"ia_signature": self.signature})
+        signature = signature.encode('utf-8')
+
+        records = [
+            VerificationRecord(expected, signature, public_key),
+            VerificationRecord(dict(expected, email="other@test.com"),
+                               signature, public_key),
+            VerificationRecord(expected, b'{"ia_signature": "test"}',
+                               public_key),
+            VerificationRecord(dict(tag=self.tag), signature, public_key),
+            VerificationRecord(expected, signature, "invalid key"),
+            VerificationRecord(expected, signature, public_key, "EdDSA"),
+            VerificationRecord(expected, signature, public_key, "RS256"),
+        ]
+
+        for workers in [0, 2]:
+            results = verify_batch(records, workers=workers)
+
+            self.assertEqual(
+                [result.valid for result in results],
+                [True, False, False, False, False, False, True]
+            )
+            self.assertIsNone(results[0].error)
+            self.assertEqual(
+                results[1].error,
+                "Signature verification failed"
+            )
+            for result in results[2:6]:
+                self.assertIsInstance(result.error, str)
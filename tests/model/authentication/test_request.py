@@ -1,8 +1,15 @@
+import asyncio
+import json
 import unittest
 
 from unittest.mock import Mock, patch
 
 from spresso.model.authentication.request import IdpInfoRequest
+from spresso.model.cache import Cache
+from spresso.model.request import AsyncHttpClient
+from spresso.model.settings import CachingSetting
+from spresso.utils.concurrency import SingleFlight
+from tests.model.test_request import AsyncIdpStandIn
 
 
 class IdpInfoRequestTestCase(unittest.TestCase):
@@ -18,6 +25,9 @@ class IdpInfoRequestTestCase(unittest.TestCase):
         settings.scheme_well_known_info = "scheme"
         settings.verify = "verify"
         settings.proxies = "proxies"
+        settings.http_client = "client"
+        settings.async_http_client = "async_client"
+        settings.info_flight = SingleFlight()
         request = Mock()
         request_mock.return_value = request
         idp_info_request = IdpInfoRequest(netloc, settings=settings)
@@ -25,7 +35,9 @@ class IdpInfoRequestTestCase(unittest.TestCase):
         settings.endpoints_ext.select.assert_called_once_with("netloc")
         select.get.assert_called_once_with("info")
         request_mock.assert_called_once_with("scheme", "netloc", "path",
-                                             "verify", "proxies")
+                                             "verify", "proxies",
+                                             client="client",
+                                             async_client="async_client")
 
         cache = Mock()
         cache.get.return_value = "cache"
@@ -43,6 +55,7 @@ class IdpInfoRequestTestCase(unittest.TestCase):
         cache.reset_mock()
         request.reset_mock()
         settings.reset_mock()
+        settings.info_flight = SingleFlight()
         res = idp_info_request.get_content()
         cache.get.assert_called_once_with("netloc")
         self.assertEqual(request.request.call_count, 1)
@@ -50,3 +63,49 @@ class IdpInfoRequestTestCase(unittest.TestCase):
         cache.set.assert_called_once_with("netloc", "config", "response")
 
         self.assertEqual(res, "response")
+
+    def test_aget_content(self):
+        settings = Mock()
+        endpoint = Mock()
+        endpoint.path = "/.well-known/spresso-info"
+        settings.endpoints_ext.select.return_value.get.return_value = endpoint
+        settings.scheme_well_known_info = "http"
+        settings.verify = True
+        settings.proxies = {}
+        settings.caching_settings.select.return_value = CachingSetting(
+            "default", True, 60
+        )
+        settings.cache = Cache(settings)
+        settings.info_flight = SingleFlight()
+        settings.async_http_client = AsyncHttpClient()
+
+        async def run():
+            stand_in = AsyncIdpStandIn()
+            stand_in.delay = 0.05
+            await stand_in.start()
+            try:
+                # Concurrent lookups share a single request
+                results = await asyncio.gather(*[
+                    IdpInfoRequest(
+                        stand_in.netloc,
+                        settings=settings
+                    ).aget_content()
+                    for _ in range(8)
+                ])
+                # Later lookups are answered from the shared cache
+                cached = IdpInfoRequest(
+                    stand_in.netloc,
+                    settings=settings
+                ).get_content()
+                await settings.async_http_client.aclose()
+            finally:
+                await stand_in.stop()
+            return stand_in, results, cached
+
+        stand_in, results, cached = asyncio.run(run())
+
+        self.assertEqual(stand_in.requests, 1)
+        for result in results:
+            self.assertEqual(json.loads(result), dict(public_key="key"))
+        self.assertEqual(cached, results[0])
+        self.assertEqual(settings.cache.stats["hits"], 1)
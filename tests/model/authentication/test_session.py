@@ -1,15 +1,38 @@
 import unittest
 from urllib.parse import quote
 
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
+
+from jsonschema import ValidationError
 
 from spresso.controller.grant.authentication.config.relying_party import \
     RelyingParty
+from spresso.model.authentication.json_schema import WellKnownInfoDefinition
 from spresso.model.authentication.session import Session
+from spresso.model.authentication.well_known_info import WellKnownInfo
 from spresso.model.base import User
+from spresso.utils.crypto import key_registry, register_signature_scheme, \
+    signature_schemes, SignatureScheme
 
 
 class SessionTestCase(unittest.TestCase):
+    def test_init(self):
+        session = Session(Mock(), Mock(), settings=Mock())
+        secrets = [
+            session.rp_nonce,
+            session.token,
+            session.ia_key,
+            session.tag_key,
+            session.tag_iv
+        ]
+
+        self.assertEqual([len(secret) for secret in secrets],
+                         [32, 32, 32, 32, 12])
+        self.assertEqual(len(set(secrets)), 5)
+
+        other = Session(Mock(), Mock(), settings=Mock())
+        self.assertNotEqual(other.token, session.token)
+
     @patch.object(Session, "_validate_well_known_info")
     @patch.object(Session, "_validate_user")
     @patch.object(Session, "_validate_settings")
@@ -83,22 +106,61 @@ class SessionTestCase(unittest.TestCase):
         self.assertEqual(session.padding, "padding")
         self.assertEqual(session.forwarder_domain, "fwd")
 
-    @patch("spresso.model.authentication.session.Composition")
-    def test_validate_well_known_info(self, composition_mock):
+    def test_validate_well_known_info(self):
         settings = Mock()
         user = Mock()
-        idp_info = "info"
-        composition = MagicMock()
-        composition_mock.return_value = composition
+        idp_info = '{"public_key": "public key", "other": 1}'
 
         session = Session(user, idp_info, settings=settings)
         schema = Mock()
-        schema.public_key = "key"
+        schema.public_key = "public_key"
+        schema.signature_scheme = "signature_scheme"
         session.schema = schema
 
         session._validate_well_known_info()
-        schema.validate.assert_called_once_with(composition)
-        self.assertEqual(session.idp_wk, composition)
+        schema.validate.assert_called_once_with(
+            {"public_key": "public key", "other": 1}
+        )
+        self.assertEqual(
+            session.idp_wk,
+            WellKnownInfo(public_key="public key")
+        )
+
+    def test_validate_well_known_info_scheme(self):
+        settings = Mock()
+        session = Session(Mock(), '{"public_key": "key"}', settings=settings)
+        session.schema = WellKnownInfoDefinition()
+
+        # Omitted by IdPs that only support RSA signatures
+        session._validate_well_known_info()
+        self.assertEqual(session.idp_wk.public_key, "key")
+        self.assertIsNone(session.idp_wk.signature_scheme)
+
+        session.idp_info = '{"public_key": "key", "signature_scheme": "EdDSA"}'
+        session._validate_well_known_info()
+        self.assertEqual(session.idp_wk.signature_scheme, "EdDSA")
+
+        session.idp_info = '{"public_key": "key", "signature_scheme": 1}'
+        self.assertRaises(
+            ValidationError,
+            session._validate_well_known_info
+        )
+
+        session.idp_info = '{"public_key": "key", "signature_scheme": "none"}'
+        self.assertRaises(
+            ValueError,
+            session._validate_well_known_info
+        )
+
+        # Registered schemes are accepted
+        scheme = SignatureScheme()
+        scheme.name = "none"
+        register_signature_scheme(scheme)
+        try:
+            session._validate_well_known_info()
+        finally:
+            del signature_schemes["none"]
+        self.assertEqual(session.idp_wk.signature_scheme, "none")
 
     @patch("spresso.model.authentication.session.to_b64")
     @patch.object(Session, "_create_tag")
@@ -153,6 +215,10 @@ class SessionTestCase(unittest.TestCase):
             )
         )
 
+        # The tag is encrypted once, its key and iv must not be reused
+        self.assertEqual(session.get_login_url(), login_url)
+        self.assertEqual(tag.encrypt.call_count, 1)
+
     @patch("spresso.model.authentication.session.Tag")
     def test_create_tag(self, tag_mock):
         settings = Mock()
@@ -202,3 +268,87 @@ class SessionTestCase(unittest.TestCase):
             "path"
         )
         self.assertEqual(ld_path, url)
+
+    def test_seal(self):
+        class SealingRelyingParty(RelyingParty):
+            session_key = b"k" * 32
+
+        settings = SealingRelyingParty("rp.test", "fwd.test")
+        idp_info = '{"public_key": "key"}'
+        session = Session(User("user@idp.test"), idp_info, settings=settings)
+        session.validate()
+        token_id = session.token
+
+        session.seal()
+        self.assertEqual(session.token_id, token_id)
+        self.assertNotEqual(session.token, token_id)
+
+        restored = Session.unseal(session.token, settings)
+        self.assertEqual(restored.user.email, "user@idp.test")
+        self.assertEqual(restored.token, session.token)
+        self.assertEqual(restored.token_id, token_id)
+        self.assertEqual(restored.expires, session.expires)
+        for name in ["rp_nonce", "ia_key", "tag_key", "tag_iv",
+                     "forwarder_domain", "tag_enc_json", "rp_origin"]:
+            self.assertEqual(getattr(restored, name), getattr(session, name))
+
+        # The tag sealed at the start of the login is reused
+        self.assertIn(quote(session.tag_enc_json), restored.get_login_url())
+
+        self.assertRaises(
+            ValueError,
+            restored.bind_well_known_info,
+            '{"public_key": "other"}'
+        )
+        restored.bind_well_known_info(idp_info)
+        self.assertEqual(restored.idp_wk.public_key, "key")
+
+        self.assertTrue(restored.consume())
+        self.assertFalse(Session.unseal(session.token, settings).consume())
+
+        self.assertRaises(
+            ValueError,
+            Session.unseal,
+            session.token[:-1],
+            settings
+        )
+
+    def test_to_bytes(self):
+        settings = RelyingParty("rp.test", "fwd.test")
+        idp_info = '{"public_key": "key", "signature_scheme": "EdDSA"}'
+        session = Session(User("user@idp.test"), idp_info, settings=settings)
+        session.validate()
+        session.padding = False
+
+        # Saved before the redirect, the tag is not encrypted yet
+        data = session.to_bytes()
+        restored = Session.from_bytes(data, settings)
+        self.assertIs(restored.settings, settings)
+        self.assertIsNone(restored.tag_enc_json)
+        self.assertIsNone(restored.idp_info)
+        self.assertEqual(restored.user.email, "user@idp.test")
+        for name in ["rp_nonce", "token", "ia_key", "tag_key", "tag_iv",
+                     "forwarder_domain", "padding", "rp_origin",
+                     "idp_wk"]:
+            self.assertEqual(getattr(restored, name), getattr(session, name))
+
+        session.get_login_url()
+        restored = Session.from_bytes(memoryview(session.to_bytes()),
+                                      settings)
+        self.assertEqual(restored.tag_enc_json, session.tag_enc_json)
+        self.assertEqual(restored.to_bytes(), session.to_bytes())
+
+        # Only the per-login state is stored
+        self.assertLess(len(data), 300)
+
+        data = session.to_bytes(key_digest=True)
+        restored = Session.from_bytes(data, settings)
+        self.assertFalse(hasattr(restored, "idp_wk"))
+        self.assertEqual(restored.idp_key_digest,
+                         key_registry.digest(b"key"))
+
+        for invalid in [
+            b"", data[:-1], data + b"\x00", b"\x02" + data[1:]
+        ]:
+            self.assertRaises(ValueError, Session.from_bytes, invalid,
+                              settings)
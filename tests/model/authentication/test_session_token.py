@@ -0,0 +1,65 @@
+import unittest
+
+from unittest.mock import Mock, patch
+
+from spresso.model.authentication.session_token import SessionSealer, HEADER
+
+
+class SessionSealerTestCase(unittest.TestCase):
+    def test_seal(self):
+        sealer = SessionSealer(Mock(), b"k" * 32, lifetime=60)
+        token, expires = sealer.seal(b"state")
+        self.assertEqual(sealer.unseal(token), (expires, b"state"))
+
+        # The state is encrypted, every token uses a fresh iv
+        self.assertNotIn(b"state", token)
+        other, _ = sealer.seal(b"state")
+        self.assertNotEqual(other, token)
+
+    def test_unseal_invalid(self):
+        sealer = SessionSealer(Mock(), b"k" * 32)
+        token, expires = sealer.seal(b"state")
+
+        tampered = bytearray(token)
+        tampered[-20] ^= 1
+        # The header is authenticated as well
+        extended = HEADER.pack(1, expires + 60) + token[HEADER.size:]
+        unsupported = HEADER.pack(2, expires) + token[HEADER.size:]
+        foreign, _ = SessionSealer(Mock(), b"o" * 32).seal(b"s")
+
+        for invalid in [
+            b"", token[:36], bytes(tampered), extended, unsupported, foreign
+        ]:
+            self.assertRaises(ValueError, sealer.unseal, invalid)
+
+    @patch("spresso.model.authentication.session_token.time")
+    def test_unseal_expired(self, time_mock):
+        time_mock.time.return_value = 1000
+        sealer = SessionSealer(Mock(), b"k" * 32, lifetime=60)
+        token, expires = sealer.seal(b"state")
+        self.assertEqual(expires, 1060)
+
+        time_mock.time.return_value = 1059.9
+        sealer.unseal(token)
+
+        time_mock.time.return_value = 1060
+        self.assertRaises(ValueError, sealer.unseal, token)
+
+    def test_consume(self):
+        sealer = SessionSealer(Mock(), b"k" * 32)
+        _, expires = sealer.seal(b"state")
+        token_id = b"i" * 32
+
+        self.assertTrue(sealer.consume(token_id, expires))
+        self.assertFalse(sealer.consume(token_id, expires))
+
+        # Consumed tokens may be shared by a custom store
+        sealer.consumed = Mock()
+        sealer.consumed.consume.return_value = True
+        self.assertTrue(sealer.consume(token_id, expires))
+        sealer.consumed.consume.assert_called_once_with(token_id, expires)
+
+    def test_key(self):
+        for key in [b"k" * 16, b"k" * 24, b"k" * 32]:
+            SessionSealer(Mock(), key)
+        self.assertRaises(ValueError, SessionSealer, Mock(), b"k" * 20)
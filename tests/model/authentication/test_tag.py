@@ -2,60 +2,61 @@ import json
 import unittest
 from base64 import b64encode, b64decode
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
-from spresso.model.authentication.tag import Tag, TagBase
-from spresso.model.base import Composition
+from spresso.model.authentication.tag import Tag, TagBase, TagPayload
 from spresso.utils.base import create_nonce
 from spresso.utils.crypto import decrypt_aes_gcm
 
 
 class TagBaseTestCase(unittest.TestCase):
     def test_init(self):
-        tag_base = TagBase("", "", "", "")
+        tag_base = TagBase("origin", "nonce", "key", "iv")
 
-        for key in tag_base.template:
-            self.assertIn(key, tag_base.tag)
+        self.assertEqual(tag_base.template.fields, ("rp_nonce", "rp_origin"))
+        self.assertEqual(
+            [tag_base.rp_origin, tag_base.rp_nonce, tag_base.key, tag_base.iv],
+            ["origin", "nonce", "key", "iv"]
+        )
 
 
 class TagTestCase(unittest.TestCase):
-    @patch("spresso.model.authentication.tag.update_existing_keys")
-    @patch("spresso.model.authentication.tag.Composition")
+    @patch("spresso.model.authentication.tag.EncryptedTag")
     @patch("spresso.model.authentication.tag.to_b64")
     @patch("spresso.model.authentication.tag.create_random_characters")
     @patch("spresso.model.authentication.tag.encrypt_aes_gcm")
     def test_encrypt(self, encrypt_mock, random_char_mock, b64_mock,
-                     composition_mock, update_mock):
+                     encrypted_tag_mock):
         rp_nonce = "nonce"
         rp_origin = "origin"
         key = "key"
         iv = "iv"
 
         tag = Tag(rp_origin, rp_nonce, key, iv)
-        _tag = MagicMock(spec=Composition)
-        _tag.rp_nonce = "nonce"
-        _tag.rp_origin = "origin"
-        _tag.to_json.return_value = "tag json"
-        tag.tag = _tag
 
         b64_mock.return_value = "b64"
         random_char_mock.return_value = "random_choice"
         encrypt_mock.return_value = ("cipher", "tag")
-        composition_mock.return_value = "return"
+        encrypted_tag_mock.return_value = "return"
 
         tag_return = tag.encrypt()
 
         self.assertEqual(b64_mock.call_count, 3)
         random_char_mock.assert_called_once_with((256 - len("origin")) - 1)
-        update_mock.assert_called_once_with(tag, tag.tag)
         encrypt_mock.assert_called_once_with(
             "key",
             "iv",
-            "tag json".encode('utf-8')
+            TagPayload(
+                rp_nonce="b64",
+                rp_origin="origin=random_choice"
+            ).to_json().encode('utf-8')
         )
-        composition_mock.assert_called_with(iv="b64", ciphertext="b64")
+        encrypted_tag_mock.assert_called_with(iv="b64", ciphertext="b64")
         self.assertEqual(tag_return, "return")
 
+        # The tag is not modified, it may be encrypted again
+        self.assertEqual([tag.rp_origin, tag.rp_nonce], ["origin", "nonce"])
+
     def test_encrypt_functional(self):
         # Parameter
         rp_nonce = None
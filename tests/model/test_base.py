@@ -1,9 +1,19 @@
 import json
+import random
 import unittest
 from json import JSONDecodeError
 from unittest.mock import patch, Mock
 
-from spresso.model.base import Composition, User, JsonSchema, Origin
+from jsonschema import ValidationError, SchemaError
+
+from spresso.model.authentication.identity_assertion import \
+    AssertionPayload, AssertionSignature, EncryptedAssertion
+from spresso.model.authentication.json_schema import \
+    WellKnownInfoDefinition, IdentityAssertionDefinition
+from spresso.model.authentication.tag import EncryptedTag, TagPayload
+from spresso.model.authentication.well_known_info import WellKnownInfo
+from spresso.model.base import Composition, User, JsonSchema, Origin, \
+    Record, ExtensibleRecord, CanonicalEncoder
 from spresso.utils.base import get_url
 
 
@@ -37,19 +47,160 @@ class CompositionTestCase(unittest.TestCase):
         self.assertEqual(c.key, "test")
 
 
+class Payload(Record):
+    __slots__ = fields = ("b", "a")
+
+
+class ExtensiblePayload(ExtensibleRecord):
+    __slots__ = fields = ("b", "a")
+
+
+def random_string(rng):
+    # Escapes, non-ASCII, astral and lone surrogate characters
+    alphabet = "ab\"\\/\n\t\x00\x7f\u00e4\u2028\ud800\U0001f600"
+    return "".join(rng.choice(alphabet) for _ in range(rng.randrange(8)))
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(8 if depth < 2 else 6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.choice([True, False])
+    if kind == 2:
+        return rng.randint(-2 ** 70, 2 ** 70)
+    if kind == 3:
+        return rng.choice([0.1, -1e300, 2.5, float("inf"), float("nan")])
+    if kind in [4, 5]:
+        return random_string(rng)
+    if kind == 6:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(3))]
+    return {
+        random_string(rng): random_value(rng, depth + 1)
+        for _ in range(rng.randrange(3))
+    }
+
+
+class RecordTestCase(unittest.TestCase):
+    def test_init(self):
+        record = Payload(a=1)
+        self.assertEqual(record.a, 1)
+        self.assertIsNone(record.b)
+        self.assertEqual(record.items(), [("b", None), ("a", 1)])
+        self.assertEqual(record, Payload({"a": 1}))
+        self.assertNotEqual(record, Payload(a=2))
+        self.assertFalse(hasattr(record, "__dict__"))
+
+        self.assertRaises(KeyError, Payload, c=1)
+        self.assertRaises(KeyError, record.__getitem__, "c")
+        self.assertRaises(AttributeError, setattr, record, "c", 1)
+
+    def test_to_json(self):
+        record = Payload(a="\u00e4", b=[1, {"y": 2, "x": None}])
+        self.assertEqual(
+            record.to_json(),
+            Composition(record.items()).to_json()
+        )
+
+    def test_to_json_canonical(self):
+        # Property: the compiled encoder matches the generic one
+        rng = random.Random(0)
+        for record_class in [
+            Payload, ExtensiblePayload, TagPayload, EncryptedTag,
+            AssertionPayload, EncryptedAssertion, AssertionSignature,
+            WellKnownInfo
+        ]:
+            self.assertIsInstance(record_class.encoder, CanonicalEncoder)
+            for _ in range(300):
+                record = record_class()
+                for name in record_class.fields:
+                    record[name] = random_value(rng)
+                self.assertEqual(
+                    record.to_json(),
+                    json.dumps(record.to_dict(), sort_keys=True)
+                )
+                self.assertEqual(
+                    record.to_json(),
+                    Composition(record.items()).to_json()
+                )
+
+    def test_from_json(self):
+        record = Payload.from_json('{"a": 1, "c": 2}')
+        self.assertEqual(record.to_dict(), dict(a=1, b=None))
+
+        for invalid in ["[]", "1", "json fail"]:
+            self.assertRaises(ValueError, Payload.from_json, invalid)
+
+    def test_extensible(self):
+        record = ExtensiblePayload(a=1, c=3)
+        record.update(dict(b=2, d=4))
+        self.assertEqual(record.extra, dict(c=3, d=4))
+        self.assertEqual(record["c"], 3)
+        self.assertIn("d", record)
+        self.assertEqual(len(record), 4)
+        self.assertEqual(sorted(record), ["a", "b", "c", "d"])
+        self.assertEqual(
+            record.to_json(),
+            json.dumps(dict(a=1, b=2, c=3, d=4), sort_keys=True)
+        )
+
+        # Extra items never shadow a field
+        record.extra["a"] = "extra"
+        self.assertEqual(record.to_dict()["a"], 1)
+
+        # Records without extra items share no dict
+        first, second = ExtensiblePayload(), ExtensiblePayload()
+        first.extra["c"] = 3
+        self.assertEqual(second.extra, {})
+        self.assertEqual(ExtensiblePayload().to_dict(), dict(a=None, b=None))
+
+
 class JsonSchemaTestCase(unittest.TestCase):
-    @patch("spresso.model.base.validate")
+    def setUp(self):
+        JsonSchema._validators.clear()
+
+    def tearDown(self):
+        JsonSchema._validators.clear()
+
     @patch("spresso.model.base.get_resource")
-    @patch("spresso.model.base.json")
-    def test_validate(self, json_mock, get_resource_mock, validate_mock):
+    def test_validate(self, get_resource_mock):
         json_schema = JsonSchema()
-        data = ""
-        json_mock.loads.return_value = "schema"
-        get_resource_mock.return_value = "resource"
-        json_schema.validate(data)
+        get_resource_mock.return_value = json.dumps({
+            "type": "object",
+            "properties": {"key": {"type": "string"}},
+            "required": ["key"]
+        })
+
+        json_schema.validate({"key": "value"})
+        self.assertRaises(ValidationError, json_schema.validate, {})
+        self.assertRaises(ValidationError, json_schema.validate, {"key": 1})
+
+        # The schema is loaded and compiled once
+        JsonSchema().validate({"key": "value"})
+        get_resource_mock.assert_called_once_with("resources/", "")
+
+    @patch("spresso.model.base.get_resource")
+    def test_validator(self, get_resource_mock):
+        get_resource_mock.return_value = json.dumps({"type": "invalid"})
+        self.assertRaises(SchemaError, getattr, JsonSchema(), "validator")
+
+        get_resource_mock.return_value = json.dumps({"type": "object"})
+        validator = JsonSchema().validator
+        self.assertIs(JsonSchema().validator, validator)
+        self.assertEqual(validator.schema, {"type": "object"})
 
-        json_mock.loads.assert_called_once_with("resource")
-        validate_mock.assert_called_once_with(data, "schema")
+    def test_definitions(self):
+        WellKnownInfoDefinition().validate({"public_key": "key"})
+        self.assertRaises(
+            ValidationError,
+            WellKnownInfoDefinition().validate,
+            {"ia_signature": "signature"}
+        )
+        IdentityAssertionDefinition().validate({"ia_signature": "signature"})
+        self.assertIsNot(
+            WellKnownInfoDefinition().validator,
+            IdentityAssertionDefinition().validator
+        )
 
     @patch("spresso.model.base.get_resource")
     def test_get_schema(self, resource_mock):
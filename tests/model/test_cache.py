@@ -1,9 +1,11 @@
 import os
+import time
 import unittest
 
 from unittest.mock import patch, Mock
 
-from spresso.model.cache import CacheEntry, Cache
+from spresso.model.cache import CacheEntry, Cache, VerificationCache, \
+    ConsumedTokenCache
 from spresso.model.settings import CachingSetting
 
 
@@ -65,7 +67,7 @@ class CacheEntryTestCase(unittest.TestCase):
 class CacheTestCase(unittest.TestCase):
     @patch("spresso.model.cache.CacheEntry")
     def test_set(self, cache_entry_mock):
-        entry = Mock()
+        entry = Mock(size=4, expires=time.time() + 50)
         cache_entry_mock.return_value = entry
         settings = Mock()
 
@@ -95,3 +97,159 @@ class CacheTestCase(unittest.TestCase):
         cache.cache.update(dict(id=entry))
         self.assertEqual(cache.get("id"), "test")
         self.assertEqual(entry.get_data.call_count, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_instances(self):
+        cache = Cache(settings=Mock())
+        other_cache = Cache(settings=Mock())
+        cache.set("id", CachingSetting("default", True, 50), "test")
+        self.assertIsNone(other_cache.get("id"))
+
+    def test_replace(self):
+        cache = Cache(settings=Mock())
+        settings = CachingSetting("default", False, 50)
+        cache.set("id", settings, "first")
+        data_file = cache.cache["id"].data_file
+
+        cache.set("id", settings, "second")
+        self.assertFalse(os.path.isfile(data_file))
+        self.assertEqual(cache.get("id"), "second")
+        self.assertEqual(cache.size, 6)
+        self.assertEqual(len(cache.cache), 1)
+        cache.flush()
+
+    @patch("spresso.model.cache.time")
+    def test_expire(self, time_mock):
+        time_mock.time.return_value = 100
+        cache = Cache(settings=Mock())
+        cache.set("short", CachingSetting("default", False, 10), "short")
+        cache.set("long", CachingSetting("default", True, 50), "long")
+        data_file = cache.cache["short"].data_file
+
+        time_mock.time.return_value = 110
+        self.assertIsNone(cache.get("short"))
+        self.assertNotIn("short", cache.cache)
+        self.assertFalse(os.path.isfile(data_file))
+        self.assertEqual(cache.get("long"), "long")
+        self.assertEqual(cache.expirations, 1)
+        self.assertEqual(cache.size, 4)
+
+        time_mock.time.return_value = 150
+        self.assertIsNone(cache.get("long"))
+        self.assertEqual(cache.expirations, 2)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache.stats, dict(
+            entries=0,
+            size=0,
+            hits=1,
+            misses=2,
+            expirations=2,
+            evictions=0
+        ))
+
+    def test_evict_entries(self):
+        cache = Cache(settings=Mock(), max_entries=2)
+        settings = CachingSetting("default", False, 50)
+        cache.set("first", settings, "first")
+        cache.set("second", settings, "second")
+        data_file = cache.cache["first"].data_file
+
+        # Mark 'first' as recently used
+        cache.get("first")
+        cache.set("third", settings, "third")
+
+        self.assertEqual(list(cache.cache.keys()), ["first", "third"])
+        self.assertEqual(cache.evictions, 1)
+
+        cache.get("first")
+        cache.set("fourth", settings, "fourth")
+        self.assertEqual(list(cache.cache.keys()), ["first", "fourth"])
+
+        cache.flush()
+        self.assertFalse(os.path.isfile(data_file))
+        self.assertEqual(cache.size, 0)
+
+    def test_evict_size(self):
+        cache = Cache(settings=Mock(), max_size=8)
+        settings = CachingSetting("default", True, 50)
+        cache.set("first", settings, "1234")
+        cache.set("second", settings, "5678")
+        self.assertEqual(cache.size, 8)
+
+        cache.set("third", settings, "9")
+        self.assertNotIn("first", cache.cache)
+        self.assertEqual(cache.size, 5)
+
+        cache.set("large", settings, "123456789")
+        self.assertNotIn("large", cache.cache)
+        self.assertEqual(cache.evictions, 2)
+
+
+class VerificationCacheTestCase(unittest.TestCase):
+    def test_digest(self):
+        digest = VerificationCache.digest(b"token", "eia", dict(a=1, b=2))
+        self.assertEqual(
+            digest,
+            VerificationCache.digest(b"token", "eia", dict(b=2, a=1))
+        )
+        for other in [
+            VerificationCache.digest(b"other", "eia", dict(a=1, b=2)),
+            VerificationCache.digest(b"token", "other", dict(a=1, b=2)),
+            VerificationCache.digest(b"token", "eia", dict(a=1)),
+            VerificationCache.digest(b"toke", "neia", dict(a=1, b=2)),
+        ]:
+            self.assertNotEqual(digest, other)
+
+    def test_lookup(self):
+        cache = VerificationCache(Mock(), lifetime=60)
+        self.assertIsNone(cache.lookup("handle", b"token"))
+
+        cache.store("handle", b"token")
+        self.assertEqual(
+            cache.lookup("handle", b"token"),
+            dict(token="dG9rZW4=", error=None, message=None)
+        )
+
+        cache.store("failed", b"token", error="invalid_eia",
+                    message=ValueError("message"))
+        outcome = cache.lookup("failed", b"token")
+        self.assertEqual(outcome["error"], "invalid_eia")
+        self.assertEqual(outcome["message"], "message")
+
+        # The session token was rotated
+        self.assertIsNone(cache.lookup("handle", b"rotated"))
+        self.assertNotIn("handle", cache.cache)
+        self.assertIsNone(cache.lookup("handle", b"token"))
+
+    @patch("spresso.model.cache.time")
+    def test_lifetime(self, time_mock):
+        time_mock.time.return_value = 100
+        cache = VerificationCache(Mock(), lifetime=5)
+        cache.store("handle", b"token")
+
+        time_mock.time.return_value = 105
+        self.assertIsNone(cache.lookup("handle", b"token"))
+
+
+class ConsumedTokenCacheTestCase(unittest.TestCase):
+    @patch("spresso.model.cache.time")
+    def test_consume(self, time_mock):
+        time_mock.time.return_value = 100
+        cache = ConsumedTokenCache(Mock(), max_entries=2)
+
+        self.assertTrue(cache.consume(b"token", 110))
+        self.assertFalse(cache.consume(b"token", 110))
+        self.assertFalse(cache.consume(b"expired", 100))
+
+        # Live entries are never evicted
+        self.assertTrue(cache.consume(b"other", 120))
+        self.assertFalse(cache.consume(b"third", 120))
+        self.assertIn("dG9rZW4=", cache.cache)
+
+        # Entries are kept until their token expired
+        time_mock.time.return_value = 109.5
+        self.assertFalse(cache.consume(b"token", 110))
+        time_mock.time.return_value = 110
+        self.assertTrue(cache.consume(b"third", 120))
+        self.assertNotIn("dG9rZW4=", cache.cache)
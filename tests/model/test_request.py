@@ -1,8 +1,18 @@
+import asyncio
+import json
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from unittest.mock import patch, Mock
 
-from spresso.model.request import GetRequest
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from spresso.model.request import GetRequest, HttpClient, \
+    AsyncHttpClient, proxy_mounts
 from spresso.utils.error import SpressoInvalidError
 
 
@@ -44,3 +54,312 @@ class GetRequestTestCase(unittest.TestCase):
             proxies=proxies
         )
         self.assertEqual(response, res)
+
+        client = Mock()
+        client.get.return_value = res
+        get_request = GetRequest(scheme, netloc, path, verify, proxies,
+                                 client=client)
+        requests_mock.reset_mock()
+
+        response = get_request.request()
+        self.assertEqual(requests_mock.get.call_count, 0)
+        client.get.assert_called_once_with(
+            url="url",
+            verify=verify,
+            proxies=proxies
+        )
+        self.assertEqual(response, res)
+
+
+class IdpStandIn(BaseHTTPRequestHandler):
+    """
+        Local stand-in for the well known info endpoint of an IdP.
+    """
+    protocol_version = "HTTP/1.1"
+    info = json.dumps(dict(public_key="key")).encode('utf-8')
+
+    def do_GET(self):
+        self.server.ports.add(self.client_address[1])
+
+        if self.path == "/.well-known/spresso-info":
+            self.reply(200, self.info)
+        elif self.path == "/unavailable":
+            self.server.unavailable += 1
+            status = 503 if self.server.unavailable < 3 else 200
+            self.reply(status, self.info)
+        elif self.path == "/slow":
+            self.server.release.wait(5)
+            self.reply(200, self.info)
+        else:
+            self.reply(404, b"")
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), IdpStandIn)
+        self.server.ports = set()
+        self.server.unavailable = 0
+        self.server.release = threading.Event()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.netloc = "127.0.0.1:{}".format(self.server.server_port)
+
+    def tearDown(self):
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(self, client, path):
+        return GetRequest("http", self.netloc, path, True, {},
+                          client=client).request()
+
+    def test_keep_alive(self):
+        client = HttpClient()
+
+        for _ in range(5):
+            response = self.request(client, "/.well-known/spresso-info")
+            self.assertEqual(json.loads(response.text), dict(public_key="key"))
+
+        # All requests were sent over the same connection
+        self.assertEqual(len(self.server.ports), 1)
+        client.close()
+
+    def test_retry(self):
+        client = HttpClient(retries=2, backoff_factor=0)
+        response = self.request(client, "/unavailable")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.unavailable, 3)
+
+        self.server.unavailable = 0
+        client = HttpClient(retries=1, backoff_factor=0)
+        self.assertRaises(SpressoInvalidError, self.request, client,
+                          "/unavailable")
+
+        self.assertRaises(SpressoInvalidError, self.request, client,
+                          "/missing")
+        client.close()
+
+    def test_timeout(self):
+        client = HttpClient(timeout=(1, 0.2), retries=0)
+        self.assertRaises(SpressoInvalidError, self.request, client, "/slow")
+        client.close()
+
+
+class AsyncIdpStandIn(object):
+    """
+        Local asyncio stand-in for the well known info endpoint of an IdP,
+        speaking just enough HTTP/1.1 for keep-alive connections.
+    """
+    info = IdpStandIn.info
+
+    def __init__(self):
+        self.server = None
+        self.connections = 0
+        self.requests = 0
+        self.unavailable = 0
+        self.delay = 0
+
+    @property
+    def netloc(self):
+        return "127.0.0.1:{}".format(self.server.sockets[0].getsockname()[1])
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self.handle, "127.0.0.1", 0
+        )
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+
+                self.requests += 1
+                path = request_line.split()[1].decode('latin-1')
+                await asyncio.sleep(self.delay)
+                status, body = self.route(path)
+                writer.write(
+                    "HTTP/1.1 {0} Status\r\n"
+                    "Content-Type: application/json\r\n"
+                    "Content-Length: {1}\r\n\r\n".format(
+                        status, len(body)
+                    ).encode('latin-1') + body
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def route(self, path):
+        if path == "/.well-known/spresso-info":
+            return 200, self.info
+        if path == "/unavailable":
+            self.unavailable += 1
+            return (503 if self.unavailable < 3 else 200), self.info
+        return 404, b""
+
+
+class AsyncHttpClientTestCase(unittest.TestCase):
+    def run_with_stand_in(self, function):
+        async def run():
+            stand_in = AsyncIdpStandIn()
+            await stand_in.start()
+            try:
+                return await function(stand_in)
+            finally:
+                await stand_in.stop()
+
+        return asyncio.run(run())
+
+    @unittest.skipUnless(httpx, "requires the optional 'httpx' package")
+    def test_keep_alive(self):
+        client = AsyncHttpClient()
+
+        async def function(stand_in):
+            responses = []
+            for _ in range(5):
+                responses.append(await GetRequest(
+                    "http", stand_in.netloc, "/.well-known/spresso-info",
+                    True, {}, async_client=client
+                ).request_async())
+            await client.aclose()
+            return stand_in, responses
+
+        stand_in, responses = self.run_with_stand_in(function)
+        for response in responses:
+            self.assertEqual(json.loads(response.text), dict(public_key="key"))
+
+        # All requests were sent over the same connection
+        self.assertEqual(stand_in.connections, 1)
+        self.assertEqual(client._clients, {})
+
+    @unittest.skipUnless(httpx, "requires the optional 'httpx' package")
+    def test_retry(self):
+        async def function(stand_in):
+            client = AsyncHttpClient(retries=2, backoff_factor=0)
+            response = await GetRequest(
+                "http", stand_in.netloc, "/unavailable", True, {},
+                async_client=client
+            ).request_async()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(stand_in.unavailable, 3)
+
+            stand_in.unavailable = 0
+            client = AsyncHttpClient(retries=1, backoff_factor=0)
+            for path in ["/unavailable", "/missing"]:
+                with self.assertRaises(SpressoInvalidError):
+                    await GetRequest(
+                        "http", stand_in.netloc, path, True, {},
+                        async_client=client
+                    ).request_async()
+            await client.aclose()
+
+        self.run_with_stand_in(function)
+
+    @unittest.skipUnless(httpx, "requires the optional 'httpx' package")
+    def test_timeout(self):
+        async def function(stand_in):
+            stand_in.delay = 1
+            client = AsyncHttpClient(timeout=(1, 0.2), retries=0)
+            with self.assertRaises(SpressoInvalidError):
+                await GetRequest(
+                    "http", stand_in.netloc, "/.well-known/spresso-info",
+                    True, {}, async_client=client
+                ).request_async()
+            await client.aclose()
+
+        self.run_with_stand_in(function)
+
+    @unittest.skipUnless(httpx, "requires the optional 'httpx' package")
+    def test_proxies(self):
+        self.assertEqual(
+            proxy_mounts([
+                ("all", "http://proxy:1"),
+                ("http://host", "http://proxy:2"),
+                ("https", None),
+                ("no_proxy", "direct.org, .sub.org")
+            ]),
+            {
+                "all://": "http://proxy:1",
+                "http://host": "http://proxy:2",
+                "https://": None,
+                "all://*direct.org": None,
+                "all://*sub.org": None
+            }
+        )
+
+        async def function():
+            client = AsyncHttpClient()
+            http_client = client._client(True, {
+                "all": "http://proxy:1",
+                "http://host": "http://proxy:2",
+                "no_proxy": "direct.org"
+            })
+            transports = [
+                http_client._transport_for_url(httpx.URL(url))
+                for url in ["http://host/", "https://other/",
+                            "http://www.direct.org/"]
+            ]
+            await client.aclose()
+            return http_client, transports
+
+        http_client, transports = asyncio.run(function())
+        self.assertEqual(transports[0]._pool._proxy_url.port, 2)
+        self.assertEqual(transports[1]._pool._proxy_url.port, 1)
+        self.assertIs(transports[2], http_client._transport)
+
+    @unittest.skipUnless(httpx, "requires the optional 'httpx' package")
+    def test_close(self):
+        client = AsyncHttpClient()
+
+        async def function():
+            http_client = client._client(True, {})
+            # Closed on the running loop
+            client.close()
+            await asyncio.sleep(0.05)
+            return http_client
+
+        self.assertTrue(asyncio.run(function()).is_closed)
+        self.assertEqual(client._clients, {})
+
+        async def open_pool():
+            return client._client(True, {})
+
+        http_client = asyncio.run(open_pool())
+        # Pools of loops that are not running are dropped
+        client.close()
+        self.assertEqual(client._clients, {})
+        self.assertFalse(http_client.is_closed)
+
+    @patch("spresso.model.request.httpx", None)
+    def test_fallback(self):
+        client = AsyncHttpClient()
+        self.assertFalse(client.available)
+
+        get_request = GetRequest("http", "netloc", "/path", True, {},
+                                 async_client=client)
+        get_request.request = Mock(return_value="response")
+
+        response = asyncio.run(get_request.request_async())
+        self.assertEqual(response, "response")
+        self.assertEqual(get_request.request.call_count, 1)
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+
+from spresso.model.web.asgi import AsgiRequest
+from spresso.utils.error import PayloadTooLargeError
+
+
+def receive_from(*messages):
+    messages = list(messages)
+
+    async def receive():
+        return messages.pop(0)
+
+    return receive
+
+
+class AsgiRequestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/login",
+            "query_string": b"foo=bar&empty=",
+            "headers": [
+                (b"content-type", b"application/x-www-form-urlencoded"),
+                (b"origin", b"https://example.com"),
+                (b"cookie", b"session=abc"),
+                (b"cookie", b"other=def"),
+            ]
+        }
+
+    def test_init(self):
+        request = AsgiRequest(self.scope)
+
+        self.assertEqual(request.method, "POST")
+        self.assertEqual(request.path, "/login")
+        self.assertEqual(request.get_param("foo"), "bar")
+        self.assertIsNone(request.get_param("empty"))
+        self.assertEqual(request.get_param("na", default=0), 0)
+
+        self.assertEqual(request.header("Origin"), "https://example.com")
+        self.assertEqual(request.header("ORIGIN"), "https://example.com")
+        self.assertIsNone(request.header("unknown"))
+
+        self.assertEqual(request.cookies, dict(session="abc", other="def"))
+        self.assertEqual(request.get_cookie("session"), "abc")
+        self.assertIsNone(request.get_cookie("unknown"))
+
+        request = AsgiRequest(dict(self.scope, headers=[]))
+        self.assertEqual(request.cookies, {})
+
+    def test_read_body(self):
+        request = AsgiRequest(self.scope)
+        receive = receive_from(
+            {"type": "http.request", "body": b"email=a%40b.c&",
+             "more_body": True},
+            {"type": "http.request", "body": b"tag=tag", "more_body": False}
+        )
+        asyncio.run(request.read_body(receive))
+
+        self.assertEqual(request.body, b"email=a%40b.c&tag=tag")
+        self.assertEqual(request.post_param("email"), "a@b.c")
+        self.assertEqual(request.post_param("tag"), "tag")
+        self.assertIsNone(request.post_param("na"))
+
+        request = AsgiRequest(dict(self.scope, headers=[]))
+        receive = receive_from({"type": "http.request", "body": b"tag=tag"})
+        asyncio.run(request.read_body(receive))
+        self.assertIsNone(request.post_param("tag"))
+
+        request = AsgiRequest(self.scope)
+        asyncio.run(request.read_body(
+            receive_from({"type": "http.disconnect"})
+        ))
+        self.assertEqual(request.body, b"")
+
+        # Bodies are read up to a limit
+        request = AsgiRequest(self.scope)
+        receive = receive_from(
+            {"type": "http.request", "body": b"email=a%40b.c&",
+             "more_body": True},
+            {"type": "http.request", "body": b"tag=tag", "more_body": False}
+        )
+        self.assertRaises(PayloadTooLargeError, asyncio.run,
+                          request.read_body(receive, max_body_size=16))
+
+        request = AsgiRequest(dict(self.scope, headers=[
+            (b"content-length", b"17")
+        ]))
+        receive = Mock()
+        self.assertRaises(PayloadTooLargeError, asyncio.run,
+                          request.read_body(receive, max_body_size=16))
+        receive.assert_not_called()
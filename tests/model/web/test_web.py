@@ -1,8 +1,8 @@
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from spresso.model.web.base import Response
-from spresso.model.web.wsgi import WsgiRequest
+from spresso.model.web.wsgi import WsgiRequest, content_length
 
 
 class WsgiRequestTestCase(unittest.TestCase):
@@ -39,11 +39,47 @@ class WsgiRequestTestCase(unittest.TestCase):
 
         request = WsgiRequest(environment)
 
-        wsgi_input_mock.read.assert_called_with(int(content_length))
+        # The body is read on first access only
+        wsgi_input_mock.read.assert_not_called()
         self.assertEqual(request.method, request_method)
         self.assertEqual(request.query_params, {})
         self.assertEqual(request.query_string, query_string)
         self.assertEqual(request.post_params, {"foo": "bar", "baz": "buz"})
+        self.assertEqual(request.post_param("foo"), "bar")
+        wsgi_input_mock.read.assert_called_once_with(int(content_length))
+
+    def test_post_params_without_form(self):
+        wsgi_input_mock = Mock(spec=["read"])
+        environment = {"REQUEST_METHOD": "POST",
+                       "QUERY_STRING": "",
+                       "PATH_INFO": "/",
+                       "wsgi.input": wsgi_input_mock}
+
+        for headers in [
+            {},
+            {"CONTENT_TYPE": "application/json", "CONTENT_LENGTH": "2"},
+            {"CONTENT_TYPE": "application/x-www-form-urlencoded",
+             "CONTENT_LENGTH": ""},
+        ]:
+            wsgi_input_mock.read.return_value = b""
+            request = WsgiRequest(dict(environment, **headers))
+            self.assertEqual(request.post_params, {})
+
+        wsgi_input_mock.read.assert_called_once_with(0)
+
+    def test_query_params_lazy(self):
+        environment = {"REQUEST_METHOD": "GET",
+                       "QUERY_STRING": "foo=bar",
+                       "PATH_INFO": "/"}
+
+        with patch("spresso.model.web.wsgi.parse_qs") as parse_qs_mock:
+            parse_qs_mock.return_value = {"foo": ["bar"]}
+            request = WsgiRequest(environment)
+            parse_qs_mock.assert_not_called()
+
+            self.assertEqual(request.get_param("foo"), "bar")
+            self.assertEqual(request.get_param("foo"), "bar")
+            parse_qs_mock.assert_called_once_with("foo=bar")
 
     def test_get_param(self):
         request_method = "TEST"
@@ -95,11 +131,13 @@ class WsgiRequestTestCase(unittest.TestCase):
         environment = {"REQUEST_METHOD": "GET",
                        "QUERY_STRING": "",
                        "PATH_INFO": "/",
-                       "HTTP_AUTHORIZATION": "Basic abcd"}
+                       "HTTP_AUTHORIZATION": "Basic abcd",
+                       "HTTP_IF_NONE_MATCH": "etag"}
 
         request = WsgiRequest(env=environment)
 
         self.assertEqual(request.header("authorization"), "Basic abcd")
+        self.assertEqual(request.header("If-None-Match"), "etag")
         self.assertIsNone(request.header("unknown"))
         self.assertEqual(request.header("unknown", default=0), 0)
 
@@ -116,6 +154,8 @@ class WsgiRequestTestCase(unittest.TestCase):
         self.assertIn('key', request.cookies)
         self.assertEqual(request.get_cookie('key'), 'value')
         self.assertEqual(request.get_cookie('test'), None)
+        # The header is parsed once per request
+        self.assertIs(request.cookies, request.cookies)
 
         del environment["HTTP_COOKIE"]
         request = WsgiRequest(env=environment)
@@ -123,6 +163,14 @@ class WsgiRequestTestCase(unittest.TestCase):
         self.assertEqual(request.cookies, {})
 
 
+class ContentLengthTestCase(unittest.TestCase):
+    def test_content_length(self):
+        self.assertEqual(content_length({"CONTENT_LENGTH": "42"}), 42)
+        for invalid in ["", "-1", "abc"]:
+            self.assertEqual(content_length({"CONTENT_LENGTH": invalid}), 0)
+        self.assertEqual(content_length({}), 0)
+
+
 class ResponseTestCase(unittest.TestCase):
     def test_header(self):
         response = Response()
@@ -1,5 +1,6 @@
 import os
 import string
+import threading
 import unittest
 from base64 import b64encode
 
@@ -7,7 +8,7 @@ from unittest.mock import patch
 
 from spresso.utils.base import get_file_content, update_existing_keys, \
     get_url, to_b64, from_b64, create_nonce, \
-    create_random_characters, get_resource
+    create_random_characters, get_resource, RandomPool, random_pool
 
 
 class UtilsTestCase(unittest.TestCase):
@@ -33,6 +34,39 @@ class UtilsTestCase(unittest.TestCase):
         for c in random_chars:
             self.assertIn(c, chars)
 
+    def test_create_random_characters_rejection(self):
+        chars = string.ascii_uppercase + string.digits
+
+        with patch("spresso.utils.base.random_pool") as pool_mock:
+            pool_mock.read.return_value = bytes(range(256))
+            random_chars = create_random_characters(252, chars=chars)
+
+        # Bytes from 252 on would favour the first characters
+        self.assertEqual(random_chars, chars * 7)
+
+        self.assertEqual(create_random_characters(0), "")
+        self.assertRaises(ValueError, create_random_characters, 1, chars="")
+
+        # Alphabets that do not fit a byte fall back to SystemRandom
+        for alphabet in ["\u00e4\u00f6\u00fc", "ab" * 200]:
+            random_chars = create_random_characters(50, chars=alphabet)
+            self.assertEqual(len(random_chars), 50)
+            self.assertTrue(set(random_chars) <= set(alphabet))
+
+    def test_create_random_characters_uniformity(self):
+        chars = string.ascii_uppercase + string.digits
+        samples = 360000
+        random_chars = create_random_characters(samples, chars=chars)
+
+        # Chi-squared test, the critical value of 35 degrees of freedom at
+        # a significance level of 0.0001 is 74.9
+        expected = samples / len(chars)
+        chi_squared = sum(
+            (random_chars.count(c) - expected) ** 2 / expected
+            for c in chars
+        )
+        self.assertLess(chi_squared, 74.9)
+
     def test_get_file_content(self):
         mode = "w"
         rel_path = "test"
@@ -115,3 +149,86 @@ class UtilsTestCase(unittest.TestCase):
             "spresso",
             "resource/path"
         )
+
+
+class RandomPoolTestCase(unittest.TestCase):
+    @patch("spresso.utils.base.os.urandom")
+    def test_read(self, urandom_mock):
+        urandom_mock.side_effect = lambda length: bytes(range(length))
+        pool = RandomPool(chunk_size=64)
+
+        # A chunk is split into requests of the same length
+        self.assertEqual(pool.read(10), bytes(range(10)))
+        self.assertEqual(pool.read(10), bytes(range(10, 20)))
+        urandom_mock.assert_called_once_with(60)
+
+        self.assertEqual(pool.read(16), bytes(range(16)))
+        urandom_mock.assert_called_with(64)
+        for _ in range(3):
+            pool.read(16)
+        self.assertEqual(pool.read(16), bytes(range(16)))
+        self.assertEqual(urandom_mock.call_count, 3)
+
+        # Large requests bypass the pool
+        self.assertEqual(pool.read(32), bytes(range(32)))
+        urandom_mock.assert_called_with(32)
+        self.assertEqual(pool.read(16), bytes(range(16, 32)))
+        self.assertEqual(pool.read(10), bytes(range(20, 30)))
+
+    def test_threads(self):
+        pool = RandomPool(chunk_size=1024)
+        nonces = []
+
+        def worker():
+            nonces.extend(pool.read(16) for _ in range(500))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(nonces)), 4000)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_fork(self):
+        # Fill the pool of the parent
+        random_pool.read(16)
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.write(write_fd, random_pool.read(16))
+            os._exit(0)
+
+        os.close(write_fd)
+        child_nonce = os.read(read_fd, 16)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        # The child discarded the bytes the parent hands out next
+        self.assertEqual(len(child_nonce), 16)
+        self.assertNotEqual(child_nonce, random_pool.read(16))
+
+    @patch("spresso.utils.base._check_pid", True)
+    @patch("spresso.utils.base.os.getpid")
+    def test_pid_change(self, getpid_mock):
+        # Fallback for platforms without os.register_at_fork
+        getpid_mock.return_value = 1
+        pool = RandomPool()
+        pool.read(16)
+        queues = pool._queues
+
+        getpid_mock.return_value = 2
+        pool.read(16)
+        self.assertIsNot(pool._queues, queues)
+
+    @patch("spresso.utils.base.os.getpid")
+    def test_no_pid_check(self, getpid_mock):
+        pool = RandomPool()
+        getpid_mock.reset_mock()
+        pool.read(16)
+        pool.read(16)
+        if hasattr(os, "register_at_fork"):
+            getpid_mock.assert_not_called()
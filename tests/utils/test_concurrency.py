@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import unittest
+
+from unittest.mock import Mock
+
+from spresso.utils.concurrency import SingleFlight
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_do(self):
+        flight = SingleFlight()
+        function = Mock(return_value="result")
+
+        self.assertEqual(flight.do("key", function), "result")
+        self.assertEqual(flight.do("key", function), "result")
+        self.assertEqual(function.call_count, 2)
+
+        function.side_effect = ValueError
+        self.assertRaises(ValueError, flight.do, "key", function)
+        self.assertEqual(flight._calls, {})
+
+    def test_do_concurrent(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+
+        def worker():
+            results.append(flight.do("key", function))
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait(5)
+
+        followers = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in followers:
+            thread.start()
+
+        # Other keys are not blocked by the call in flight
+        self.assertEqual(flight.do("other", lambda: "other"), "other")
+
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 9)
+
+    def test_do_concurrent_error(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def function():
+            started.set()
+            release.wait(5)
+            raise ValueError("failed")
+
+        def worker():
+            try:
+                flight.do("key", function)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(errors), 4)
+
+    def test_do_async(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def function():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError
+
+        async def run():
+            results = await asyncio.gather(
+                *[flight.do_async("key", function) for _ in range(8)]
+            )
+            errors = await asyncio.gather(
+                *[flight.do_async("key", failing) for _ in range(4)],
+                return_exceptions=True
+            )
+            return results, errors
+
+        results, errors = asyncio.run(run())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(len(errors), 4)
+        for error in errors:
+            self.assertIsInstance(error, ValueError)
+        self.assertEqual(flight._futures, {})
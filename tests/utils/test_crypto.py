@@ -1,10 +1,17 @@
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from unittest.mock import patch, Mock
 
 from spresso.utils.base import create_nonce, get_file_content
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
 from spresso.utils.crypto import encrypt_aes_gcm, decrypt_aes_gcm, \
-    create_signature, verify_signature
+    create_signature, verify_signature, KeyRegistry, key_registry, \
+    signature_schemes, signature_scheme_for, aes_gcm, verify_signatures
 
 
 class CryptoTestCase(unittest.TestCase):
@@ -12,28 +19,11 @@ class CryptoTestCase(unittest.TestCase):
     The OpenSSL module is required for this test to work.
     """
 
-    @patch("spresso.utils.crypto.Cipher")
-    @patch("spresso.utils.crypto.algorithms")
-    @patch("spresso.utils.crypto.modes")
-    @patch("spresso.utils.crypto.default_backend")
-    def test_encrypt_aes_gcm(self, backend_mock, modes_mock, algorithms_mock,
-                             cipher_mock):
-        encryptor_mock = Mock()
-        encryptor_mock.update.return_value = "update"
-        encryptor_mock.finalize.return_value = "finalize"
-        encryptor_mock.tag = "tag"
-        cipher = Mock()
-        cipher.encryptor.return_value = encryptor_mock
-        cipher_mock.return_value = cipher
-
-        algorithm = "aes"
-        algorithms_mock.AES.return_value = algorithm
-
-        mode = "gcm"
-        modes_mock.GCM.return_value = mode
-
-        backend = "backend"
-        backend_mock.return_value = backend
+    @patch("spresso.utils.crypto.AESGCM")
+    def test_encrypt_aes_gcm(self, aesgcm_mock):
+        aead = Mock()
+        aead.encrypt.return_value = b"cipher text" + b"t" * 16
+        aesgcm_mock.return_value = aead
 
         key = "key"
         iv = "iv"
@@ -42,42 +32,19 @@ class CryptoTestCase(unittest.TestCase):
 
         encrypted = encrypt_aes_gcm(key, iv, plaintext, associated_data)
 
-        algorithms_mock.AES.assert_called_once_with(key)
-        modes_mock.GCM.assert_called_once_with(iv)
-        self.assertEqual(backend_mock.call_count, 1)
+        aesgcm_mock.assert_called_once_with(key)
+        aead.encrypt.assert_called_once_with(iv, plaintext, associated_data)
+        self.assertEqual(encrypted, (b"cipher text", b"t" * 16))
 
-        cipher_mock.assert_called_once_with(algorithm, mode, backend=backend)
+        # Secret keys are not cached
+        encrypt_aes_gcm(key, iv, plaintext, associated_data)
+        self.assertEqual(aesgcm_mock.call_count, 2)
 
-        encryptor_mock.authenticate_additional_data.assert_called_once_with(
-            associated_data
-        )
-        encryptor_mock.update.assert_called_once_with(plaintext)
-        self.assertEqual(encryptor_mock.finalize.call_count, 1)
-
-        self.assertEqual(encrypted, ("update" + "finalize", "tag"))
-
-    @patch("spresso.utils.crypto.Cipher")
-    @patch("spresso.utils.crypto.algorithms")
-    @patch("spresso.utils.crypto.modes")
-    @patch("spresso.utils.crypto.default_backend")
-    def test_decrypt_aes_gcm(self, backend_mock, modes_mock, algorithms_mock,
-                             cipher_mock):
-        decryptor_mock = Mock()
-        decryptor_mock.update.return_value = "update"
-        decryptor_mock.finalize.return_value = "finalize"
-        decryptor_mock.tag = "tag"
-        cipher = Mock()
-        cipher.decryptor.return_value = decryptor_mock
-        cipher_mock.return_value = cipher
-
-        algorithm = "aes"
-        algorithms_mock.AES.return_value = algorithm
-
-        mode = "gcm"
-        modes_mock.GCM.return_value = mode
-
-        backend = "backend"
-        backend_mock.return_value = backend
+    @patch("spresso.utils.crypto.AESGCM")
+    def test_decrypt_aes_gcm(self, aesgcm_mock):
+        aead = Mock()
+        aead.decrypt.return_value = "plaintext"
+        aesgcm_mock.return_value = aead
 
         key = "key"
         iv = "iv"
@@ -88,31 +55,71 @@ class CryptoTestCase(unittest.TestCase):
         decrypted = decrypt_aes_gcm(key, iv, auth_tag, cipher_text,
                                     associated_data)
 
-        algorithms_mock.AES.assert_called_once_with(key)
-        modes_mock.GCM.assert_called_once_with(iv, auth_tag)
-        self.assertEqual(backend_mock.call_count, 1)
-
-        cipher_mock.assert_called_once_with(algorithm, mode, backend=backend)
-
-        decryptor_mock.authenticate_additional_data.assert_called_once_with(
+        aesgcm_mock.assert_called_once_with(key)
+        aead.decrypt.assert_called_once_with(
+            iv,
+            cipher_text + auth_tag,
             associated_data
         )
-        decryptor_mock.update.assert_called_once_with(cipher_text)
-        self.assertEqual(decryptor_mock.finalize.call_count, 1)
+        self.assertEqual(decrypted, "plaintext")
+
+    def test_aes_gcm_object(self):
+        key = b"k" * 32
+        iv = b"i" * 12
+        cipher = aes_gcm(key)
+        # AEAD objects of long-lived keys are passed instead of the key
+        self.assertIs(aes_gcm(cipher), cipher)
+
+        cipher_text, auth_tag = encrypt_aes_gcm(cipher, iv, b"text")
+        self.assertEqual(
+            (cipher_text, auth_tag),
+            encrypt_aes_gcm(key, iv, b"text")
+        )
+        self.assertEqual(
+            decrypt_aes_gcm(cipher, iv, auth_tag, cipher_text),
+            b"text"
+        )
 
-        self.assertEqual(decrypted, ("update" + "finalize"))
+    def test_aes_gcm_compatibility(self):
+        key = create_nonce(32)
+        iv = create_nonce(12)
+        plaintext = b"text" * 20
 
+        # Output of the streaming Cipher interface used before
+        encryptor = Cipher(algorithms.AES(key), modes.GCM(iv)).encryptor()
+        encryptor.authenticate_additional_data(b"data")
+        cipher_text = encryptor.update(plaintext) + encryptor.finalize()
+
+        self.assertEqual(
+            encrypt_aes_gcm(key, iv, plaintext, b"data"),
+            (cipher_text, encryptor.tag)
+        )
+        self.assertEqual(
+            decrypt_aes_gcm(key, iv, encryptor.tag, cipher_text, b"data"),
+            plaintext
+        )
+        self.assertRaises(
+            InvalidTag,
+            decrypt_aes_gcm,
+            key,
+            iv,
+            encryptor.tag,
+            cipher_text,
+            b"other"
+        )
+
+    @patch("spresso.utils.crypto.signature_scheme_for")
     @patch("spresso.utils.crypto.serialization")
     @patch("spresso.utils.crypto.padding")
     @patch("spresso.utils.crypto.hashes")
     @patch("spresso.utils.crypto.default_backend")
     def test_create_signature(self, backend_mock, hashes_mock, padding_mock,
-                              serialization_mock):
-        signer_mock = Mock()
-        signer_mock.finalize.return_value = "signature"
+                              serialization_mock, scheme_mock):
+        key_registry.invalidate()
+        scheme_mock.return_value = signature_schemes["RS256"]
 
         private_key_mock = Mock()
-        private_key_mock.signer.return_value = signer_mock
+        private_key_mock.sign.return_value = "signature"
         serialization_mock.load_pem_private_key.return_value = private_key_mock
 
         padding = "pkcs1"
@@ -135,24 +142,20 @@ class CryptoTestCase(unittest.TestCase):
             backend=backend
         )
 
-        private_key_mock.signer.assert_called_once_with(
-            padding,
-            hash
-        )
-        signer_mock.update.assert_called_once_with(data)
-        self.assertEqual(signer_mock.finalize.call_count, 1)
+        private_key_mock.sign.assert_called_once_with(data, padding, hash)
         self.assertEqual(signature, "signature")
 
+    @patch("spresso.utils.crypto.signature_scheme_for")
     @patch("spresso.utils.crypto.serialization")
     @patch("spresso.utils.crypto.padding")
     @patch("spresso.utils.crypto.hashes")
     @patch("spresso.utils.crypto.default_backend")
     def test_verify_signature(self, backend_mock, hashes_mock, padding_mock,
-                              serialization_mock):
-        verifier_mock = Mock()
+                              serialization_mock, scheme_mock):
+        key_registry.invalidate()
+        scheme_mock.return_value = signature_schemes["RS256"]
 
         public_key_mock = Mock()
-        public_key_mock.verifier.return_value = verifier_mock
         serialization_mock.load_pem_public_key.return_value = public_key_mock
 
         padding = "pkcs1"
@@ -175,13 +178,12 @@ class CryptoTestCase(unittest.TestCase):
             backend=backend
         )
 
-        public_key_mock.verifier.assert_called_once_with(
+        public_key_mock.verify.assert_called_once_with(
             signature,
+            data,
             padding,
             hash
         )
-        verifier_mock.update.assert_called_once_with(data)
-        self.assertEqual(verifier_mock.verify.call_count, 1)
 
     def test_aes_gcm(self):
         key = create_nonce(32)
@@ -207,3 +209,183 @@ class CryptoTestCase(unittest.TestCase):
 
         # This will raise an exception if the signature verification fails
         verify_signature(pub_key, signature, data)
+
+
+def generate_key_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem
+
+
+class SignatureSchemeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.key_pairs = dict(
+            ES256=generate_key_pair(ec.generate_private_key(ec.SECP256R1())),
+            EdDSA=generate_key_pair(ed25519.Ed25519PrivateKey.generate())
+        )
+
+    def test_signature(self):
+        data = b"test"
+
+        for name, (private_pem, public_pem) in self.key_pairs.items():
+            signature = create_signature(private_pem, data)
+            verify_signature(public_pem, signature, data)
+            verify_signature(public_pem, signature, data, scheme=name)
+
+            self.assertRaises(
+                InvalidSignature,
+                verify_signature,
+                public_pem,
+                signature,
+                b"other"
+            )
+            # The expected scheme has to match the key type
+            self.assertRaises(
+                ValueError,
+                verify_signature,
+                public_pem,
+                signature,
+                data,
+                scheme="RS256"
+            )
+
+    def test_signature_scheme_for(self):
+        for name, (private_pem, public_pem) in self.key_pairs.items():
+            for key in [
+                key_registry.private_key(private_pem),
+                key_registry.public_key(public_pem)
+            ]:
+                self.assertEqual(signature_scheme_for(key).name, name)
+
+        public_key = key_registry.public_key(
+            get_file_content("test_pub_key.pem", "rb")
+        )
+        self.assertEqual(signature_scheme_for(public_key).name, "RS256")
+
+        # Only the P-256 curve is supported
+        other_curve = ec.generate_private_key(ec.SECP384R1())
+        self.assertRaises(ValueError, signature_scheme_for, other_curve)
+        self.assertRaises(ValueError, signature_scheme_for, "key")
+
+    def test_verify_signatures(self):
+        data = b"test"
+        items = []
+        expected = []
+        for name, (private_pem, public_pem) in self.key_pairs.items():
+            signature = create_signature(private_pem, data)
+            items += [
+                (public_pem, signature, data, None),
+                (public_pem, signature, b"other", None),
+                (public_pem, signature, data, name),
+                (public_pem, signature, data, "RS256"),
+            ]
+            expected += [True, False, True, False]
+        items.append((b"invalid key", b"signature", data, None))
+        expected.append(False)
+
+        for kwargs in [
+            dict(workers=0),
+            dict(workers=2, chunk_size=2),
+            dict(executor=ThreadPoolExecutor(2), chunk_size=3),
+        ]:
+            results = verify_signatures(iter(items), **kwargs)
+            self.assertEqual(
+                [result is None for result in results],
+                expected
+            )
+            self.assertEqual(results[1], "Signature verification failed")
+            self.assertTrue(results[-1].startswith("Invalid public key"))
+
+        self.assertEqual(verify_signatures([]), [])
+
+        # Pools are not forked, their workers load the keys on start
+        with patch("spresso.utils.crypto.ProcessPoolExecutor",
+                   wraps=ProcessPoolExecutor) as pool_mock:
+            verify_signatures(items, workers=2, chunk_size=2)
+        kwargs = pool_mock.call_args[1]
+        self.assertIn(kwargs["mp_context"].get_start_method(),
+                      ["forkserver", "spawn"])
+        self.assertEqual(
+            kwargs["initargs"],
+            (tuple(dict.fromkeys(item[0] for item in items)),)
+        )
+
+
+class KeyRegistryTestCase(unittest.TestCase):
+    def test_init(self):
+        self.assertRaises(ValueError, KeyRegistry, 0)
+        self.assertRaises(ValueError, KeyRegistry, "1")
+
+        registry = KeyRegistry(max_size=4)
+        self.assertEqual(registry.max_size, 4)
+        self.assertEqual(len(registry), 0)
+
+    def test_digest(self):
+        self.assertEqual(
+            KeyRegistry.digest("key"),
+            KeyRegistry.digest(b"key")
+        )
+        self.assertNotEqual(
+            KeyRegistry.digest(b"key"),
+            KeyRegistry.digest(b"other key")
+        )
+
+    @patch("spresso.utils.crypto.load_public_key")
+    @patch("spresso.utils.crypto.load_private_key")
+    def test_get(self, private_mock, public_mock):
+        private_mock.return_value = "private key"
+        public_mock.return_value = "public key"
+        registry = KeyRegistry()
+
+        self.assertEqual(registry.private_key(b"pem"), "private key")
+        self.assertEqual(registry.private_key(b"pem"), "private key")
+        private_mock.assert_called_once_with(b"pem")
+
+        self.assertEqual(registry.public_key(b"pem"), "public key")
+        self.assertEqual(registry.public_key(b"pem"), "public key")
+        public_mock.assert_called_once_with(b"pem")
+
+        self.assertIn(b"pem", registry)
+        self.assertNotIn(b"other", registry)
+        self.assertEqual(len(registry), 2)
+
+    @patch("spresso.utils.crypto.load_private_key")
+    def test_eviction(self, private_mock):
+        private_mock.side_effect = lambda pem: Mock()
+        registry = KeyRegistry(max_size=2)
+
+        registry.private_key(b"first")
+        registry.private_key(b"second")
+        # Mark 'first' as recently used
+        registry.private_key(b"first")
+        registry.private_key(b"third")
+
+        self.assertEqual(len(registry), 2)
+        self.assertIn(b"first", registry)
+        self.assertNotIn(b"second", registry)
+        self.assertIn(b"third", registry)
+
+    @patch("spresso.utils.crypto.load_public_key")
+    @patch("spresso.utils.crypto.load_private_key")
+    def test_invalidate(self, private_mock, public_mock):
+        registry = KeyRegistry()
+        registry.private_key(b"first")
+        registry.public_key(b"first")
+        registry.private_key(b"second")
+
+        registry.invalidate(b"first")
+        self.assertNotIn(b"first", registry)
+        self.assertIn(b"second", registry)
+
+        registry.private_key(b"first")
+        self.assertEqual(private_mock.call_count, 3)
+
+        registry.invalidate()
+        self.assertEqual(len(registry), 0)
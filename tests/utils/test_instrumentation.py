@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import Mock, call, patch
+
+from spresso.utils.instrumentation import Histogram, HistogramCollector, \
+    Instrumentation, Observer
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    @patch("spresso.utils.instrumentation.time")
+    def test_measure(self, time_mock):
+        time_mock.perf_counter.side_effect = [1.0, 1.5, 2.0, 2.25]
+        instrumentation = Instrumentation()
+        observer = Mock(spec=Observer)
+        instrumentation.add_observer(observer)
+
+        with instrumentation.measure("section", label="value"):
+            observer.started.assert_called_once_with(
+                "section",
+                dict(label="value")
+            )
+        observer.finished.assert_called_once_with(
+            "section",
+            dict(label="value"),
+            0.5,
+            None
+        )
+
+        # Errors are reported and propagated
+        error = ValueError()
+        with self.assertRaises(ValueError):
+            with instrumentation.measure("section"):
+                raise error
+        self.assertEqual(
+            observer.finished.call_args,
+            call("section", {}, 0.25, error)
+        )
+
+    def test_observers(self):
+        instrumentation = Instrumentation()
+        # Nothing is measured without observers
+        self.assertIs(
+            instrumentation.measure("a"),
+            instrumentation.measure("b")
+        )
+
+        failing = Mock(spec=Observer)
+        failing.finished.side_effect = RuntimeError
+        observer = Mock(spec=Observer)
+        instrumentation.add_observer(failing)
+        instrumentation.add_observer(observer)
+
+        # Failing observers do not affect the section or other observers
+        with instrumentation.measure("section"):
+            pass
+        self.assertEqual(observer.finished.call_count, 1)
+
+        instrumentation.remove_observer(failing)
+        self.assertEqual(instrumentation.observers, (observer,))
+
+    def test_instrument(self):
+        instrumentation = Instrumentation()
+        collector = HistogramCollector()
+        instrumentation.add_observer(collector)
+
+        @instrumentation.instrument("function")
+        def function(a, b=0):
+            """Docstring"""
+            return a + b
+
+        self.assertEqual(function(1, b=2), 3)
+        self.assertEqual(function.__doc__, "Docstring")
+        self.assertEqual(collector.histogram("function").count, 1)
+
+
+class HistogramTestCase(unittest.TestCase):
+    def test_observe(self):
+        histogram = Histogram([0.1, 1.0])
+        for duration in [0.05, 0.1, 0.5, 0.7, 3.0]:
+            histogram.observe(duration)
+        histogram.observe(0.2, error=True)
+
+        self.assertEqual(histogram.counts, [2, 3, 1])
+        self.assertEqual(histogram.count, 6)
+        self.assertEqual(histogram.errors, 1)
+        self.assertAlmostEqual(histogram.mean, 4.55 / 6)
+        self.assertEqual(histogram.max, 3.0)
+
+        self.assertEqual(histogram.quantile(0.3), 0.1)
+        self.assertEqual(histogram.quantile(0.5), 1.0)
+        # The overflow bucket is bounded by the maximum
+        self.assertEqual(histogram.quantile(0.99), 3.0)
+
+        self.assertEqual(Histogram([1.0]).quantile(0.5), 0.0)
+        self.assertEqual(Histogram([1.0]).mean, 0.0)
+
+
+class HistogramCollectorTestCase(unittest.TestCase):
+    def test_collect(self):
+        collector = HistogramCollector(bounds=[0.001, 0.01])
+        collector.finished("dispatch", dict(handler="A"), 0.0005, None)
+        collector.finished("dispatch", dict(handler="A"), 0.005, ValueError())
+        collector.finished("dispatch", dict(handler="B"), 0.0005, None)
+
+        histogram = collector.histogram("dispatch", handler="A")
+        self.assertEqual(histogram.count, 2)
+        self.assertEqual(histogram.errors, 1)
+        self.assertIsNone(collector.histogram("dispatch"))
+
+        snapshot = collector.snapshot()
+        self.assertEqual(
+            [(entry["labels"], entry["count"]) for entry in snapshot],
+            [(dict(handler="A"), 2), (dict(handler="B"), 1)]
+        )
+        self.assertEqual(snapshot[0]["p50"], 0.001)
+        self.assertEqual(snapshot[0]["p99"], 0.005)
+        self.assertGreater(snapshot[0]["rate"], 0)
+
+        collector.reset()
+        self.assertEqual(collector.snapshot(), [])
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+import unittest
+
+from unittest.mock import patch
+
+from spresso.utils.error import SignerUnavailable
+from spresso.utils.signer import InlineSigner, ProcessPoolSigner
+
+
+def echo(private_key, data):
+    return private_key + data + str(os.getpid()).encode('utf-8')
+
+
+def slow(private_key, data):
+    time.sleep(float(data))
+    return data
+
+
+class EchoSigner(ProcessPoolSigner):
+    function = staticmethod(echo)
+
+
+class SlowSigner(ProcessPoolSigner):
+    function = staticmethod(slow)
+
+
+class InlineSignerTestCase(unittest.TestCase):
+    @patch("spresso.utils.signer.create_signature")
+    def test_sign(self, create_signature_mock):
+        create_signature_mock.return_value = "signature"
+
+        signer = InlineSigner()
+        self.assertEqual(signer.sign("key", "data"), "signature")
+        create_signature_mock.assert_called_once_with("key", "data")
+        signer.close()
+
+
+class ProcessPoolSignerTestCase(unittest.TestCase):
+    def test_sign(self):
+        with EchoSigner(workers=2) as signer:
+            self.assertEqual(signer.max_pending, 8)
+            signature = signer.sign(b"key", b"data")
+
+        # Signed in a worker process
+        self.assertTrue(signature.startswith(b"keydata"))
+        self.assertNotEqual(signature[7:], str(os.getpid()).encode('utf-8'))
+
+        self.assertRaises(SignerUnavailable, signer.sign, b"key", b"data")
+
+    def test_defaults(self):
+        with EchoSigner(workers=1, private_keys=[None]) as signer:
+            # Workers are not forked from the threaded caller
+            self.assertIn(
+                signer._executor._mp_context.get_start_method(),
+                ["forkserver", "spawn"]
+            )
+            self.assertRaises(SignerUnavailable, signer.sign, None, b"data")
+            self.assertTrue(signer.sign(b"key", b"data"))
+
+    def test_timeout(self):
+        with SlowSigner(workers=1, timeout=0.2) as signer:
+            self.assertRaises(SignerUnavailable, signer.sign, b"", b"1")
+            self.assertEqual(signer.sign(b"", b"0", timeout=5), b"0")
+
+    def test_bounded_queue(self):
+        with SlowSigner(workers=1, max_pending=1) as signer:
+            thread = threading.Thread(
+                target=signer.sign,
+                args=(b"", b"0.5")
+            )
+            thread.start()
+            time.sleep(0.1)
+
+            # The only slot is taken by the running call
+            self.assertRaises(
+                SignerUnavailable,
+                signer.sign,
+                b"",
+                b"0",
+                timeout=0.1
+            )
+            thread.join()
+            self.assertEqual(signer.sign(b"", b"0"), b"0")
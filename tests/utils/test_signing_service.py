@@ -0,0 +1,215 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from spresso.utils.base import get_file_content
+from spresso.utils.error import SignerUnavailable
+from spresso.utils.signer import ProcessPoolSigner
+from spresso.utils.signing_service import SigningServer, SocketSigner, \
+    HEADER, OP_SIGN, MAX_PAYLOAD, STATUS_OK
+
+
+def slow_pid(private_key, data):
+    time.sleep(float(data))
+    return str(os.getpid()).encode('utf-8')
+
+
+class SlowPidSigner(ProcessPoolSigner):
+    function = staticmethod(slow_pid)
+
+
+class FakeSigner(object):
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def sign(self, private_key, data, timeout=None):
+        self.started.set()
+        self.release.wait(5)
+        if data == b"fail":
+            raise ValueError("failed")
+        return b"signed:" + data
+
+
+class SignBatchTestCase(unittest.TestCase):
+    def test_parallel(self):
+        with SlowPidSigner(workers=2) as signer:
+            server = SigningServer(
+                "unused.sock",
+                get_file_content("test_priv_key.pem", "rb"),
+                signer=signer
+            )
+            # Start both workers
+            server.sign_batch([(0, OP_SIGN, b"0.1"), (1, OP_SIGN, b"0.1")])
+
+            start = time.monotonic()
+            results = server.sign_batch([
+                (index, OP_SIGN, b"0.3") for index in range(4)
+            ])
+            duration = time.monotonic() - start
+
+        self.assertEqual([status for _, status, _ in results],
+                         [STATUS_OK] * 4)
+        # The batch is spread over the workers instead of signed in turn
+        self.assertEqual(len({pid for _, _, pid in results}), 2)
+        self.assertLess(duration, 1.0)
+
+
+class SigningServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "signer.sock")
+        self.signer = FakeSigner()
+        self.server = SigningServer(
+            self.path,
+            get_file_content("test_priv_key.pem", "rb"),
+            signer=self.signer
+        )
+
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(
+            self.server.stop(),
+            self.loop
+        ).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.directory.cleanup()
+
+    def test_sign(self):
+        client = SocketSigner(self.path)
+        self.assertEqual(client.sign(None, b"data"), b"signed:data")
+        self.assertRaises(SignerUnavailable, client.sign, None, b"fail")
+
+        # The connection is reused
+        self.assertEqual(client.sign(None, b"more"), b"signed:more")
+        client.close()
+
+        self.assertEqual(self.server.stats["signatures"], 2)
+        self.assertEqual(self.server.stats["errors"], 1)
+
+    def test_pipelining(self):
+        client = SocketSigner(self.path)
+        results = {}
+
+        def worker(index):
+            data = str(index).encode('utf-8')
+            results[index] = client.sign(None, data)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(32)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        client.close()
+
+        self.assertEqual(len(results), 32)
+        for index, signature in results.items():
+            self.assertEqual(
+                signature,
+                b"signed:" + str(index).encode('utf-8')
+            )
+
+    def test_batching(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+
+        # Hold the first request until the others are queued
+        self.signer.release.clear()
+        sock.sendall(HEADER.pack(1, OP_SIGN, 1) + b"1")
+        self.signer.started.wait(5)
+
+        sock.sendall(b"".join(
+            HEADER.pack(index, OP_SIGN, 1) + str(index).encode('utf-8')
+            for index in range(2, 6)
+        ))
+        time.sleep(0.1)
+        self.signer.release.set()
+
+        expected = b"".join(
+            HEADER.pack(index, 0, 8) + b"signed:" + str(index).encode('utf-8')
+            for index in range(1, 6)
+        )
+        received = b""
+        sock.settimeout(5)
+        while len(received) < len(expected):
+            received += sock.recv(4096)
+        sock.close()
+
+        self.assertEqual(received, expected)
+        self.assertEqual(self.server.stats["batches"], 2)
+
+    def test_timeout(self):
+        client = SocketSigner(self.path, timeout=0.1)
+        self.signer.release.clear()
+        self.assertRaises(SignerUnavailable, client.sign, None, b"data")
+        self.signer.release.set()
+        self.assertEqual(client._pending, {})
+        client.close()
+
+    def test_socket_file(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+        # Only stale sockets are replaced
+        path = os.path.join(self.directory.name, "file")
+        with open(path, "w") as file:
+            file.write("data")
+        server = SigningServer(path, self.server.private_key)
+        self.assertRaises(
+            FileExistsError,
+            asyncio.run,
+            server.start()
+        )
+        self.assertTrue(os.path.isfile(path))
+
+    def test_payload_limit(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        sock.settimeout(5)
+
+        # The connection is closed before the payload is read
+        sock.sendall(HEADER.pack(1, OP_SIGN, MAX_PAYLOAD + 1))
+        self.assertEqual(sock.recv(4096), b"")
+        sock.close()
+        self.assertEqual(self.server.stats["signatures"], 0)
+
+    @unittest.skipUnless(hasattr(socket, "SO_PEERCRED"), "SO_PEERCRED")
+    def test_peer_credentials(self):
+        self.server.allowed_uids = frozenset([os.getuid() + 1])
+        client = SocketSigner(self.path)
+        self.assertRaises(SignerUnavailable, client.sign, None, b"data")
+        client.close()
+
+        self.server.allowed_uids = frozenset([os.getuid()])
+        client = SocketSigner(self.path)
+        self.assertEqual(client.sign(None, b"data"), b"signed:data")
+        client.close()
+
+    def test_unavailable(self):
+        client = SocketSigner(os.path.join(self.directory.name, "missing"))
+        self.assertRaises(SignerUnavailable, client.sign, None, b"data")
+
+    def test_reset(self):
+        client = SocketSigner(self.path)
+        client.sign(None, b"data")
+        connection = client._socket
+
+        # After a fork the child opens its own connection
+        client._reset()
+        self.assertIsNone(client._socket)
+        self.assertEqual(client.sign(None, b"data"), b"signed:data")
+        self.assertIsNot(client._socket, connection)
+        client.close()
@@ -1,50 +1,56 @@
 import unittest
 
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 
 from spresso.view.authentication.identity_provider import SignatureView, \
     WellKnownInfoView
 
 
-@patch("spresso.view.authentication.identity_provider.Composition")
 class ViewTestCase(unittest.TestCase):
-    def test_signature_view(self, composition_mock):
+    def test_signature_view(self):
         signature = "signature"
 
         settings = Mock()
-        schema = Mock()
-        schema.ia = "name"
-
-        model = Mock()
-        model.to_json.return_value = "json"
+        # Field names are taken from the schema definition
+        schema = Mock(ia="ia_signature")
         schemata = Mock()
         schemata.schema = schema
         settings.json_schemata.get.return_value = schemata
-        composition_mock.return_value = model
 
         signature_view = SignatureView(signature, settings=settings)
         res_json = signature_view.json()
 
-        composition_mock.assert_called_once_with({'name': 'signature'})
-        self.assertEqual(model.to_json.call_count, 1)
-        self.assertEqual(res_json, "json")
+        settings.json_schemata.get.assert_called_once_with("sign")
+        schema.validate.assert_called_once_with(
+            {"ia_signature": "signature"}
+        )
+        self.assertEqual(res_json, '{"ia_signature": "signature"}')
 
-    def test_well_known_info_view(self, composition_mock):
+    def test_well_known_info_view(self):
         settings = Mock()
-        schema = Mock()
-        schema.public_key = "name"
+        schema = Mock(
+            public_key="public_key",
+            signature_scheme="signature_scheme"
+        )
         settings.public_key = "public key"
+        settings.signature_scheme = "EdDSA"
         schemata = Mock()
         schemata.schema = schema
         settings.json_schemata.get.return_value = schemata
 
-        model = Mock()
-        model.to_json.return_value = "json"
-        composition_mock.return_value = model
-
         wk_info_view = WellKnownInfoView(settings=settings)
         res_json = wk_info_view.json()
 
-        composition_mock.assert_called_once_with({'name': "public key"})
-        self.assertEqual(model.to_json.call_count, 1)
-        self.assertEqual(res_json, "json")
+        self.assertEqual(
+            res_json,
+            '{"public_key": "public key", "signature_scheme": "EdDSA"}'
+        )
+        schema.validate.assert_called_once_with({
+            "public_key": "public key",
+            "signature_scheme": "EdDSA"
+        })
+
+        schema.reset_mock()
+        settings.validate_output = False
+        wk_info_view.json()
+        self.assertEqual(schema.validate.call_count, 0)
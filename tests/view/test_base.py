@@ -1,9 +1,17 @@
+import gzip
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
+from jinja2 import TemplateNotFound
+
 from spresso.model.web.base import Response
 from spresso.view.base import json_error_response, json_success_response, \
-    View, JsonView, TemplateBase, TemplateView, Script
+    View, JsonView, TemplateBase, TemplateView, Script, ResourceLoader, \
+    template_environment, enable_bytecode_cache, accepts_gzip, \
+    etag_matches, StaticContent, StaticCache, StaticViewMixin, static_cache, \
+    SettingsMixin
 
 
 class JsonResponseTestCase(unittest.TestCase):
@@ -29,6 +37,13 @@ class JsonResponseTestCase(unittest.TestCase):
 
         self.assertEqual(res.status_code, 200)
         self.assertEqual(data, res.data)
+        response.add_header.assert_any_call("Cache-Control", "no-store")
+        response.add_header.assert_any_call("Pragma", "no-cache")
+
+        response = Response()
+        json_success_response(data, response, cache_control="no-cache")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertNotIn("Pragma", response.headers)
 
 
 class ViewTestCase(unittest.TestCase):
@@ -57,7 +72,11 @@ class JsonViewTestCase(unittest.TestCase):
 
         res = json_view.make_response(response)
         self.assertEqual(res, "view")
-        json_response_mock.assert_called_once_with("json", response)
+        json_response_mock.assert_called_once_with(
+            "json",
+            response,
+            cache_control="no-store"
+        )
 
 
 class TestTemplateBase(TemplateBase):
@@ -68,25 +87,52 @@ class TestTemplateBase(TemplateBase):
 
 
 class TemplateTestCase(unittest.TestCase):
-    @patch("spresso.view.base.get_resource")
-    @patch("spresso.view.base.Template")
-    def test_template_base(self, template_mock, get_resource_mock):
+    @patch("spresso.view.base.template_environment")
+    def test_template_base(self, environment_mock):
         settings = Mock()
-        settings.resource_path = "path"
+        settings.resource_path = "path/"
 
         template = Mock()
-
         template.render.return_value = "template"
-        template_mock.return_value = template
-
-        get_resource_mock.return_value = "content"
+        environment_mock.get_template.return_value = template
 
         test = TestTemplateBase(settings=settings)
 
         self.assertEqual(test.render(), "template")
-        get_resource_mock.assert_called_once_with("path", "resource")
-        template_mock.assert_called_once_with("content", autoescape=False)
+        environment_mock.get_template.assert_called_once_with("path/resource")
         template.render.assert_called_once_with(key="value", settings=settings)
+        # The context shared by the instances is left unchanged
+        self.assertEqual(TestTemplateBase.template_context, dict(key="value"))
+
+    @patch("spresso.view.base.get_resource")
+    def test_resource_loader(self, get_resource_mock):
+        get_resource_mock.return_value = "content"
+        loader = ResourceLoader()
+
+        source, file_name, uptodate = loader.get_source(Mock(), "path")
+        get_resource_mock.assert_called_once_with("", "path")
+        self.assertEqual(source, "content")
+        self.assertIsNone(file_name)
+        self.assertTrue(uptodate())
+
+        get_resource_mock.side_effect = FileNotFoundError
+        self.assertRaises(TemplateNotFound, loader.get_source, Mock(), "path")
+
+    def test_template_cache(self):
+        name = "resources/authentication/html/wait.html"
+        template = template_environment.get_template(name)
+        self.assertIs(template_environment.get_template(name), template)
+
+    def test_bytecode_cache(self):
+        name = "resources/authentication/html/redir.html"
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                enable_bytecode_cache(directory)
+                template_environment.cache.clear()
+                template_environment.get_template(name)
+                self.assertEqual(len(os.listdir(directory)), 1)
+            finally:
+                template_environment.bytecode_cache = None
 
     @patch("spresso.view.base.TemplateBase.render")
     def test_template(self, base_mock):
@@ -107,3 +153,115 @@ class TemplateTestCase(unittest.TestCase):
 
         test = Script(settings=settings)
         self.assertEqual(test.template(), "template")
+
+
+def request_with_headers(**headers):
+    request = Mock()
+    request.header.side_effect = lambda name: headers.get(name)
+    return request
+
+
+class TestStaticView(StaticViewMixin, JsonView, SettingsMixin):
+    render_count = 0
+
+    def json(self):
+        TestStaticView.render_count += 1
+        return "content"
+
+
+class StaticContentTestCase(unittest.TestCase):
+    def test_accepts_gzip(self):
+        self.assertFalse(accepts_gzip(None))
+        self.assertFalse(accepts_gzip(request_with_headers()))
+
+        for header in ["gzip", "deflate, gzip", "GZIP;q=0.5", "*"]:
+            request = request_with_headers(**{"Accept-Encoding": header})
+            self.assertTrue(accepts_gzip(request), header)
+
+        for header in ["deflate", "gzip;q=0", "br, gzip; q=0.0", "gzip;q=x"]:
+            request = request_with_headers(**{"Accept-Encoding": header})
+            self.assertFalse(accepts_gzip(request), header)
+
+    def test_etag_matches(self):
+        self.assertFalse(etag_matches(None, '"a"'))
+        self.assertFalse(etag_matches(request_with_headers(), '"a"'))
+
+        for header in ['"a"', '"b", "a"', 'W/"a"', '*']:
+            request = request_with_headers(**{"If-None-Match": header})
+            self.assertTrue(etag_matches(request, '"a"'), header)
+
+        request = request_with_headers(**{"If-None-Match": '"b"'})
+        self.assertFalse(etag_matches(request, '"a"'))
+
+    def test_static_content(self):
+        content = StaticContent("content", {"Content-Type": "text/plain"})
+        self.assertEqual(content.data, b"content")
+        self.assertEqual(gzip.decompress(content.gzip_data), b"content")
+        self.assertNotEqual(content.etag, content.gzip_etag)
+        self.assertEqual(
+            StaticContent("content", {}).etag,
+            content.etag
+        )
+
+        response = content.make_response(None, Response())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b"content")
+        self.assertEqual(response.headers["Content-Type"], "text/plain")
+        self.assertEqual(response.headers["ETag"], content.etag)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+        request = request_with_headers(**{"Accept-Encoding": "gzip"})
+        response = content.make_response(request, Response())
+        self.assertEqual(response.data, content.gzip_data)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["ETag"], content.gzip_etag)
+
+        request = request_with_headers(**{"If-None-Match": content.etag})
+        response = content.make_response(request, Response())
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+    def test_static_cache(self):
+        cache = StaticCache()
+        settings = Mock()
+        render = Mock(return_value="content")
+
+        self.assertEqual(cache.get(settings, "key", render), "content")
+        self.assertEqual(cache.get(settings, "key", render), "content")
+        self.assertEqual(render.call_count, 1)
+
+        cache.get(Mock(), "key", render)
+        self.assertEqual(render.call_count, 2)
+
+        cache.invalidate(settings)
+        cache.get(settings, "key", render)
+        self.assertEqual(render.call_count, 3)
+
+        cache.invalidate()
+        cache.get(settings, "key", render)
+        self.assertEqual(render.call_count, 4)
+
+    def test_static_view(self):
+        settings = Mock()
+        view = TestStaticView(settings=settings)
+        response = view.process(Response())
+        self.assertEqual(response.data, b"content")
+        self.assertEqual(
+            response.headers["Content-Type"],
+            "application/json"
+        )
+
+        # Cached responses may be stored and revalidated
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertNotIn("Pragma", response.headers)
+
+        etag = response.headers["ETag"]
+        request = request_with_headers(**{"If-None-Match": etag})
+        view = TestStaticView(request=request, settings=settings)
+        response = view.process(Response())
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(TestStaticView.render_count, 1)
+
+        static_cache.invalidate(settings)
+        TestStaticView(settings=settings).process(Response())
+        self.assertEqual(TestStaticView.render_count, 2)